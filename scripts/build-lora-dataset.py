@@ -0,0 +1,352 @@
+"""
+LoRA 학습 데이터셋 빌더 — 선언형 매니페스트(JSON) → 여러 레이아웃을 한 번에 빌드
+
+chibi v2 선택 목록의 유일한 원본 (curate-chibi-v2.py / curate-chibi-v2-extras.py는
+--layouts per_char / combined 로 이 스크립트를 실행하는 래퍼일 뿐):
+  scripts/chibi_v2_dataset.json
+    roots       — 소스 폴더 별칭 ("regen2": "C:/.../regen2")
+    layouts     — 출력 레이아웃별 dir / folder·name·caption 템플릿 / repeats / prune
+                  선택: "bucket": {resolution, min_reso, max_reso, step, padding} — 버킷 사전 계산
+    directions  — 방향 → 레이아웃별 방향 태그
+    characters  — 캐릭터 → gender, desc (캡션 템플릿 변수)
+    images      — {"source": "root:파일", "char", "direction",
+                   선택: "stem"(출력 이름), "layouts"(기본 전체), "caption": {레이아웃: 문자열 | "sidecar"}}
+
+템플릿 변수: {char} {gender} {desc} {direction} {stem} {index}(레이아웃·캐릭터 내 순번) {repeats}
+"sidecar" 캡션 = 소스 이미지 옆 같은 이름의 .txt를 그대로 사용 (기존 원본 캡션 유지).
+
+처리 순서:
+  1. 검증 — 소스/사이드카 존재, 캐릭터·방향·레이아웃 참조, 템플릿 변수, 출력 이름 충돌.
+     하나라도 실패하면 아무것도 쓰지 않고 종료.
+  2. 빌드 — 레이아웃 전체 항목을 스레드 풀에서 병렬 배치(reflink/hardlink/copy, dataset_materialize.py)
+     + 캡션 쓰기. 바뀐 항목만 갱신, prune 레이아웃은 매니페스트에서 빠진 항목 삭제.
+     bucket 레이아웃은 링크 대신 전경 bbox 크롭 + 버킷 해상도 리사이즈(dataset_buckets.py)
+     + {dir}/meta_buckets.json (sd-scripts fine-tuning 메타데이터: caption, train_resolution).
+     원본 크기/mtime, 버킷 설정, 출력 파일 크기/mtime이 그대로면 다시 만들지 않음.
+  3. 요약 — 레이아웃별 캐릭터/방향 카운트, 총 repeats → 출력 + {dir}/dataset_summary.json
+     근접 중복(pHash/dHash, image_phash.py) 묶음은 [DUP]로 표시 + summary의 near_duplicates
+     (빌드는 막지 않음 — 어느 쪽을 뺄지는 매니페스트에서 결정)
+
+meta_buckets.json은 DreamBooth 폴더 방식({repeats}_이름/ + .txt)에서는 읽히지 않는다.
+이미지 크기 스캔을 건너뛰려면 fine-tuning 방식 dataset config로 학습 (--dataset_config):
+  [[datasets]]
+  resolution = 1024
+  enable_bucket = true
+    [[datasets.subsets]]
+    image_dir = "C:/Users/User/sd-scripts/train_data/chibi_v2_per_char"
+    metadata_file = "C:/Users/User/sd-scripts/train_data/chibi_v2_per_char/meta_buckets.json"
+    num_repeats = 10
+  (키가 이미지 절대 경로라 subset 하나에 전 캐릭터가 들어감 — 캡션은 메타데이터의 caption, 크기는 train_resolution)
+
+사용법:
+  python scripts/build-lora-dataset.py                          # combined + per_char 동시 빌드
+  python scripts/build-lora-dataset.py --layouts per_char
+  python scripts/build-lora-dataset.py --check                  # 검증 + 요약만
+  python scripts/build-lora-dataset.py other_manifest.json --mode copy --workers 16
+  python scripts/build-lora-dataset.py --dup-threshold 6        # 더 엄격한 중복 기준 (--no-dup-check로 끔)
+"""
+import argparse
+import json
+import os
+import shutil
+import string
+import sys
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from dataset_buckets import bucket_params, make_buckets, params_fingerprint, preprocess
+from dataset_materialize import MODES, materialize, prune_dir, write_text_if_changed
+from image_phash import DEFAULT_CACHE, PHASH_THRESHOLD, cluster_members, compute_hashes, find_clusters
+
+sys.stdout.reconfigure(encoding="utf-8")
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chibi_v2_dataset.json")
+DEFAULT_WORKERS = 8
+SIDECAR = "sidecar"
+BUCKET_META = "meta_buckets.json"
+
+
+def load_manifest(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resolve_source(manifest: dict, source: str) -> str:
+    """ "root:파일" → 실제 경로 (root 별칭이 없으면 그대로 경로로 취급)"""
+    root, sep, rel = source.partition(":")
+    if sep and root in manifest["roots"]:
+        return os.path.join(manifest["roots"][root], rel)
+    return source
+
+
+def template_fields(template: str) -> set[str]:
+    return {name for _, name, _, _ in string.Formatter().parse(template) if name}
+
+
+def plan(manifest: dict, layouts: list[str]) -> tuple[list[dict], list[str]]:
+    """매니페스트 → 배치 작업 목록 + 검증 오류 목록 (파일시스템은 읽기만)"""
+    errors = []
+    jobs = []
+    chars = manifest["characters"]
+    directions = manifest["directions"]
+    index = defaultdict(int)      # (layout, char) → 다음 순번
+    seen = {}                     # 출력 이미지 경로 → 매니페스트 항목 번호
+
+    for n, image in enumerate(manifest["images"]):
+        where = f"images[{n}] {image.get('source')}"
+        char, direction = image.get("char"), image.get("direction")
+        if char not in chars:
+            errors.append(f"{where}: unknown character {char!r}")
+            continue
+        if direction not in directions:
+            errors.append(f"{where}: unknown direction {direction!r}")
+            continue
+        src = resolve_source(manifest, image["source"])
+        if not os.path.isfile(src):
+            errors.append(f"{where}: source not found: {src}")
+            continue
+
+        image_layouts = image.get("layouts", list(manifest["layouts"]))
+        for name in image_layouts:
+            if name not in manifest["layouts"]:
+                errors.append(f"{where}: unknown layout {name!r}")
+        for name in (l for l in image_layouts if l in layouts):
+            layout = manifest["layouts"][name]
+            fields = {
+                **chars[char],
+                "char": char,
+                "direction": directions[direction][name],
+                "stem": image.get("stem", os.path.splitext(os.path.basename(src))[0]),
+                "index": index[(name, char)],
+                "repeats": layout["repeats"],
+            }
+            index[(name, char)] += 1
+
+            caption_spec = image.get("caption", {}).get(name, layout["caption"])
+            missing = {f for f in (template_fields(layout["folder"]) | template_fields(layout["name"])
+                                   | (set() if caption_spec == SIDECAR else template_fields(caption_spec)))
+                       if f not in fields}
+            if missing:
+                errors.append(f"{where}: [{name}] template needs {', '.join(sorted(missing))}")
+                continue
+
+            folder = os.path.join(layout["dir"], layout["folder"].format(**fields))
+            stem = layout["name"].format(**fields)
+            dst_img = os.path.join(folder, f"{stem}.png")
+            if caption_spec == SIDECAR:
+                sidecar = os.path.splitext(src)[0] + ".txt"
+                if not os.path.isfile(sidecar):
+                    errors.append(f"{where}: [{name}] sidecar caption not found: {sidecar}")
+                    continue
+                caption = None
+            else:
+                sidecar, caption = None, caption_spec.format(**fields)
+
+            if "bucket" in layout and os.path.abspath(dst_img) == os.path.abspath(src):
+                errors.append(f"{where}: [{name}] bucket layout would overwrite its source")
+                continue
+            if dst_img in seen:
+                errors.append(f"{where}: [{name}] output {dst_img} also produced by images[{seen[dst_img]}]")
+                continue
+            seen[dst_img] = n
+            jobs.append({
+                "layout": name, "char": char, "direction": direction,
+                "src": src, "dst_img": dst_img, "dst_txt": os.path.join(folder, f"{stem}.txt"),
+                "caption": caption, "sidecar": sidecar,
+                "bucket": bucket_params(layout["bucket"]) if "bucket" in layout else None,
+            })
+    return jobs, errors
+
+
+def load_bucket_meta(layout: dict) -> dict:
+    try:
+        with open(os.path.join(layout["dir"], BUCKET_META), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def output_stat(path: str) -> dict:
+    """출력 이미지 크기/mtime — 다른 도구가 같은 경로를 덮어썼는지 확인용 (없으면 빈 dict)"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {}
+    return {"output_size": st.st_size, "output_mtime_ns": st.st_mtime_ns}
+
+
+def build_bucketed(job: dict, previous: dict) -> tuple[str, dict]:
+    """크롭 + 버킷 리사이즈 → (결과, 메타).
+
+    원본 크기/mtime, 버킷 설정, 출력 파일 크기/mtime이 모두 이전 실행의 메타와 같을 때만 건너뜀
+    (출력이 없어졌거나 다른 도구가 덮어쓴 경우 다시 만든다).
+    """
+    st = os.stat(job["src"])
+    meta = {"source": job["src"], "source_size": st.st_size, "source_mtime_ns": st.st_mtime_ns,
+            "bucket_params": params_fingerprint(job["bucket"])}
+    old = previous.get(os.path.abspath(job["dst_img"]))
+    current = output_stat(job["dst_img"])
+    if old and current and all(old.get(k) == v for k, v in {**meta, **current}.items()):
+        return "unchanged", {**meta, **current, "train_resolution": old["train_resolution"]}
+    bucket = preprocess(job["src"], job["dst_img"], job["bucket"], make_buckets(job["bucket"]))
+    return "bucketed", {**meta, **output_stat(job["dst_img"]), "train_resolution": list(bucket)}
+
+
+def build_one(job: dict, mode: str, previous: dict) -> tuple[str, bool, dict | None]:
+    """이미지 배치(또는 버킷 전처리) + 캡션 쓰기 → (결과, 캡션 변경 여부, 버킷 메타)"""
+    os.makedirs(os.path.dirname(job["dst_img"]), exist_ok=True)
+    if job["bucket"]:
+        action, meta = build_bucketed(job, previous)
+    else:
+        action, meta = materialize(job["src"], job["dst_img"], mode), None
+    if job["sidecar"]:
+        with open(job["sidecar"], encoding="utf-8") as f:
+            caption = f.read()
+    else:
+        caption = job["caption"]
+    if meta is not None:
+        meta = {"caption": caption, **meta}
+    return action, write_text_if_changed(job["dst_txt"], caption), meta
+
+
+def prune_layout(layout: dict, layout_jobs: list[dict]) -> list[str]:
+    """prune 레이아웃: 매니페스트에 없는 폴더/이미지/캡션 삭제"""
+    keep = defaultdict(set)
+    for job in layout_jobs:
+        folder = os.path.dirname(job["dst_img"])
+        keep[folder].update((os.path.basename(job["dst_img"]), os.path.basename(job["dst_txt"])))
+
+    removed = []
+    if not os.path.isdir(layout["dir"]):
+        return removed
+    for name in sorted(os.listdir(layout["dir"])):
+        path = os.path.join(layout["dir"], name)
+        if not os.path.isdir(path):
+            continue
+        if path not in keep:
+            shutil.rmtree(path)
+            removed.append(f"{name}/")
+        else:
+            removed += [f"{name}/{f}" for f in prune_dir(path, keep[path])]
+    return removed
+
+
+def near_duplicates(jobs: list[dict], threshold: int, workers: int) -> list[list[str]]:
+    """한 레이아웃 안의 근접 중복 묶음 → [[출력 이미지 이름, ...], ...]"""
+    hashes = compute_hashes([j["src"] for j in jobs], DEFAULT_CACHE, workers)
+    by_src = defaultdict(list)
+    for job in jobs:
+        by_src[job["src"]].append(os.path.relpath(job["dst_img"], os.path.dirname(os.path.dirname(job["dst_img"]))))
+    return [
+        sorted(name for src in cluster_members(cluster) for name in by_src[src])
+        for cluster in find_clusters(hashes, threshold)
+    ]
+
+
+def write_bucket_meta(layout: dict, entries: dict):
+    path = os.path.join(layout["dir"], BUCKET_META)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(entries.items())), f, indent=2, ensure_ascii=False)
+    os.replace(tmp, path)
+
+
+def summarize(manifest: dict, name: str, layout_jobs: list[dict]) -> dict:
+    repeats = manifest["layouts"][name]["repeats"]
+    per_char = defaultdict(Counter)
+    for job in layout_jobs:
+        per_char[job["char"]][job["direction"]] += 1
+    return {
+        "layout": name,
+        "dir": manifest["layouts"][name]["dir"],
+        "repeats": repeats,
+        "images": len(layout_jobs),
+        "total_repeats": len(layout_jobs) * repeats,
+        "per_direction": dict(Counter(job["direction"] for job in layout_jobs)),
+        "per_character": {c: dict(d) for c, d in sorted(per_char.items())},
+    }
+
+
+def print_summary(summary: dict, directions: list[str]):
+    print(f"\n[{summary['layout']}] {summary['images']} images × {summary['repeats']} repeats"
+          f" = {summary['total_repeats']} steps/epoch  ({summary['dir']})")
+    print("  " + " " * 6 + "".join(f"{d:>7s}" for d in directions))
+    for char, counts in summary["per_character"].items():
+        print(f"  {char:6s}" + "".join(f"{counts.get(d, 0):7d}" for d in directions))
+    print(f"  {'total':6s}" + "".join(f"{summary['per_direction'].get(d, 0):7d}" for d in directions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build LoRA datasets from a declarative manifest")
+    parser.add_argument("manifest", nargs="?", default=DEFAULT_MANIFEST, help="Dataset manifest JSON")
+    parser.add_argument("--layouts", default=None, help="Comma-separated layouts (default: all)")
+    parser.add_argument("--mode", choices=MODES, default="auto",
+                        help="auto: reflink → hardlink → copy (default)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Parallel file workers")
+    parser.add_argument("--check", action="store_true", help="Validate and summarize only")
+    parser.add_argument("--dup-threshold", type=int, default=PHASH_THRESHOLD,
+                        help=f"Max pHash Hamming distance flagged as near-duplicate (default: {PHASH_THRESHOLD}/64)")
+    parser.add_argument("--no-dup-check", action="store_true", help="Skip near-duplicate detection")
+    args = parser.parse_args()
+
+    manifest = load_manifest(args.manifest)
+    layouts = args.layouts.split(",") if args.layouts else list(manifest["layouts"])
+    unknown = [l for l in layouts if l not in manifest["layouts"]]
+    if unknown:
+        print(f"ERROR: unknown layout(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    jobs, errors = plan(manifest, layouts)
+    if errors:
+        print(f"ERROR: manifest validation failed ({len(errors)}):")
+        for e in errors:
+            print(f"  {e}")
+        sys.exit(1)
+    print(f"Manifest OK: {len(manifest['images'])} images → {len(jobs)} outputs in {', '.join(layouts)}")
+
+    actions = Counter()
+    bucket_meta = defaultdict(dict)   # 레이아웃 → {출력 이미지 절대 경로: 메타}
+    if not args.check:
+        previous = {name: load_bucket_meta(manifest["layouts"][name])
+                    for name in layouts if "bucket" in manifest["layouts"][name]}
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            results = pool.map(lambda j: build_one(j, args.mode, previous.get(j["layout"], {})), jobs)
+            for job, (action, caption_changed, meta) in zip(jobs, results):
+                actions[action] += 1
+                actions["caption"] += caption_changed
+                if meta is not None:
+                    bucket_meta[job["layout"]][os.path.abspath(job["dst_img"])] = meta
+        for name, entries in bucket_meta.items():
+            write_bucket_meta(manifest["layouts"][name], entries)
+        for name in layouts:
+            if manifest["layouts"][name].get("prune"):
+                for removed in prune_layout(manifest["layouts"][name], [j for j in jobs if j["layout"] == name]):
+                    actions["removed"] += 1
+                    print(f"  [REMOVED] {name}: {removed}")
+
+    directions = list(manifest["directions"])
+    for name in layouts:
+        layout_jobs = [j for j in jobs if j["layout"] == name]
+        summary = summarize(manifest, name, layout_jobs)
+        print_summary(summary, directions)
+        if name in bucket_meta:
+            summary["buckets"] = dict(sorted(Counter(
+                "x".join(map(str, m["train_resolution"])) for m in bucket_meta[name].values()).items()))
+            print(f"  buckets: {', '.join(f'{b} ×{n}' for b, n in summary['buckets'].items())}")
+        if not args.no_dup_check:
+            summary["near_duplicates"] = near_duplicates(layout_jobs, args.dup_threshold, args.workers)
+            for group in summary["near_duplicates"]:
+                print(f"  [DUP] {' ~ '.join(group)}")
+        if not args.check:
+            os.makedirs(summary["dir"], exist_ok=True)
+            with open(os.path.join(summary["dir"], "dataset_summary.json"), "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    if not args.check:
+        print("\nUpdated: " + ", ".join(
+            f"{k} {actions[k]}" for k in ("unchanged", "reflink", "hardlink", "copy", "bucketed", "caption", "removed")
+        ))
+
+
+if __name__ == "__main__":
+    main()
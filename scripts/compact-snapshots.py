@@ -0,0 +1,167 @@
+"""
+Fold a chain of delta snapshots into a new full (base) snapshot.
+
+Usage:
+    python scripts/compact-snapshots.py .backups/sydney-delta-20260601T030000
+    python scripts/compact-snapshots.py DELTA_DIR --out-dir .backups/sydney-base-2026-06 --compress gzip
+
+Follows "base" links from the given snapshot back to the last full dump
+(dump-sydney-snapshot.py --since writes them), then per table:
+
+    start = newest snapshot in the chain where the table was dumped in full
+    rows  = start rows, each replaced by its newest delta version (same key),
+            followed by delta rows whose key start did not have
+
+Only the deltas are held in memory (key -> row); the base file is streamed.
+Input SHA-256s are checked against each manifest while reading. The result
+is a regular full snapshot: restore-snapshot.py can load it and new deltas
+can be taken --since it (high-water marks come from the newest delta).
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from snapshot_io import SUFFIXES, JsonlReader, JsonlWriter, check_compression
+
+sys.stdout.reconfigure(encoding="utf-8")
+
+DEFAULT_WORKERS = 4
+
+
+def load_manifest(snapshot_dir):
+    path = snapshot_dir / "_manifest.json"
+    if not path.exists():
+        raise SystemExit(f"No _manifest.json in {snapshot_dir}")
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if "files" not in manifest:
+        raise SystemExit(f"{snapshot_dir} predates per-file manifests -- cannot compact")
+    return manifest
+
+
+def load_chain(latest_dir):
+    """[(dir, manifest), ...] from the full base up to latest_dir"""
+    chain = []
+    snapshot_dir = latest_dir.resolve()
+    while True:
+        manifest = load_manifest(snapshot_dir)
+        chain.append((snapshot_dir, manifest))
+        if manifest.get("kind", "full") == "full":
+            break
+        if any(d == (snapshot_dir / manifest["base"]).resolve() for d, _ in chain):
+            raise SystemExit(f"Snapshot chain loops at {snapshot_dir}")
+        snapshot_dir = (snapshot_dir / manifest["base"]).resolve()
+    return chain[::-1]
+
+
+def read_rows(snapshot_dir, info):
+    """Yield rows of one snapshot file, failing if its SHA-256 disagrees with the manifest"""
+    path = snapshot_dir / info["file"]
+    with JsonlReader(path) as reader:
+        yield from reader
+    if info.get("sha256") and reader.sha256 != info["sha256"]:
+        raise RuntimeError(f"{path}: sha256 mismatch")
+
+
+def compact_table(table, chain, out_dir, compression):
+    """Write the folded rows of one table, return its manifest entry"""
+    entries = [(d, m["files"][table]) for d, m in chain if table in m["files"]]
+    start = max(i for i, (_, info) in enumerate(entries) if info.get("mode", "full") == "full")
+    base_dir, base_info = entries[start]
+    deltas = entries[start + 1:]
+
+    key = base_info.get("key") or (deltas[-1][1].get("key") if deltas else None)
+    overlay = {}
+    for snapshot_dir, info in deltas:
+        for row in read_rows(snapshot_dir, info):
+            overlay[tuple(row[k] for k in key)] = row
+
+    out_file = out_dir / f"{table}{SUFFIXES[compression]}"
+    with JsonlWriter(out_file, compression) as writer:
+        for row in read_rows(base_dir, base_info):
+            if overlay:
+                row = overlay.pop(tuple(row[k] for k in key), row)
+            writer.write(row)
+        for row in overlay.values():
+            writer.write(row)
+
+    latest = entries[-1][1]
+    return {
+        "file": out_file.name,
+        "rows": writer.rows,
+        "bytes": writer.size,
+        "sha256": writer.sha256,
+        "key": latest.get("key"),
+        "high_water": latest.get("high_water"),
+    }, len(deltas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact delta snapshots into a new base snapshot")
+    parser.add_argument("snapshot_dir", help="Newest snapshot of the chain (usually a delta)")
+    parser.add_argument("--out-dir", default=None,
+                        help="Output directory (default: <parent>/sydney-base-<timestamp>)")
+    parser.add_argument("--compress", choices=list(SUFFIXES), default=None,
+                        help="Output compression (default: same as the newest snapshot)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Tables compacted in parallel (default: {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    chain = load_chain(Path(args.snapshot_dir))
+    latest_dir, latest = chain[-1]
+    compression = args.compress or latest.get("compression", "none")
+    check_compression(compression)
+
+    now = datetime.now()
+    out_dir = Path(args.out_dir or latest_dir.parent / now.strftime("sydney-base-%Y%m%dT%H%M%S"))
+    if out_dir.resolve() in (d for d, _ in chain):
+        raise SystemExit("--out-dir must not be one of the input snapshots")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    print("Chain:")
+    for snapshot_dir, manifest in chain:
+        print(f"  {manifest.get('kind', 'full'):5s} {snapshot_dir}")
+    print(f"Output: {out_dir}")
+    print()
+
+    files = {}
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {
+            pool.submit(compact_table, table, chain, out_dir, compression): table
+            for table in latest["files"]
+        }
+        for fut in as_completed(futures):
+            table = futures[fut]
+            files[table], n_deltas = fut.result()
+            print(f"  {table:24s} {files[table]['rows']:6d} rows ({n_deltas} deltas folded)")
+
+    files = dict(sorted(files.items()))
+    summary = {table: info["rows"] for table, info in files.items()}
+    manifest = {
+        "snapshot_date": latest.get("snapshot_date"),
+        "created_at": now.isoformat(timespec="seconds"),
+        "kind": "full",
+        "compacted_from": [os.path.relpath(d, out_dir) for d, _ in chain],
+        "source_project_id": latest.get("source_project_id"),
+        "source_region": latest.get("source_region"),
+        "source_host": latest.get("source_host"),
+        "format": "jsonl",
+        "compression": compression,
+        "tables": summary,
+        "files": files,
+        "total_rows": sum(summary.values()),
+        "purpose": "compacted base snapshot (full dump + folded deltas)",
+    }
+    (out_dir / "_manifest.json").write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+    print(f"\nTotal: {manifest['total_rows']} rows across {len(summary)} tables")
+    print(f"Manifest: {out_dir / '_manifest.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,65 +1,17 @@
-"""추가 변형 이미지 — 방향 균등화 + 다양성 향상"""
-import shutil
-import os
-
-SRC = "C:/Users/User/ComfyUI/output/chibi_v2"
-DST = "C:/Users/User/sd-scripts/train_data/chibi_v2/10_flowspace_chibi"
-
-EXTRAS = [
-    # 추가 측면 (side) — 균형 맞추기
-    ("c01_side_f_00001_.png", "c01_side2",
-     "flowspace_chibi, chibi, 1boy, suit, necktie, briefcase, short brown hair, side_view, standing, green_background, full_body"),
-    ("c08_side_f_00001_.png", "c08_side2",
-     "flowspace_chibi, chibi, 1girl, apron, coffee_cup, ponytail, barista, brown hair, side_view, standing, green_background, full_body"),
-    ("c11_side_f_00001_.png", "c11_side2",
-     "flowspace_chibi, chibi, 1girl, white robe, wizard_hat, staff, magic, long purple hair, side_view, standing, green_background, full_body"),
-
-    # 추가 후면 (back) — 균형 맞추기
-    ("c06_back_b_00001_.png", "c06_back2",
-     "flowspace_chibi, chibi, 1boy, t-shirt, jeans, sneakers, backpack, blonde hair, from_behind, standing, green_background, full_body"),
-    ("c08_back_d_00001_.png", "c08_back2",
-     "flowspace_chibi, chibi, 1girl, apron, coffee_cup, ponytail, barista, brown hair, from_behind, standing, green_background, full_body"),
-    ("c10_back_d_00001_.png", "c10_back2",
-     "flowspace_chibi, chibi, 1boy, silver armor, red cape, sword, helmet, from_behind, standing, green_background, full_body"),
-]
+"""추가 변형 이미지 — 방향 균등화 + 다양성 향상
 
-def main():
-    added = 0
-    for src_name, dst_name, caption in EXTRAS:
-        src_path = os.path.join(SRC, src_name)
-        if not os.path.exists(src_path):
-            print(f"[WARN] Missing: {src_name}")
-            continue
+추가 이미지 목록은 scripts/chibi_v2_dataset.json의 chibi_v2:* 항목 — 이 스크립트는
+build-lora-dataset.py --layouts combined 를 실행하는 얇은 래퍼 (combined 레이아웃은 prune 없음,
+이미 같은 파일/캡션이면 건너뜀). 방향 균형은 빌드 요약 표에 출력.
 
-        dst_img = os.path.join(DST, f"{dst_name}.png")
-        shutil.copy2(src_path, dst_img)
-
-        dst_txt = os.path.join(DST, f"{dst_name}.txt")
-        with open(dst_txt, "w", encoding="utf-8") as f:
-            f.write(caption)
-
-        added += 1
-        print(f"[+] {dst_name}")
-
-    # Final count
-    pngs = [f for f in os.listdir(DST) if f.endswith(".png")]
-    txts = [f for f in os.listdir(DST) if f.endswith(".txt")]
-    print(f"\nAdded: {added} extras")
-    print(f"Total: {len(pngs)} images, {len(txts)} captions")
+  python scripts/curate-chibi-v2-extras.py [--mode auto|reflink|hardlink|copy] [--check]
+"""
+import os
+import runpy
+import sys
 
-    # Direction balance
-    dir_counts = {"front": 0, "side": 0, "back": 0}
-    for t in txts:
-        path = os.path.join(DST, t)
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
-        if "front_view" in content:
-            dir_counts["front"] += 1
-        elif "side_view" in content:
-            dir_counts["side"] += 1
-        elif "from_behind" in content:
-            dir_counts["back"] += 1
-    print(f"Direction balance: {dir_counts}")
+BUILDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "build-lora-dataset.py")
 
 if __name__ == "__main__":
-    main()
+    sys.argv = [BUILDER, "--layouts", "combined", *sys.argv[1:]]
+    runpy.run_path(BUILDER, run_name="__main__")
@@ -0,0 +1,100 @@
+"""
+dataset_buckets.py — 학습 이미지 aspect-ratio 버킷 사전 계산 (크롭 + 리사이즈) 공용 헬퍼
+
+build-lora-dataset.py가 import해서 사용 (같은 scripts/ 폴더).
+sd-scripts는 학습 시작마다 PNG를 전부 열어 크기를 읽고 버킷을 나누는데,
+큐레이션 단계에서 미리 해 두면 학습 시작 스캔을 건너뛸 수 있다:
+
+    전경 bbox (그린 스크린/알파 마스크, image_quality.foreground_mask)
+      → 여백(padding) 추가 → 가장 가까운 버킷 비율로 짧은 쪽을 넓힘 (캐릭터는 잘리지 않음,
+        이미지 밖으로 나가면 배경색으로 채움, 투명 PNG는 투명 유지)
+      → 버킷 해상도로 LANCZOS 리사이즈
+
+버킷 목록은 sd-scripts와 같은 방식: 면적 ≤ resolution², 변은 step 배수, min_reso~max_reso.
+메타데이터({dir}/meta_buckets.json)는 sd-scripts fine-tuning in_json 형식
+({이미지 절대 경로: {"caption", "train_resolution": [w, h]}}) — 이미지 크기 확인 생략.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+from PIL import Image
+
+from image_quality import foreground_mask
+
+DEFAULTS = {"resolution": 1024, "min_reso": 256, "max_reso": 1024, "step": 64, "padding": 0.05}  # sd-scripts 기본값
+BBOX_MIN_PIXELS = 3           # 행/열에 전경 픽셀이 이 이하면 노이즈로 보고 bbox에서 제외
+BACKGROUND = (0, 255, 0)      # 확장 영역 채움색 (green_background)
+
+
+def bucket_params(spec: dict) -> dict:
+    return {**DEFAULTS, **spec}
+
+
+def params_fingerprint(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def make_buckets(params: dict) -> list[tuple[int, int]]:
+    """면적 ≤ resolution² 인 (w, h) 버킷 목록 (step 배수, 가로/세로 대칭)"""
+    max_area = params["resolution"] ** 2
+    step, lo, hi = params["step"], params["min_reso"], params["max_reso"]
+    buckets = {(params["resolution"], params["resolution"])}
+    for w in range(lo, hi + 1, step):
+        h = min(hi, (max_area // w) // step * step)
+        if h >= lo:
+            buckets.update({(w, h), (h, w)})
+    return sorted(buckets)
+
+
+def select_bucket(width: int, height: int, buckets: list[tuple[int, int]]) -> tuple[int, int]:
+    """비율(log)이 가장 가까운 버킷"""
+    ratios = np.log(np.array([w / h for w, h in buckets]))
+    return buckets[int(np.abs(ratios - np.log(width / height)).argmin())]
+
+
+def content_bbox(rgba: np.ndarray) -> tuple[int, int, int, int]:
+    """전경 bbox (x0, y0, x1, y1) — 전경이 없으면 이미지 전체"""
+    mask = foreground_mask(rgba)
+    rows = np.flatnonzero(mask.sum(axis=1) > BBOX_MIN_PIXELS)
+    cols = np.flatnonzero(mask.sum(axis=0) > BBOX_MIN_PIXELS)
+    if len(rows) == 0 or len(cols) == 0:
+        return 0, 0, rgba.shape[1], rgba.shape[0]
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def fit_box(bbox: tuple[int, int, int, int], bucket: tuple[int, int], padding: float) -> tuple[int, int, int, int]:
+    """bbox에 여백을 더하고 버킷 비율이 되도록 짧은 쪽을 중심 기준으로 넓힘"""
+    x0, y0, x1, y1 = bbox
+    pad = padding * max(x1 - x0, y1 - y0)
+    w, h = x1 - x0 + 2 * pad, y1 - y0 + 2 * pad
+    target = bucket[0] / bucket[1]
+    if w / h < target:
+        w = h * target
+    else:
+        h = w / target
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    return round(cx - w / 2), round(cy - h / 2), round(cx + w / 2), round(cy + h / 2)
+
+
+def preprocess(src: str, dst: str, params: dict, buckets: list[tuple[int, int]]) -> tuple[int, int]:
+    """src → 크롭 + 버킷 리사이즈 → dst(PNG). 반환: 버킷 (w, h)"""
+    with Image.open(src) as img:
+        img = img.convert("RGBA")
+    rgba = np.asarray(img)
+    bbox = content_bbox(rgba)
+    bucket = select_bucket(bbox[2] - bbox[0], bbox[3] - bbox[1], buckets)
+    box = fit_box(bbox, bucket, params["padding"])
+
+    # Image.crop은 이미지 밖을 투명으로 채움 → 불투명 원본(그린 스크린)이면 배경색 위에 합성
+    out = img.crop(box)
+    if rgba[..., 3].min() == 255:
+        canvas = Image.new("RGBA", out.size, BACKGROUND + (255,))
+        canvas.alpha_composite(out)
+        out = canvas.convert("RGB")
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    out.resize(bucket, Image.Resampling.LANCZOS).save(tmp, format="PNG", compress_level=4)
+    os.replace(tmp, dst)
+    return bucket
@@ -0,0 +1,112 @@
+"""
+dataset_materialize.py — 학습 데이터셋 파일 배치(reflink/hardlink/copy) + 증분 갱신 공용 헬퍼
+
+build-lora-dataset.py가 import해서 사용 (같은 scripts/ 폴더).
+원본과 출력이 같은 파일시스템이면 디스크를 더 쓰지 않는 링크로 배치한다:
+
+    reflink (Linux FICLONE / macOS clonefile — CoW, 원본과 독립)
+      → hardlink (같은 볼륨, NTFS 포함)
+      → copy2 (다른 볼륨)
+
+이미 같은 내용이 있으면(같은 inode, 또는 크기+mtime 일치) 건드리지 않고,
+교체가 필요하면 임시 파일에 만든 뒤 os.replace — 기존 링크를 통해 원본이 바뀌는 일 없음.
+rmtree 후 재구성 대신 prune_dir로 선택에서 빠진 항목만 지운다.
+"""
+
+import os
+import shutil
+import sys
+
+MODES = ("auto", "reflink", "hardlink", "copy")
+
+# 크기가 같고 mtime 차이가 이 이하면 같은 파일로 간주 (파일시스템 타임스탬프 해상도 차이 흡수)
+MTIME_TOLERANCE_NS = 2_000_000
+
+_FICLONE = 0x40049409
+
+
+def _reflink(src: str, dst: str) -> bool:
+    """CoW 복제 시도. 지원하지 않는 OS/파일시스템이면 False"""
+    if sys.platform.startswith("linux"):
+        import fcntl
+        try:
+            with open(src, "rb") as fs, open(dst, "wb") as fd:
+                fcntl.ioctl(fd.fileno(), _FICLONE, fs.fileno())
+        except OSError:
+            if os.path.exists(dst):
+                os.remove(dst)
+            return False
+        shutil.copystat(src, dst)
+        return True
+    if sys.platform == "darwin":
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+    return False
+
+
+def is_up_to_date(src: str, dst: str) -> bool:
+    """dst가 src와 같은 파일(같은 inode) 또는 같은 크기+mtime인지"""
+    if not os.path.exists(dst):
+        return False
+    if os.path.samefile(src, dst):
+        return True
+    s, d = os.stat(src), os.stat(dst)
+    return s.st_size == d.st_size and abs(s.st_mtime_ns - d.st_mtime_ns) <= MTIME_TOLERANCE_NS
+
+
+def materialize(src: str, dst: str, mode: str = "auto") -> str:
+    """src → dst 배치. 반환: "unchanged" / "reflink" / "hardlink" / "copy"
+
+    auto는 조용히 다음 방식으로 넘어가고, reflink/hardlink를 직접 지정했는데 안 되면
+    [WARN]을 출력한 뒤 복사한다 (요청한 링크/CoW가 아니라 디스크를 더 씀).
+    """
+    if is_up_to_date(src, dst):
+        return "unchanged"
+
+    tmp = f"{dst}.{os.getpid()}.tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    action, reason = None, None
+    if mode in ("auto", "reflink"):
+        if _reflink(src, tmp):
+            action = "reflink"
+        else:
+            reason = "filesystem does not support reflink"
+    if action is None and mode in ("auto", "hardlink"):
+        try:
+            os.link(src, tmp)
+            action = "hardlink"
+        except OSError as e:
+            reason = e.strerror or str(e)
+    if action is None:
+        if mode in ("reflink", "hardlink"):
+            print(f"  [WARN] --mode {mode} failed for {os.path.basename(dst)} ({reason}) -- copied instead")
+        shutil.copy2(src, tmp)
+        action = "copy"
+
+    os.replace(tmp, dst)
+    return action
+
+
+def write_text_if_changed(path: str, text: str) -> bool:
+    """내용이 다를 때만 쓰기 (캡션 등). 썼으면 True"""
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return False
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return True
+
+
+def prune_dir(directory: str, keep: set[str], extensions: tuple[str, ...] = (".png", ".txt")) -> list[str]:
+    """directory 안에서 keep에 없는 관리 대상 파일(extensions) 삭제 → 지운 파일 이름 목록"""
+    removed = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name not in keep and name.endswith(extensions) and os.path.isfile(path):
+            os.remove(path)
+            removed.append(name)
+    return removed
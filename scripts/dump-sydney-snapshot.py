@@ -1,17 +1,46 @@
 """
-Dump full Sydney Supabase data to local JSON snapshot before project deletion.
+Dump full Sydney Supabase data to local JSONL snapshot before project deletion.
 
 Reads Sydney connection from .env.backup-pre-seoul.
-Writes one JSON file per table to .backups/sydney-2026-05-06/.
+Writes one JSON Lines file per table to .backups/sydney-full-<timestamp>/
+(the original pre-deletion dump is .backups/sydney-2026-05-06/).
+
+Usage:
+    python scripts/dump-sydney-snapshot.py                      # {table}.jsonl
+    python scripts/dump-sydney-snapshot.py --compress gzip      # {table}.jsonl.gz
+    python scripts/dump-sydney-snapshot.py --compress zstd --workers 8
+    python scripts/dump-sydney-snapshot.py --since .backups/sydney-2026-05-06   # delta
+
+Rows are streamed through a server-side (named) cursor, ITERSIZE rows per
+round trip, and written line by line -- memory stays flat regardless of
+table size. Tables are dumped in parallel, largest first, each worker on its
+own connection sharing one exported snapshot, so all files describe the
+same point in time. _manifest.json records rows, bytes and SHA-256 per file.
+
+Incremental (--since PREV): every manifest records a per-table high-water
+mark (max of updatedAt, else createdAt, else an integer id) and the primary
+key. A delta dump only writes rows whose mark is >= PREV's mark minus
+--overlap-minutes (default 10), and links back to PREV via "base"; rows seen
+twice are folded by key. The overlap covers transactions that commit after
+PREV was taken with an updatedAt/createdAt set earlier (the timestamp is the
+statement time, not the commit time) -- a transaction open longer than the
+overlap can still be missed, as can late commits of integer-id marks, which
+get no overlap. Tables without a mark or key are dumped in full. Deletes are
+not captured -- take a periodic full dump.
+Fold a delta chain into a new base with compact-snapshots.py.
 """
+import argparse
 import json
+import os
 import re
 import sys
-from datetime import datetime, date
-from decimal import Decimal
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
 from pathlib import Path
-from uuid import UUID
 import psycopg
+from psycopg import sql
+
+from snapshot_io import SUFFIXES, JsonlWriter, check_compression, decode, encode
 
 sys.stdout.reconfigure(encoding="utf-8")
 
@@ -21,76 +50,217 @@ OLD_URL = re.search(
     (ROOT / ".env.backup-pre-seoul").read_text(encoding="utf-8"),
 ).group(1)
 
-OUT_DIR = ROOT / ".backups" / "sydney-2026-05-06"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
+BACKUP_DIR = ROOT / ".backups"
+FULL_DIR_FORMAT = "sydney-full-%Y%m%dT%H%M%S"
+DELTA_DIR_FORMAT = "sydney-delta-%Y%m%dT%H%M%S"
+
+# High-water mark column candidates, in order of preference
+HIGH_WATER_COLUMNS = ("updatedAt", "createdAt")
+DEFAULT_OVERLAP_MINUTES = 10
+INTEGER_TYPES = ("smallint", "integer", "bigint")
+
+ITERSIZE = 5000
+DEFAULT_WORKERS = 4
+
+
+def list_tables(cur):
+    """public tables, largest first (so big tables start dumping early)"""
+    cur.execute(
+        """
+        SELECT t.table_name
+        FROM information_schema.tables t
+        LEFT JOIN pg_class c
+          ON c.relname = t.table_name
+         AND c.relnamespace = 'public'::regnamespace
+        WHERE t.table_schema='public'
+        ORDER BY pg_total_relation_size(c.oid) DESC NULLS LAST, t.table_name
+        """
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def get_columns(cur, table):
+    """column -> data_type, in ordinal order"""
+    cur.execute(
+        """
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_schema='public' AND table_name=%s
+        ORDER BY ordinal_position
+        """,
+        (table,),
+    )
+    return dict(cur.fetchall())
+
+
+def get_primary_key(cur, table):
+    cur.execute(
+        """
+        SELECT a.attname
+        FROM pg_index i
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+        WHERE i.indrelid = format('public.%%I', %s::text)::regclass AND i.indisprimary
+        ORDER BY k.ord
+        """,
+        (table,),
+    )
+    return [r[0] for r in cur.fetchall()] or None
+
+
+def high_water_column(types):
+    """updatedAt > createdAt > integer id (None = no usable mark)"""
+    for col in HIGH_WATER_COLUMNS:
+        if col in types:
+            return col
+    if types.get("id") in INTEGER_TYPES:
+        return "id"
+    return None
+
+
+def dump_table(snapshot_id, table, out_dir, compression, prev, overlap):
+    """Stream one table into {table}.jsonl[.gz|.zst] inside the shared snapshot.
+
+    prev: this table's entry in the --since manifest (None = full dump).
+    overlap: timedelta subtracted from a timestamp/date high-water mark.
+    """
+    out_file = out_dir / f"{table}{SUFFIXES[compression]}"
+    with psycopg.connect(OLD_URL) as conn:
+        conn.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        conn.execute(sql.SQL("SET TRANSACTION SNAPSHOT {}").format(sql.Literal(snapshot_id)))
+        with conn.cursor() as cur:
+            types = get_columns(cur, table)
+            key = get_primary_key(cur, table)
+            mark = high_water_column(types)
+            high_water = None
+            if mark:
+                cur.execute(f'SELECT max("{mark}") FROM public."{table}"')
+                value = cur.fetchone()[0]
+                if value is not None and not isinstance(value, int):
+                    value = encode(value)
+                high_water = {"column": mark, "value": value}
+
+        cols = list(types)
+        col_idents = ", ".join('"' + c.replace('"', '""') + '"' for c in cols)
+        query, params, mode, since = f'SELECT {col_idents} FROM public."{table}"', (), "full", None
+        prev_mark = (prev or {}).get("high_water") or {}
+        if key and mark and prev_mark.get("column") == mark and prev.get("key") == key:
+            mode, since = "delta", prev_mark.get("value")
+            if since is not None:
+                lower = decode(since, types[mark])
+                if isinstance(lower, (datetime, date)):
+                    lower -= overlap
+                query += f' WHERE "{mark}" >= %s'
+                params = (lower,)
 
+        with conn.cursor(name=f"dump_{table}") as cur, JsonlWriter(out_file, compression) as writer:
+            cur.itersize = ITERSIZE
+            cur.execute(query, params or None)
+            for row in cur:
+                writer.write(dict(zip(cols, row)))
+
+    info = {
+        "file": out_file.name,
+        "rows": writer.rows,
+        "bytes": writer.size,
+        "sha256": writer.sha256,
+        "key": key,
+        "high_water": high_water,
+    }
+    if prev is not None:
+        info["mode"] = mode
+        info["since"] = since
+    return info
 
-def encode(o):
-    if isinstance(o, (datetime, date)):
-        return o.isoformat()
-    if isinstance(o, Decimal):
-        return str(o)
-    if isinstance(o, UUID):
-        return str(o)
-    if isinstance(o, bytes):
-        return o.hex()
-    raise TypeError(f"unserializable: {type(o)}")
+
+def load_manifest(snapshot_dir):
+    path = Path(snapshot_dir) / "_manifest.json"
+    if not path.exists():
+        raise SystemExit(f"No _manifest.json in {snapshot_dir}")
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if "files" not in manifest:
+        raise SystemExit(f"{snapshot_dir} predates per-file manifests -- take a new full dump first")
+    return manifest
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Dump Sydney Supabase data to a JSONL snapshot")
+    parser.add_argument("--compress", choices=list(SUFFIXES), default="none",
+                        help="Per-file compression (default: none)")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Tables dumped in parallel (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--out-dir", default=None,
+                        help="Snapshot directory (default: .backups/sydney-full-<timestamp>, "
+                             "or .backups/sydney-delta-<timestamp> with --since)")
+    parser.add_argument("--since", default=None,
+                        help="Previous snapshot (full or delta) -- dump only rows changed since it")
+    parser.add_argument("--overlap-minutes", type=float, default=DEFAULT_OVERLAP_MINUTES,
+                        help="Re-read rows this far before the previous timestamp mark, for late commits "
+                             f"(default: {DEFAULT_OVERLAP_MINUTES})")
+    args = parser.parse_args()
+    check_compression(args.compress)
+
+    now = datetime.now()
+    prev_files = None
+    if args.since:
+        prev_files = load_manifest(args.since)["files"]
+        out_dir = Path(args.out_dir or BACKUP_DIR / now.strftime(DELTA_DIR_FORMAT))
+    else:
+        out_dir = Path(args.out_dir or BACKUP_DIR / now.strftime(FULL_DIR_FORMAT))
+    overlap = timedelta(minutes=args.overlap_minutes)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
     print(f"Source: {OLD_URL.split('@')[1].split('/')[0]}")
-    print(f"Output: {OUT_DIR}")
+    print(f"Output: {out_dir}")
     print()
 
-    summary = {}
+    files = {}
+    # Holding this transaction open keeps the exported snapshot valid for the workers
     with psycopg.connect(OLD_URL) as conn, conn.cursor() as cur:
-        cur.execute(
-            """
-            SELECT table_name FROM information_schema.tables
-            WHERE table_schema='public' ORDER BY table_name
-            """
-        )
-        tables = [r[0] for r in cur.fetchall()]
-
-        for table in tables:
-            cur.execute(
-                """
-                SELECT column_name FROM information_schema.columns
-                WHERE table_schema='public' AND table_name=%s
-                ORDER BY ordinal_position
-                """,
-                (table,),
-            )
-            cols = [r[0] for r in cur.fetchall()]
-            col_idents = ", ".join('"' + c.replace('"', '""') + '"' for c in cols)
-            cur.execute(f'SELECT {col_idents} FROM public."{table}";')
-            rows = cur.fetchall()
-
-            data = [dict(zip(cols, row)) for row in rows]
-            out_file = OUT_DIR / f"{table}.json"
-            out_file.write_text(
-                json.dumps(data, default=encode, ensure_ascii=False, indent=2),
-                encoding="utf-8",
-            )
-            summary[table] = len(rows)
-            print(f"  {table:24s} {len(rows):4d} rows -> {out_file.name}")
+        cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        tables = list_tables(cur)
+        cur.execute("SELECT pg_export_snapshot()")
+        snapshot_id = cur.fetchone()[0]
+
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            futures = {
+                pool.submit(dump_table, snapshot_id, table, out_dir, args.compress,
+                            None if prev_files is None else prev_files.get(table, {}), overlap): table
+                for table in tables
+            }
+            for fut in as_completed(futures):
+                table = futures[fut]
+                files[table] = info = fut.result()
+                mode = f" ({info['mode']})" if "mode" in info else ""
+                print(f"  {table:24s} {info['rows']:4d} rows -> {info['file']}{mode}")
+
+    files = dict(sorted(files.items()))
+    summary = {table: info["rows"] for table, info in files.items()}
 
     # Manifest
     manifest = {
-        "snapshot_date": "2026-05-06",
+        "snapshot_date": now.date().isoformat(),
+        "created_at": now.isoformat(timespec="seconds"),
+        "kind": "delta" if args.since else "full",
         "source_project_id": "afdfkpxsfuyccdvrkqwu",
         "source_region": "ap-southeast-2",
         "source_host": OLD_URL.split("@")[1].split("/")[0],
+        "format": "jsonl",
+        "compression": args.compress,
         "tables": summary,
+        "files": files,
         "total_rows": sum(summary.values()),
-        "purpose": "pre-deletion safety snapshot of Sydney Supabase project",
+        "purpose": "full snapshot of Sydney Supabase project",
     }
-    (OUT_DIR / "_manifest.json").write_text(
+    if args.since:
+        manifest["base"] = os.path.relpath(args.since, out_dir)
+        manifest["overlap_minutes"] = args.overlap_minutes
+        manifest["purpose"] = "incremental backup (rows changed since base)"
+    (out_dir / "_manifest.json").write_text(
         json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8"
     )
 
     print(f"\nTotal: {manifest['total_rows']} rows across {len(summary)} tables")
-    print(f"Manifest: {OUT_DIR / '_manifest.json'}")
+    print(f"Manifest: {out_dir / '_manifest.json'}")
 
 
 if __name__ == "__main__":
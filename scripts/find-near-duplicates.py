@@ -0,0 +1,85 @@
+"""
+학습 데이터 근접 중복 탐지 — pHash/dHash 해밍 거리 클러스터 (image_phash.py)
+
+데이터셋 폴더(또는 glob)의 이미지를 알파 합성 + 축소 후 64bit 지각 해시로 인덱싱하고,
+BK-tree 반경 탐색으로 거의 같은 이미지 묶음을 출력한다.
+해시는 .phash-cache.json에 캐시 → 바뀐 이미지만 다시 디코딩.
+
+사용법:
+  python scripts/find-near-duplicates.py C:/Users/User/sd-scripts/train_data/chibi_v2_per_char -r
+  python scripts/find-near-duplicates.py "C:/Users/User/ComfyUI/output/regen*/*.png" --threshold 6
+  python scripts/find-near-duplicates.py DIR --json dups.json --fail   # 중복 있으면 exit 1
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+from image_phash import (
+    DEFAULT_CACHE, DHASH_THRESHOLD, IMAGE_EXTENSIONS, PHASH_THRESHOLD,
+    cluster_members, compute_hashes, find_clusters,
+)
+
+sys.stdout.reconfigure(encoding="utf-8")
+
+
+def collect_images(patterns: list[str], recursive: bool) -> list[str]:
+    """폴더 또는 glob 패턴 → 이미지 경로 목록"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "**", "*") if recursive else os.path.join(pattern, "*")
+        paths += glob.glob(pattern, recursive=recursive)
+    return sorted({p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(p)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate training images by perceptual hash")
+    parser.add_argument("paths", nargs="+", help="Dataset folders or glob patterns")
+    parser.add_argument("-r", "--recursive", action="store_true", help="Include subfolders")
+    parser.add_argument("--threshold", type=int, default=PHASH_THRESHOLD,
+                        help=f"Max pHash Hamming distance (default: {PHASH_THRESHOLD}/64)")
+    parser.add_argument("--dhash-threshold", type=int, default=DHASH_THRESHOLD,
+                        help=f"Max dHash Hamming distance to confirm a pair (default: {DHASH_THRESHOLD}/64)")
+    parser.add_argument("--workers", type=int, default=8, help="Image decode threads")
+    parser.add_argument("--no-cache", action="store_true", help=f"Ignore {os.path.basename(DEFAULT_CACHE)}")
+    parser.add_argument("--json", default=None, help="Write clusters to this JSON file")
+    parser.add_argument("--fail", action="store_true", help="Exit 1 if any cluster is found")
+    args = parser.parse_args()
+
+    paths = collect_images(args.paths, args.recursive)
+    if not paths:
+        print("No images found")
+        sys.exit(1)
+
+    start = time.time()
+    hashes = compute_hashes(paths, None if args.no_cache else DEFAULT_CACHE, args.workers)
+    clusters = find_clusters(hashes, args.threshold, args.dhash_threshold)
+    print(f"Indexed {len(hashes)} images in {time.time() - start:.1f}s "
+          f"(pHash <= {args.threshold}, dHash <= {args.dhash_threshold})")
+
+    for n, cluster in enumerate(clusters, 1):
+        members = cluster_members(cluster)
+        print(f"\n[DUP {n}] {len(members)} images")
+        for path in members:
+            print(f"  {path}")
+        for a, b, dist in sorted(cluster, key=lambda pair: pair[2]):
+            print(f"    {dist:2d}  {os.path.basename(a)} ~ {os.path.basename(b)}")
+
+    duplicates = sum(len(cluster_members(c)) - 1 for c in clusters)
+    print(f"\n{len(clusters)} clusters, {duplicates} redundant images")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([
+                {"members": cluster_members(c), "pairs": [{"a": a, "b": b, "distance": d} for a, b, d in c]}
+                for c in clusters
+            ], f, indent=2, ensure_ascii=False)
+    if args.fail and clusters:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
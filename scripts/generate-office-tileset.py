@@ -5,9 +5,14 @@ Office Tileset Generator — ComfyUI로 오피스 테마 타일 개별 생성 
   python scripts/generate-office-tileset.py --generate   # ComfyUI로 개별 타일 생성
   python scripts/generate-office-tileset.py --assemble    # 타일셋 시트 조립
   python scripts/generate-office-tileset.py --all         # 생성 + 조립
+  python scripts/generate-office-tileset.py --check-seams # 기존 바닥 타일 이음새 검사/보정
+
+바닥 타일(floor_*)은 생성 직후 이음새(seam) 검사 → 실패 시 offset-and-blend 보정 →
+그래도 실패하면 rejected/ 로 옮기고 새 seed로 재큐잉 (최대 SEAM_MAX_RETRIES회).
 
 출력:
   ComfyUI/output/tileset/individual/  — 개별 타일 (512x512)
+  ComfyUI/output/tileset/rejected/    — 이음새 검사 탈락 타일
   ComfyUI/output/tileset/office_tileset.png — 완성 타일셋 (512x448, 16x14 grid, 32x32 per tile)
 """
 
@@ -18,11 +23,13 @@ import sys
 import time
 import urllib.request
 import urllib.error
-from PIL import Image
+import numpy as np
+from PIL import Image, ImageChops
 
 COMFYUI_URL = "http://localhost:8000"
 OUTPUT_DIR = "C:/Users/User/ComfyUI/output/tileset"
 INDIVIDUAL_DIR = os.path.join(OUTPUT_DIR, "individual")
+REJECTED_DIR = os.path.join(OUTPUT_DIR, "rejected")
 
 TILE_SIZE = 32
 TILESET_COLS = 16
@@ -30,6 +37,13 @@ TILESET_ROWS = 14
 TILESET_W = TILESET_COLS * TILE_SIZE  # 512
 TILESET_H = TILESET_ROWS * TILE_SIZE  # 448
 
+# 바닥 타일 이음새 검사
+FLOOR_PREFIX = "floor_"
+SEAM_THRESHOLD = 1.5      # wrap 경계 차이 / 내부 인접 차이 — 1.0 근처면 이음새 없음
+SEAM_MAX_RETRIES = 3      # 보정 후에도 실패 시 새 seed로 재생성하는 최대 횟수
+SEAM_BLEND_POWER = 2.0    # offset 블렌드 마스크 지수 — 클수록 원본 중앙 영역 보존
+RESIZE_WRAP_PAD = 3       # 타일러블 리사이즈 시 wrap 패딩 (출력 px 기준, LANCZOS 커널 반경)
+
 # Animagine XL 설정
 CHECKPOINT = "animagineXL31_v31.safetensors"
 QUALITY_TAGS = "masterpiece, best quality, very aesthetic, absurdres"
@@ -182,6 +196,100 @@ def wait_for_completion(prompt_id: str, timeout: int = 120) -> bool:
     return False
 
 
+def is_floor_tile(name: str) -> bool:
+    """이음새 검사 대상(바닥) 타일 여부"""
+    return name.startswith(FLOOR_PREFIX)
+
+
+def find_tile_file(name: str) -> str | None:
+    """OUTPUT_DIR에서 타일 이름으로 시작하는 첫 PNG 경로 (조립 시와 동일한 선택 규칙)"""
+    for f in sorted(os.listdir(OUTPUT_DIR)):
+        if f.startswith(name) and f.endswith(".png"):
+            return os.path.join(OUTPUT_DIR, f)
+    return None
+
+
+def seam_score(img: Image.Image) -> float:
+    """wrap 경계(마지막 행/열 → 첫 행/열) 차이를 내부 인접 픽셀 차이로 나눈 비율.
+
+    np.roll로 한 칸 민 이미지와의 차이를 한 번에 계산 — index 0이 wrap 경계.
+    1.0 근처면 타일 반복 시 이음새가 보이지 않고, 클수록 이음새가 뚜렷하다.
+    """
+    a = np.asarray(img.convert("RGB"), dtype=np.float32)
+    dy = np.abs(a - np.roll(a, 1, axis=0)).mean(axis=(1, 2))
+    dx = np.abs(a - np.roll(a, 1, axis=1)).mean(axis=(0, 2))
+    seam = (dy[0] + dx[0]) / 2
+    interior = (dy[1:].mean() + dx[1:].mean()) / 2
+    return float(seam / (interior + 1e-6))
+
+
+def make_seamless(img: Image.Image) -> Image.Image:
+    """offset-and-blend 보정: 축별로 반 타일 offset한 이미지와 원본을 거리 마스크로 합성.
+
+    offset 이미지는 가장자리가 원본 중앙이므로 wrap이 연속이지만, 원본의 wrap 경계가
+    중앙선(h//2 행 / w//2 열)으로 옮겨 간다. 세로 → 가로 순서로 한 축씩 합성하고 마스크는
+    그 축의 가장자리에서 1(offset), 중앙선에서 0(원본)이라 wrap 경계가 연속이 되면서
+    offset 이미지의 중앙 십자 이음새는 드러나지 않는다.
+    """
+    out = np.asarray(img.convert("RGBA"), dtype=np.float32)
+    for axis in (0, 1):
+        n = out.shape[axis]
+        weight = np.abs(np.linspace(-1.0, 1.0, n, dtype=np.float32)) ** SEAM_BLEND_POWER
+        mask = weight[:, None, None] if axis == 0 else weight[None, :, None]
+        out = out * (1.0 - mask) + np.roll(out, n // 2, axis=axis) * mask
+    return Image.fromarray(np.clip(out + 0.5, 0, 255).astype(np.uint8), "RGBA")
+
+
+def resize_tileable(img: Image.Image, size: int) -> Image.Image:
+    """wrap 패딩 후 리사이즈 → 중앙 crop. 가장자리 필터가 반대편 픽셀을 참조해 이음새가 생기지 않음"""
+    a = np.asarray(img.convert("RGBA"))
+    h, w = a.shape[:2]
+    pad_y = round(RESIZE_WRAP_PAD * h / size)
+    pad_x = round(RESIZE_WRAP_PAD * w / size)
+    padded = np.pad(a, ((pad_y, pad_y), (pad_x, pad_x), (0, 0)), mode="wrap")
+    big = size + 2 * RESIZE_WRAP_PAD
+    resized = Image.fromarray(padded, "RGBA").resize((big, big), Image.LANCZOS)
+    return resized.crop((RESIZE_WRAP_PAD, RESIZE_WRAP_PAD, RESIZE_WRAP_PAD + size, RESIZE_WRAP_PAD + size))
+
+
+def verify_floor_tile(name: str, path: str) -> bool:
+    """바닥 타일 이음새 검사 + 보정. 통과 시 파일을 보정본으로 덮어쓰고 True, 탈락 시 rejected/로 이동"""
+    img = Image.open(path).convert("RGBA")
+    score = seam_score(img)
+    if score <= SEAM_THRESHOLD:
+        print(f"  [SEAM OK] {name} score={score:.2f}")
+        return True
+
+    fixed = make_seamless(img)
+    # 보정본은 wrap 경계뿐 아니라 offset 이미지가 남길 수 있는 중앙선(h//2, w//2)도 검사
+    w, h = fixed.size
+    fixed_score = max(seam_score(fixed), seam_score(ImageChops.offset(fixed, w // 2, h // 2)))
+    if fixed_score <= SEAM_THRESHOLD:
+        fixed.save(path)
+        print(f"  [SEAM FIXED] {name} score={score:.2f} -> {fixed_score:.2f}")
+        return True
+
+    os.makedirs(REJECTED_DIR, exist_ok=True)
+    os.replace(path, os.path.join(REJECTED_DIR, os.path.basename(path)))
+    print(f"  [SEAM REJECT] {name} score={score:.2f} -> {fixed_score:.2f} (moved to rejected/)")
+    return False
+
+
+def check_seams():
+    """이미 생성된 바닥 타일 일괄 검사 — 탈락분은 rejected/로 이동되어 다음 --generate에서 재생성"""
+    rejected = 0
+    for name, _prompt, _col, _row in OFFICE_TILES:
+        if not is_floor_tile(name):
+            continue
+        path = find_tile_file(name)
+        if path is None:
+            print(f"  [MISSING] {name}")
+            continue
+        if not verify_floor_tile(name, path):
+            rejected += 1
+    print(f"\n[DONE] Seam check — rejected: {rejected}")
+
+
 def generate_tiles():
     """ComfyUI로 개별 타일 이미지 생성"""
     os.makedirs(INDIVIDUAL_DIR, exist_ok=True)
@@ -194,16 +302,28 @@ def generate_tiles():
             print(f"[{i+1}/{total}] SKIP {name} (already exists)")
             continue
 
-        print(f"[{i+1}/{total}] Generating {name}...")
-        prompt_id = enqueue_workflow(prompt, name, seed=42 + i)
-        if not prompt_id:
-            print(f"  [FAIL] Could not queue {name}")
-            continue
+        # 바닥 타일은 이음새 검사 탈락 시 seed를 바꿔 재큐잉
+        attempts = 1 + (SEAM_MAX_RETRIES if is_floor_tile(name) else 0)
+        for attempt in range(attempts):
+            seed = 42 + i + attempt * 1000
+            print(f"[{i+1}/{total}] Generating {name} (seed={seed})...")
+            prompt_id = enqueue_workflow(prompt, name, seed=seed)
+            if not prompt_id:
+                print(f"  [FAIL] Could not queue {name}")
+                break
+
+            if not wait_for_completion(prompt_id, timeout=180):
+                print(f"  [TIMEOUT] {name}")
+                break
 
-        if wait_for_completion(prompt_id, timeout=180):
             print(f"  [OK] {name}")
+            if not is_floor_tile(name):
+                break
+            path = find_tile_file(name)
+            if path is None or verify_floor_tile(name, path):
+                break
         else:
-            print(f"  [TIMEOUT] {name}")
+            print(f"  [GIVE UP] {name} — seam check failed {attempts} times")
 
 
 def assemble_tileset():
@@ -235,6 +355,10 @@ def assemble_tileset():
             print(f"  [MISSING] {name} at ({col},{row}) — using default")
             tile_img = default_floor
             missing += 1
+        elif is_floor_tile(name):
+            # 바닥: wrap 패딩 리사이즈로 축소 시에도 가장자리 연속 유지
+            tile_img = resize_tileable(tile_img, TILE_SIZE)
+            placed += 1
         else:
             # 512x512 → 32x32 리사이즈
             tile_img = tile_img.resize((TILE_SIZE, TILE_SIZE), Image.LANCZOS)
@@ -267,16 +391,20 @@ def main():
     parser.add_argument("--generate", action="store_true", help="Generate tiles with ComfyUI")
     parser.add_argument("--assemble", action="store_true", help="Assemble tileset from generated tiles")
     parser.add_argument("--all", action="store_true", help="Generate + assemble")
+    parser.add_argument("--check-seams", action="store_true", help="Seam-check/fix existing floor tiles")
     args = parser.parse_args()
 
+    if args.check_seams:
+        check_seams()
+
     if args.all or args.generate:
         generate_tiles()
 
     if args.all or args.assemble:
         assemble_tileset()
 
-    if not (args.generate or args.assemble or args.all):
-        print("Usage: --generate, --assemble, or --all")
+    if not (args.generate or args.assemble or args.all or args.check_seams):
+        print("Usage: --generate, --assemble, --all, or --check-seams")
 
 
 if __name__ == "__main__":
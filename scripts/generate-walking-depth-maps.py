@@ -2,39 +2,78 @@
 걷기 포즈 depth map 생성 스크립트
 기존 서있는 depth map에서 다리 영역을 변형하여 걷기 프레임 생성
 
-프레임 구조 (4프레임 걷기 사이클):
-  frame1: 서기 (기존 depth map)
-  frame2: 왼발 앞, 오른발 뒤
-  frame3: 서기 (frame1과 동일)
-  frame4: 오른발 앞, 왼발 뒤 (frame2의 좌우반전)
+NumPy 전용 파이프라인:
+  - 다리 갈라짐 지점(leg split)은 base map당 한 번, 행 단위 벡터 연산으로 계산
+  - 상체/다리 레이어를 stride 곡선(sin)에 따라 이동시켜 N프레임을 (N, H, W) 배열로 한 번에 합성
+  - 레이어 합성은 max (depth: 가까울수록 밝음 → z-buffer 합성과 동일)
+
+프레임 구조 (N프레임 걷기 사이클, 기본 N = generate-walking-frames.py의 SPRITE_COLS):
+  stride s_k = sin(2πk/N)
+  s = 0: 서기 (기존 depth map)
+  s > 0: 왼발 앞, 오른발 뒤
+  s < 0: 오른발 앞, 왼발 뒤
+  N=4이면 frame1 서기 / frame2 왼발 앞 / frame3 서기 / frame4 오른발 앞 (기존 레이아웃과 동일)
 
 방향별:
   front/back: 다리를 좌우로 벌림 (정면에서 보이는 걷기)
   left: 다리를 앞뒤로 벌림 (측면에서 보이는 걷기)
+
+사용법:
+  python scripts/generate-walking-depth-maps.py              # 스프라이트 생성기와 같은 프레임 수
+  python scripts/generate-walking-depth-maps.py --frames 8
 """
+import argparse
+import ast
 import sys
 sys.stdout.reconfigure(encoding='utf-8')
 
-from PIL import Image, ImageDraw, ImageFilter
+from PIL import Image
 import numpy as np
 import os
 
 INPUT_DIR = "C:/Users/User/ComfyUI/input/depth_maps"
 OUTPUT_DIR = "C:/Users/User/ComfyUI/input/depth_maps/walk"
 
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+# 방향별 base depth map / 다리 벌림 방식
+DIRECTIONS = {
+    "front": ("front.png", "spread"),
+    "back": ("back_shifted.png", "spread"),
+    "left": ("left.png", "stride"),
+}
 
 # ─── 걷기 파라미터 ───────────────────────────────────
 LEG_SPREAD_PX = 18       # front/back: 다리 좌우 벌림 (px)
 LEG_STRIDE_PX = 22       # left: 다리 앞뒤 벌림 (px)
 BODY_BOB_PX = 6          # 걸을 때 몸 위아래 흔들림
+FG_THRESHOLD = 20        # 이 값 초과 = 전경 (검정 배경 제외)
+
+DEFAULT_FRAMES = 4
+SPRITE_GENERATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "generate-walking-frames.py")
+
+
+def sprite_frame_count() -> int:
+    """generate-walking-frames.py의 SPRITE_COLS (스프라이트 걷기 프레임 수). 실행 없이 AST로 읽음"""
+    try:
+        with open(SPRITE_GENERATOR, encoding="utf-8") as f:
+            tree = ast.parse(f.read())
+    except OSError:
+        return DEFAULT_FRAMES
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == "SPRITE_COLS" for t in node.targets
+        ):
+            return int(ast.literal_eval(node.value))
+    return DEFAULT_FRAMES
+
 
+def load_depth(path: str) -> np.ndarray:
+    """depth map → (H, W) uint8 (그레이스케일)"""
+    return np.asarray(Image.open(path).convert("L"))
 
-def find_body_bounds(img_array):
+
+def find_body_bounds(depth: np.ndarray):
     """이미지에서 비검정 영역의 bounding box 찾기"""
-    mask = img_array > 20  # 검정(0)이 아닌 영역
-    if mask.ndim == 3:
-        mask = mask.any(axis=2)
+    mask = depth > FG_THRESHOLD
     rows = np.any(mask, axis=1)
     cols = np.any(mask, axis=0)
     rmin, rmax = np.where(rows)[0][[0, -1]]
@@ -42,153 +81,134 @@ def find_body_bounds(img_array):
     return rmin, rmax, cmin, cmax
 
 
-def find_leg_split(img_array, body_bottom):
-    """다리 영역 시작점 찾기 (몸통 하단에서 다리가 갈라지는 지점)"""
-    if img_array.ndim == 3:
-        gray = img_array[:, :, 0]
-    else:
-        gray = img_array
+def find_leg_split(depth: np.ndarray, body_bottom: int) -> int:
+    """다리 영역 시작점 찾기 (몸통 하단에서 다리가 갈라지는 지점).
 
-    # 몸통 하단 40% 영역에서 수직 가운데 gap 찾기
-    h = body_bottom - int(body_bottom * 0.6)
+    몸통 하단 40% 구간의 모든 행을 한 번에 검사: 행의 좌우 끝 중앙 ±3px이 어둡고
+    폭이 20px 초과인 첫 행.
+    """
     search_start = int(body_bottom * 0.6)
-
-    for y in range(search_start, body_bottom):
-        row = gray[y, :]
-        lit = np.where(row > 20)[0]
-        if len(lit) < 2:
-            continue
-        center = (lit[0] + lit[-1]) // 2
-        # 가운데 영역이 어두우면 다리 갈라진 지점
-        center_val = gray[y, center-3:center+3].mean() if center > 3 else 0
-        if center_val < 30 and (lit[-1] - lit[0]) > 20:
-            return y
+    band = depth[search_start:body_bottom].astype(np.float32)
+    if band.size == 0:
+        return int(body_bottom * 0.7)
+
+    lit = band > FG_THRESHOLD
+    has_lit = lit.sum(axis=1) >= 2
+    first = np.argmax(lit, axis=1)
+    last = band.shape[1] - 1 - np.argmax(lit[:, ::-1], axis=1)
+    center = (first + last) // 2
+
+    # 가운데 영역이 어두우면 다리 갈라진 지점
+    offsets = np.arange(-3, 3)
+    cols = np.clip(center[:, None] + offsets[None, :], 0, band.shape[1] - 1)
+    center_val = np.take_along_axis(band, cols, axis=1).mean(axis=1)
+    center_val[center <= 3] = 0
+
+    hits = has_lit & (center_val < 30) & ((last - first) > 20)
+    if hits.any():
+        return search_start + int(np.argmax(hits))
 
     # 못 찾으면 하단 30% 지점
     return int(body_bottom * 0.7)
 
 
-def create_front_back_walk(base_path, direction, spread_px=LEG_SPREAD_PX):
-    """front/back 걷기: 다리를 좌우로 벌림"""
-    img = Image.open(base_path).convert("RGBA")
-    arr = np.array(img)
+def stride_curve(n_frames: int) -> np.ndarray:
+    """걷기 사이클 stride 곡선 s_k = sin(2πk/N) ∈ [-1, 1] — 0은 서기"""
+    s = np.sin(2 * np.pi * np.arange(n_frames) / n_frames)
+    s[np.isclose(s, 0.0, atol=1e-9)] = 0.0
+    return s
 
-    rmin, rmax, cmin, cmax = find_body_bounds(arr[:, :, :3])
-    leg_y = find_leg_split(arr[:, :, 0], rmax)
 
-    # 상체 (다리 위)
-    upper = img.crop((0, 0, img.width, leg_y))
-    # 왼쪽 다리
-    center_x = (cmin + cmax) // 2
-    left_leg = img.crop((cmin, leg_y, center_x, img.height))
-    # 오른쪽 다리
-    right_leg = img.crop((center_x, leg_y, cmax + 1, img.height))
-
-    frames = {}
-
-    # frame1, frame3: 서기 (원본)
-    frames["frame1"] = img.copy()
-    frames["frame3"] = img.copy()
-
-    # frame2: 왼발 왼쪽, 오른발 오른쪽 (벌림) + 약간 위로 밥
-    f2 = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    f2.paste(upper, (0, -BODY_BOB_PX), upper)
-    f2.paste(left_leg, (cmin - spread_px, leg_y - BODY_BOB_PX), left_leg)
-    f2.paste(right_leg, (center_x + spread_px, leg_y - BODY_BOB_PX), right_leg)
-    frames["frame2"] = f2
-
-    # frame4: 반대 (오른발 왼쪽, 왼발 오른쪽) + 약간 위로 밥
-    f4 = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    f4.paste(upper, (0, -BODY_BOB_PX), upper)
-    f4.paste(left_leg, (cmin + spread_px, leg_y - BODY_BOB_PX), left_leg)
-    f4.paste(right_leg, (center_x - spread_px, leg_y - BODY_BOB_PX), right_leg)
-    frames["frame4"] = f4
-
-    # 저장
-    for fname, fimg in frames.items():
-        # RGBA → RGB (검정 배경)
-        bg = Image.new("RGB", fimg.size, (0, 0, 0))
-        if fimg.mode == "RGBA":
-            bg.paste(fimg, mask=fimg.split()[3])
-        else:
-            bg = fimg.convert("RGB")
-        out_path = os.path.join(OUTPUT_DIR, f"{direction}_{fname}.png")
-        bg.save(out_path)
-        print(f"  {out_path}")
+def shift_stack(layer: np.ndarray, dx: np.ndarray, dy: np.ndarray) -> np.ndarray:
+    """레이어 하나를 프레임별 (dx, dy)만큼 이동한 (N, H, W) 스택 — 인덱스 gather 한 번, 밖은 0"""
+    h, w = layer.shape
+    yy = np.arange(h)[None, :, None] - dy[:, None, None]
+    xx = np.arange(w)[None, None, :] - dx[:, None, None]
+    valid = (yy >= 0) & (yy < h) & (xx >= 0) & (xx < w)
+    out = layer[np.clip(yy, 0, h - 1), np.clip(xx, 0, w - 1)]
+    return np.where(valid, out, 0).astype(layer.dtype)
 
-    return frames
 
+def generate_walk_cycle(depth: np.ndarray, mode: str, n_frames: int) -> np.ndarray:
+    """base depth map → (N, H, W) uint8 걷기 depth 사이클.
 
-def create_left_walk(base_path, stride_px=LEG_STRIDE_PX):
-    """left 걷기: 다리를 앞뒤로 벌림"""
-    img = Image.open(base_path).convert("RGBA")
-    arr = np.array(img)
-
-    rmin, rmax, cmin, cmax = find_body_bounds(arr[:, :, :3])
-    leg_y = find_leg_split(arr[:, :, 0], rmax)
-
-    upper = img.crop((0, 0, img.width, leg_y))
-
-    # left view에서 다리는 수직으로 나란히 → 앞뒤로 벌림
-    # 다리 전체를 하나로 취급하고, 복제하여 앞뒤 배치
-    legs = img.crop((cmin, leg_y, cmax + 1, img.height))
-    leg_w = cmax - cmin + 1
-
-    frames = {}
-
-    # frame1, frame3: 서기
-    frames["frame1"] = img.copy()
-    frames["frame3"] = img.copy()
-
-    # frame2: 앞다리 왼쪽으로, 뒷다리 오른쪽으로
-    f2 = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    f2.paste(upper, (0, -BODY_BOB_PX), upper)
-    # 앞다리 (왼쪽으로 이동 = 화면에서 왼쪽 = 걷는 방향)
-    f2.paste(legs, (cmin - stride_px, leg_y - BODY_BOB_PX), legs)
-    # 뒷다리 (오른쪽으로 이동)
-    f2.paste(legs, (cmin + stride_px, leg_y - BODY_BOB_PX), legs)
-    frames["frame2"] = f2
-
-    # frame4: 반대
-    f4 = Image.new("RGBA", img.size, (0, 0, 0, 0))
-    f4.paste(upper, (0, -BODY_BOB_PX), upper)
-    f4.paste(legs, (cmin + stride_px, leg_y - BODY_BOB_PX), legs)
-    f4.paste(legs, (cmin - stride_px, leg_y - BODY_BOB_PX), legs)
-    frames["frame4"] = f4
-
-    for fname, fimg in frames.items():
-        bg = Image.new("RGB", fimg.size, (0, 0, 0))
-        if fimg.mode == "RGBA":
-            bg.paste(fimg, mask=fimg.split()[3])
-        else:
-            bg = fimg.convert("RGB")
-        out_path = os.path.join(OUTPUT_DIR, f"left_{fname}.png")
-        bg.save(out_path)
-        print(f"  {out_path}")
+    mode "spread": 왼/오른 다리를 좌우로 반대 방향 이동 (front/back)
+    mode "stride": 다리 전체를 복제해 앞뒤로 벌림 (left)
+    """
+    rmin, rmax, cmin, cmax = find_body_bounds(depth)
+    leg_y = find_leg_split(depth, rmax)
 
-    return frames
+    s = stride_curve(n_frames)
+    standing = s == 0
+    bob = np.where(standing, 0, -np.rint(BODY_BOB_PX * np.abs(s))).astype(np.int64)
+    zero = np.zeros(n_frames, dtype=np.int64)
+
+    # 상체 (다리 위)
+    upper = np.zeros_like(depth)
+    upper[:leg_y] = depth[:leg_y]
+    layers = [shift_stack(upper, zero, bob)]
+
+    if mode == "spread":
+        center_x = (cmin + cmax) // 2
+        left_leg = np.zeros_like(depth)
+        left_leg[leg_y:, cmin:center_x] = depth[leg_y:, cmin:center_x]
+        right_leg = np.zeros_like(depth)
+        right_leg[leg_y:, center_x:cmax + 1] = depth[leg_y:, center_x:cmax + 1]
+
+        dx = np.rint(LEG_SPREAD_PX * s).astype(np.int64)
+        layers.append(shift_stack(left_leg, -dx, bob))
+        layers.append(shift_stack(right_leg, dx, bob))
+    else:
+        # left view에서 다리는 수직으로 나란히 → 같은 다리를 복제해 앞뒤로 벌림
+        legs = np.zeros_like(depth)
+        legs[leg_y:, cmin:cmax + 1] = depth[leg_y:, cmin:cmax + 1]
 
+        dx = np.rint(LEG_STRIDE_PX * s).astype(np.int64)
+        layers.append(shift_stack(legs, -dx, bob))
+        layers.append(shift_stack(legs, dx, bob))
 
-def main():
-    print("=== 걷기 depth map 생성 ===\n")
+    frames = np.maximum.reduce(layers)
+    # 서기 프레임은 원본 그대로
+    frames[standing] = depth
+    return frames
 
-    print("[front]")
-    create_front_back_walk(
-        os.path.join(INPUT_DIR, "front.png"), "front"
-    )
 
-    print("\n[back]")
-    create_front_back_walk(
-        os.path.join(INPUT_DIR, "back_shifted.png"), "back"
-    )
+def save_cycle(frames: np.ndarray, direction: str, output_dir: str) -> list[str]:
+    """(N, H, W) → {direction}_frame{k}.png (1부터, 검정 배경 RGB)"""
+    paths = []
+    for k, frame in enumerate(frames, start=1):
+        out_path = os.path.join(output_dir, f"{direction}_frame{k}.png")
+        Image.fromarray(frame, "L").convert("RGB").save(out_path)
+        paths.append(out_path)
+    return paths
 
-    print("\n[left]")
-    create_left_walk(
-        os.path.join(INPUT_DIR, "left.png")
-    )
 
-    print(f"\n완료! {OUTPUT_DIR} 에 12개 파일 생성")
-    print("frame1/frame3 = 서기 (원본), frame2/frame4 = 걷기")
+def main():
+    default_frames = sprite_frame_count()
+    parser = argparse.ArgumentParser(description="Walking depth map generator")
+    parser.add_argument("--frames", type=int, default=default_frames,
+                        help=f"Frames per walk cycle (default: {default_frames}, from generate-walking-frames.py)")
+    parser.add_argument("--input-dir", default=INPUT_DIR, help="Standing depth map directory")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Output directory")
+    args = parser.parse_args()
+
+    print(f"=== 걷기 depth map 생성 ({args.frames}프레임) ===\n")
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    total = 0
+    for direction, (filename, mode) in DIRECTIONS.items():
+        print(f"[{direction}]")
+        depth = load_depth(os.path.join(args.input_dir, filename))
+        frames = generate_walk_cycle(depth, mode, args.frames)
+        for path in save_cycle(frames, direction, args.output_dir):
+            print(f"  {path}")
+        total += len(frames)
+        print()
+
+    stride = stride_curve(args.frames)
+    standing = ", ".join(f"frame{k + 1}" for k in np.where(stride == 0)[0])
+    print(f"완료! {args.output_dir} 에 {total}개 파일 생성")
+    print(f"{standing} = 서기 (원본), 나머지 = 걷기")
 
 
 if __name__ == "__main__":
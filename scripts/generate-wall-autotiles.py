@@ -0,0 +1,199 @@
+"""
+Wall Autotile Generator — 베이스 벽 텍스처 몇 장으로 47-tile blob autotile 세트 합성
+
+ComfyUI로 벽 조각(wall_top, wall_corner_tl, ...)을 하나씩 생성하는 대신,
+fill(벽 상단 면) + border(테두리/걸레받이) 텍스처를 마스크 합성해 47개 조합을 한 번에 만든다.
+47개 마스크는 (47, H, W) 배열 한 번의 브로드캐스트 연산으로 계산.
+
+사용법:
+  python scripts/generate-wall-autotiles.py                                  # tileset 출력의 wall_mid / wall_bottom 사용
+  python scripts/generate-wall-autotiles.py --fill a.png --border b.png      # 임의 텍스처
+  python scripts/generate-wall-autotiles.py --inner-corner c.png --name office_walls
+
+출력:
+  ComfyUI/output/tileset/{name}.png   — 47-tile 시트 (8x6 grid, 마지막 칸 비움)
+  ComfyUI/output/tileset/{name}.json  — Tiled 타일셋(JSON) + mixed wangset + Phaser용 256→tile 룩업
+
+Blob 비트 (cr31 규약): N=1, NE=2, E=4, SE=8, S=16, SW=32, W=64, NW=128
+대각선 비트는 인접한 두 직교 이웃이 모두 벽일 때만 유효 → 256가지 중 47가지로 축약.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+from PIL import Image
+
+OUTPUT_DIR = "C:/Users/User/ComfyUI/output/tileset"
+
+TILE_SIZE = 32
+SHEET_COLS = 8
+SUPERSAMPLE = 4          # 합성 해상도 = TILE_SIZE * SUPERSAMPLE → LANCZOS 축소로 경계 안티앨리어싱
+BORDER_RATIO = 0.1875    # 테두리 두께 (타일 대비, 32px 기준 6px)
+
+DEFAULT_FILL = "wall_mid"
+DEFAULT_BORDER = "wall_bottom"
+
+N, NE, E, SE, S, SW, W, NW = 1, 2, 4, 8, 16, 32, 64, 128
+
+# Tiled wangid 순서: top, top-right, right, bottom-right, bottom, bottom-left, left, top-left
+WANGID_BITS = (N, NE, E, SE, S, SW, W, NW)
+
+
+def reduce_blob_mask(mask: int) -> int:
+    """대각선 비트를 인접 직교 비트가 모두 있을 때만 남김"""
+    for diag, a, b in ((NE, N, E), (SE, S, E), (SW, S, W), (NW, N, W)):
+        if not (mask & a and mask & b):
+            mask &= ~diag
+    return mask
+
+
+def blob_masks() -> list[int]:
+    """47개 축약 blob 마스크 (오름차순)"""
+    return sorted({reduce_blob_mask(m) for m in range(256)})
+
+
+def resolve_texture(value: str) -> str:
+    """파일 경로 또는 tileset 출력 폴더의 타일 이름(prefix) → 실제 경로"""
+    if os.path.isfile(value):
+        return value
+    if os.path.isdir(OUTPUT_DIR):
+        for f in sorted(os.listdir(OUTPUT_DIR)):
+            if f.startswith(value) and f.endswith(".png"):
+                return os.path.join(OUTPUT_DIR, f)
+    raise FileNotFoundError(f"Texture not found: {value}")
+
+
+def load_texture(path: str, size: int) -> np.ndarray:
+    """텍스처 로드 → (size, size, 4) float32"""
+    img = Image.open(path).convert("RGBA").resize((size, size), Image.LANCZOS)
+    return np.asarray(img, dtype=np.float32)
+
+
+def build_masks(masks: list[int], size: int, border: float) -> tuple[np.ndarray, np.ndarray]:
+    """(len(masks), size, size) border/inner-corner 마스크.
+
+    빈 직교 이웃 쪽 가장자리 띠 → border, 직교 이웃은 둘 다 있는데 대각선이 빈 모서리 → inner corner.
+    """
+    m = np.asarray(masks, dtype=np.int32)[:, None, None]
+    has = {bit: (m & bit) != 0 for bit in WANGID_BITS}
+
+    coords = (np.arange(size, dtype=np.float32) + 0.5) / size
+    v = coords[None, :, None]   # 위→아래
+    u = coords[None, None, :]   # 왼→오른
+    top, bottom = v < border, v > 1.0 - border
+    left, right = u < border, u > 1.0 - border
+
+    edge = (
+        (~has[N] & top) | (~has[S] & bottom)
+        | (~has[W] & left) | (~has[E] & right)
+    )
+    inner = (
+        (has[N] & has[E] & ~has[NE] & top & right)
+        | (has[S] & has[E] & ~has[SE] & bottom & right)
+        | (has[S] & has[W] & ~has[SW] & bottom & left)
+        | (has[N] & has[W] & ~has[NW] & top & left)
+    )
+    return edge, inner & ~edge
+
+
+def compose_tiles(fill: np.ndarray, border: np.ndarray, inner_corner: np.ndarray,
+                  edge_mask: np.ndarray, inner_mask: np.ndarray) -> np.ndarray:
+    """마스크 합성 — (K, H, W, 4) uint8"""
+    e = edge_mask[..., None]
+    c = inner_mask[..., None]
+    out = np.where(e, border[None], np.where(c, inner_corner[None], fill[None]))
+    return np.clip(out + 0.5, 0, 255).astype(np.uint8)
+
+
+def assemble_sheet(tiles: np.ndarray, tile_size: int, cols: int) -> Image.Image:
+    """(K, h, w, 4) 슈퍼샘플 타일 → tile_size로 축소 후 cols 열 시트에 배치"""
+    count = tiles.shape[0]
+    rows = (count + cols - 1) // cols
+    sheet = Image.new("RGBA", (cols * tile_size, rows * tile_size), (0, 0, 0, 0))
+    for i in range(count):
+        tile = Image.fromarray(tiles[i], "RGBA").resize((tile_size, tile_size), Image.LANCZOS)
+        sheet.paste(tile, ((i % cols) * tile_size, (i // cols) * tile_size))
+    return sheet
+
+
+def build_tileset_json(name: str, image_file: str, sheet: Image.Image, masks: list[int],
+                       tile_size: int, cols: int) -> dict:
+    """Tiled 타일셋 JSON (mixed wangset 포함) + Phaser용 blobLookup"""
+    index = {m: i for i, m in enumerate(masks)}
+    wangtiles = [
+        {"tileid": i, "wangid": [1 if m & bit else 0 for bit in WANGID_BITS]}
+        for i, m in enumerate(masks)
+    ]
+    return {
+        "type": "tileset",
+        "version": "1.10",
+        "name": name,
+        "image": image_file,
+        "imagewidth": sheet.width,
+        "imageheight": sheet.height,
+        "tilewidth": tile_size,
+        "tileheight": tile_size,
+        "tilecount": len(masks),
+        "columns": cols,
+        "margin": 0,
+        "spacing": 0,
+        "wangsets": [{
+            "name": "walls",
+            "type": "mixed",
+            "tile": index[255],
+            "colors": [{"name": "wall", "color": "#ffffff", "tile": index[255], "probability": 1}],
+            "wangtiles": wangtiles,
+        }],
+        # 8-이웃 비트마스크(0~255) → 타일 인덱스. 맵 에디터/Phaser에서 그대로 조회
+        "properties": [{
+            "name": "blobLookup",
+            "type": "string",
+            "value": json.dumps([index[reduce_blob_mask(m)] for m in range(256)]),
+        }],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="47-tile blob wall autotile generator")
+    parser.add_argument("--fill", default=DEFAULT_FILL, help="Wall surface texture (path or tile name)")
+    parser.add_argument("--border", default=DEFAULT_BORDER, help="Wall edge/trim texture (path or tile name)")
+    parser.add_argument("--inner-corner", default=None, help="Inner-corner texture (default: --border)")
+    parser.add_argument("--name", default="office_walls_autotile", help="Output base name")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help="Output directory")
+    parser.add_argument("--tile-size", type=int, default=TILE_SIZE, help="Output tile size (px)")
+    parser.add_argument("--border-ratio", type=float, default=BORDER_RATIO, help="Border thickness ratio")
+    args = parser.parse_args()
+
+    work = args.tile_size * SUPERSAMPLE
+    try:
+        fill = load_texture(resolve_texture(args.fill), work)
+        border = load_texture(resolve_texture(args.border), work)
+        inner_corner = load_texture(resolve_texture(args.inner_corner), work) if args.inner_corner else border
+    except FileNotFoundError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    masks = blob_masks()
+    edge_mask, inner_mask = build_masks(masks, work, args.border_ratio)
+    tiles = compose_tiles(fill, border, inner_corner, edge_mask, inner_mask)
+    sheet = assemble_sheet(tiles, args.tile_size, SHEET_COLS)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    image_file = f"{args.name}.png"
+    sheet_path = os.path.join(args.output_dir, image_file)
+    sheet.save(sheet_path)
+
+    tileset = build_tileset_json(args.name, image_file, sheet, masks, args.tile_size, SHEET_COLS)
+    json_path = os.path.join(args.output_dir, f"{args.name}.json")
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(tileset, f, indent=2)
+
+    print(f"[DONE] {len(masks)} blob tiles -> {sheet_path} ({sheet.width}x{sheet.height})")
+    print(f"  Tileset/wangset: {json_path}")
+
+
+if __name__ == "__main__":
+    main()
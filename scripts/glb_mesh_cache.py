@@ -0,0 +1,64 @@
+"""
+glb_mesh_cache.py — GLB 파싱 결과(.npz) 캐시 + 배치 입력 수집 공용 헬퍼
+
+render-3d-views.py / render-back-view.py가 import해서 사용 (같은 scripts/ 폴더).
+캐시 키 = GLB 파일 SHA-256 + 로더 태그 → 원본이 바뀌면 자동으로 새 캐시,
+각도만 바꿔 재렌더할 때는 trimesh/Open3D 파싱과 정규화를 건너뛴다.
+
+    {cache_dir}/{sha256}.{tag}.npz   (vertices, faces, colors, ...)
+
+텍스처가 있는 메시는 UV/머티리얼 ID/텍스처 이미지도 같은 .npz에 넣어야 캐시 히트 시 텍스처가 유지됨
+(캐시 내용이 바뀌면 로더 태그를 올려 이전 캐시 무효화).
+"""
+
+import glob
+import hashlib
+import os
+
+import numpy as np
+
+CACHE_DIR_NAME = ".mesh_cache"
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """파일 SHA-256 (청크 단위 스트리밍)"""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def default_cache_dir(glb_path: str) -> str:
+    """GLB 옆 .mesh_cache/"""
+    return os.path.join(os.path.dirname(os.path.abspath(glb_path)), CACHE_DIR_NAME)
+
+
+def cache_path(glb_path: str, cache_dir: str, tag: str) -> str:
+    return os.path.join(cache_dir, f"{file_sha256(glb_path)}.{tag}.npz")
+
+
+def load_cached(path: str) -> dict[str, np.ndarray] | None:
+    """캐시 .npz → 배열 dict (없거나 손상 시 None)"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path) as data:
+            return {k: data[k] for k in data.files}
+    except (OSError, ValueError):
+        return None
+
+
+def save_cached(path: str, **arrays: np.ndarray):
+    """배열 dict → .npz (임시 파일 후 교체 — 병렬 워커 간 부분 쓰기 방지)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def collect_glbs(pattern: str) -> list[str]:
+    """폴더 또는 glob 패턴 → GLB 경로 목록"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.glb")
+    return sorted(p for p in glob.glob(pattern) if os.path.isfile(p))
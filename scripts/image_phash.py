@@ -0,0 +1,194 @@
+"""
+image_phash.py — 학습 이미지 지각 해시(pHash/dHash) + 근접 중복 클러스터링 공용 헬퍼
+
+find-near-duplicates.py / build-lora-dataset.py가 import해서 사용 (같은 scripts/ 폴더).
+seed ±100 재생성, side/side2 쌍, regen 1~3차처럼 거의 같은 이미지가 학습 폴더에 쌓이면
+스텝 낭비 + LoRA 편향 → 해밍 거리로 묶어서 큐레이션 단계에서 표시한다.
+
+    이미지 → 고정 배경(COMPOSITE_BG)에 알파 합성 → 그레이스케일
+      pHash: 32x32 → 2D DCT(행렬곱, 배치) → 저주파 8x8 > 중앙값 → 64bit
+      dHash: 9x8 → 가로 인접 픽셀 비교 → 64bit
+    클러스터: pHash BK-tree 반경 탐색 → dHash로 한 번 더 확인 → union-find
+
+해시 캐시(.phash-cache.json, 절대 경로 → 크기/mtime/해시)로 바뀐 이미지만 다시 디코딩.
+"""
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8
+PHASH_SIZE = 32
+COMPOSITE_BG = (0, 255, 0)  # 학습 이미지 green_background와 동일 — 투명/불투명 버전이 같은 해시
+
+# 64bit 중 다른 비트 수 이하면 근접 중복 (pHash로 후보, dHash로 확인)
+PHASH_THRESHOLD = 10
+DHASH_THRESHOLD = 12
+
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".phash-cache.json")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """직교 DCT-II 행렬 (n x n) — X의 2D DCT = D @ X @ D.T"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    d = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    d[0] /= np.sqrt(2)
+    return d
+
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def load_gray(path: str) -> tuple[np.ndarray, np.ndarray]:
+    """이미지 → (pHash용 32x32, dHash용 8x9) float32 그레이스케일. 알파는 COMPOSITE_BG에 합성"""
+    with Image.open(path) as img:
+        img.draft("RGB", (PHASH_SIZE * 4, PHASH_SIZE * 4))  # JPEG는 디코딩 단계에서 축소
+        if img.mode in ("RGBA", "LA", "PA") or (img.mode == "P" and "transparency" in img.info):
+            rgba = img.convert("RGBA")
+            bg = Image.new("RGBA", rgba.size, COMPOSITE_BG + (255,))
+            gray = Image.alpha_composite(bg, rgba).convert("L")
+        else:
+            gray = img.convert("L")
+    small = np.asarray(gray.resize((PHASH_SIZE, PHASH_SIZE), Image.Resampling.LANCZOS), dtype=np.float32)
+    tiny = np.asarray(gray.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS), dtype=np.float32)
+    return small, tiny
+
+
+def _pack(bits: np.ndarray) -> np.ndarray:
+    """(N, 64) bool → (N,) uint64"""
+    return np.packbits(bits.astype(np.uint8), axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def phash_batch(small: np.ndarray) -> np.ndarray:
+    """(N, 32, 32) → (N,) uint64 pHash"""
+    coeffs = _DCT @ small.astype(np.float64) @ _DCT.T
+    low = coeffs[:, :HASH_SIZE, :HASH_SIZE].reshape(len(small), -1)
+    median = np.median(low[:, 1:], axis=1, keepdims=True)  # DC 성분은 밝기라 중앙값에서 제외
+    return _pack(low > median)
+
+
+def dhash_batch(tiny: np.ndarray) -> np.ndarray:
+    """(N, 8, 9) → (N,) uint64 dHash"""
+    return _pack((tiny[:, :, 1:] > tiny[:, :, :-1]).reshape(len(tiny), -1))
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def load_cache(path: str) -> dict[str, dict]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("hash_size") != HASH_SIZE or data.get("background") != list(COMPOSITE_BG):
+        return {}
+    return data.get("files", {})
+
+
+def save_cache(path: str, files: dict[str, dict]):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"hash_size": HASH_SIZE, "background": list(COMPOSITE_BG), "files": files}, f, indent=1)
+    os.replace(tmp, path)
+
+
+def compute_hashes(paths: list[str], cache_path: str | None = DEFAULT_CACHE,
+                   workers: int = 8) -> dict[str, tuple[int, int]]:
+    """경로 → (pHash, dHash). 캐시에서 크기/mtime이 같은 항목은 재사용, 나머지만 디코딩"""
+    cache = load_cache(cache_path) if cache_path else {}
+    result = {}
+    todo = []
+    for path in dict.fromkeys(paths):
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        entry = cache.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            result[path] = (int(entry["phash"], 16), int(entry["dhash"], 16))
+        else:
+            todo.append((path, key, st))
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            loaded = list(pool.map(load_gray, [p for p, _, _ in todo]))
+        phashes = phash_batch(np.stack([s for s, _ in loaded]))
+        dhashes = dhash_batch(np.stack([t for _, t in loaded]))
+        for (path, key, st), p, d in zip(todo, phashes.tolist(), dhashes.tolist()):
+            result[path] = (p, d)
+            cache[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                          "phash": f"{p:016x}", "dhash": f"{d:016x}"}
+        if cache_path:
+            save_cache(cache_path, cache)
+    return result
+
+
+class BKTree:
+    """해밍 거리 BK-tree — 반경 r 이내 항목 탐색 시 |d(node) - d(q)| > r 인 가지는 건너뜀"""
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+
+    def add(self, value: int, item):
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            if d not in node[2]:
+                node[2][d] = [value, [item], {}]
+                return
+            node = node[2][d]
+
+    def search(self, value: int, radius: int) -> list[tuple[int, object]]:
+        """[(거리, item), ...] — 반경 이내 전부"""
+        found = []
+        stack = [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = hamming(value, node[0])
+            if d <= radius:
+                found += [(d, item) for item in node[1]]
+            stack += [child for cd, child in node[2].items() if d - radius <= cd <= d + radius]
+        return found
+
+
+def find_clusters(hashes: dict[str, tuple[int, int]], phash_threshold: int = PHASH_THRESHOLD,
+                  dhash_threshold: int = DHASH_THRESHOLD) -> list[list[tuple[str, str, int]]]:
+    """근접 중복 클러스터 (2개 이상). 각 클러스터 = [(a, b, pHash 거리), ...] 확인된 쌍 목록"""
+    tree = BKTree()
+    for path, (p, _) in hashes.items():
+        tree.add(p, path)
+
+    parent = {path: path for path in hashes}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    pairs = []
+    for a, (p, d) in hashes.items():
+        for dist, b in tree.search(p, phash_threshold):
+            if a < b and hamming(d, hashes[b][1]) <= dhash_threshold:
+                pairs.append((a, b, dist))
+                parent[find(a)] = find(b)
+
+    clusters = {}
+    for a, b, dist in pairs:
+        clusters.setdefault(find(a), []).append((a, b, dist))
+    return sorted(clusters.values(), key=lambda c: min(min(a, b) for a, b, _ in c))
+
+
+def cluster_members(cluster: list[tuple[str, str, int]]) -> list[str]:
+    return sorted({p for a, b, _ in cluster for p in (a, b)})
@@ -0,0 +1,126 @@
+"""
+image_quality.py — 학습 이미지 품질 판정 (실루엣/어두움/색상 이탈) 공용 헬퍼
+
+screen-training-images.py가 import해서 사용 (같은 scripts/ 폴더).
+regenerate-bad-images.py / regenerate-round2.py / generate-chibi-fix-dark.py 때 눈으로 찾던 불량을 수치로:
+
+    전경 마스크 = 알파 > 0 (투명 PNG) 또는 그린 스크린이 아닌 픽셀
+    마스크 안에서 (NumPy, ANALYZE_SIZE로 축소 후)
+      휘도(Rec.709) 히스토그램 / 평균 / 어두운 픽셀 비율  → silhouette, too_dark
+                                                             (기준 정면보다 확실히 어두울 때만 — 검은 머리/정장 캐릭터)
+      대표 색 팔레트(RGB 5bit 양자화 상위 K개, CIELAB)   → 기준 정면 이미지와 ΔE 거리 → color_drift
+      전경 비율                                            → empty
+"""
+
+import io
+
+import numpy as np
+from PIL import Image
+
+ANALYZE_SIZE = 256
+HIST_BINS = 16
+PALETTE_SIZE = 6
+
+# 그린 스크린 키: G가 충분히 밝고 R/B보다 확실히 큼
+GREEN_MIN = 120
+GREEN_MARGIN = 50
+
+DARK_LUMA = 60                 # 이 미만 휘도 = 어두운 픽셀
+SILHOUETTE_DARK_RATIO = 0.6    # 전경의 60% 이상이 어두우면 실루엣
+MIN_MEAN_LUMA = 80             # 전경 평균 휘도 하한
+DARK_RATIO_MARGIN = 0.2        # 기준 정면이 원래 어두우면 기준 + 이만큼까지 허용
+LUMA_MARGIN = 30               # 기준 정면 평균 휘도 - 이만큼까지 허용
+MAX_PALETTE_DISTANCE = 25.0    # 기준 정면과 팔레트 ΔE 상한 (머리/의상 색 변경)
+MIN_COVERAGE = 0.03            # 전경이 이보다 작으면 캐릭터 없음
+
+
+def load_rgba(source) -> np.ndarray:
+    """경로/bytes/PIL 이미지 → ANALYZE_SIZE 이하로 축소한 (H, W, 4) uint8"""
+    img = source if isinstance(source, Image.Image) else Image.open(
+        io.BytesIO(source) if isinstance(source, bytes) else source)
+    img = img.convert("RGBA")
+    img.thumbnail((ANALYZE_SIZE, ANALYZE_SIZE), Image.Resampling.BOX)
+    return np.asarray(img)
+
+
+def foreground_mask(rgba: np.ndarray) -> np.ndarray:
+    """(H, W) bool — 투명 배경이면 알파, 아니면 그린 스크린 키"""
+    alpha = rgba[..., 3]
+    if alpha.min() < 255:
+        return alpha > 0
+    rgb = rgba[..., :3].astype(np.int16)
+    r, g, b = rgb[..., 0], rgb[..., 1], rgb[..., 2]
+    return ~((g >= GREEN_MIN) & (g - np.maximum(r, b) >= GREEN_MARGIN))
+
+
+def rgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """(..., 3) sRGB 0-255 → CIELAB (D65)"""
+    c = rgb.astype(np.float64) / 255.0
+    c = np.where(c > 0.04045, ((c + 0.055) / 1.055) ** 2.4, c / 12.92)
+    xyz = c @ np.array([[0.4124, 0.3576, 0.1805],
+                        [0.2126, 0.7152, 0.0722],
+                        [0.0193, 0.1192, 0.9505]]).T
+    xyz /= np.array([0.95047, 1.0, 1.08883])
+    f = np.where(xyz > 0.008856, np.cbrt(xyz), 7.787 * xyz + 16 / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def dominant_palette(pixels: np.ndarray, k: int = PALETTE_SIZE) -> tuple[np.ndarray, np.ndarray]:
+    """(N, 3) 전경 픽셀 → (Lab 색 (k, 3), 비중 (k,)). 5bit 양자화 빈 상위 k개의 평균 색"""
+    q = (pixels >> 3).astype(np.int32)
+    bins = (q[:, 0] << 10) | (q[:, 1] << 5) | q[:, 2]
+    counts = np.bincount(bins, minlength=1 << 15)
+    top = np.argsort(counts)[::-1][:k]
+    top = top[counts[top] > 0]
+    sums = np.stack([np.bincount(bins, weights=pixels[:, ch], minlength=1 << 15)[top] for ch in range(3)], axis=1)
+    weights = counts[top].astype(np.float64)
+    return rgb_to_lab(sums / weights[:, None]), weights / weights.sum()
+
+
+def palette_distance(a: tuple[np.ndarray, np.ndarray], b: tuple[np.ndarray, np.ndarray]) -> float:
+    """팔레트 간 거리 — 각 색에서 상대 팔레트 최근접 ΔE의 가중 평균 (양방향 평균)"""
+    (ca, wa), (cb, wb) = a, b
+    d = np.linalg.norm(ca[:, None, :] - cb[None, :, :], axis=-1)
+    return float((d.min(axis=1) @ wa + d.min(axis=0) @ wb) / 2)
+
+
+def analyze(source) -> dict:
+    """이미지 → 지표 dict (palette는 비교용 배열, 나머지는 JSON 직렬화 가능)"""
+    rgba = load_rgba(source)
+    mask = foreground_mask(rgba)
+    pixels = rgba[..., :3][mask]
+    coverage = float(mask.mean())
+    if len(pixels) == 0:
+        return {"coverage": 0.0, "mean_luma": 0.0, "dark_ratio": 0.0,
+                "luma_hist": [0.0] * HIST_BINS, "palette": None}
+
+    luma = pixels.astype(np.float64) @ np.array([0.2126, 0.7152, 0.0722])
+    hist, _ = np.histogram(luma, bins=HIST_BINS, range=(0, 256))
+    return {
+        "coverage": round(coverage, 4),
+        "mean_luma": round(float(luma.mean()), 1),
+        "dark_ratio": round(float((luma < DARK_LUMA).mean()), 4),
+        "luma_hist": [round(float(v), 4) for v in hist / len(luma)],
+        "palette": dominant_palette(pixels),
+    }
+
+
+def judge(metrics: dict, reference: dict | None = None,
+          max_palette_distance: float = MAX_PALETTE_DISTANCE) -> list[str]:
+    """불합격 사유 목록 (빈 목록 = 통과). reference = 같은 캐릭터 정면 이미지의 analyze 결과"""
+    if metrics["coverage"] < MIN_COVERAGE:
+        return [f"empty (coverage {metrics['coverage']:.1%})"]
+    reasons = []
+    max_dark, min_luma = SILHOUETTE_DARK_RATIO, MIN_MEAN_LUMA
+    if reference is not None and reference["coverage"] >= MIN_COVERAGE:
+        max_dark = max(max_dark, reference["dark_ratio"] + DARK_RATIO_MARGIN)
+        min_luma = min(min_luma, reference["mean_luma"] - LUMA_MARGIN)
+    if metrics["dark_ratio"] >= max_dark:
+        reasons.append(f"silhouette (dark {metrics['dark_ratio']:.0%})")
+    elif metrics["mean_luma"] < min_luma:
+        reasons.append(f"too_dark (luma {metrics['mean_luma']:.0f})")
+    if reference is not None and reference.get("palette") is not None:
+        metrics["palette_distance"] = round(palette_distance(metrics["palette"], reference["palette"]), 1)
+        if metrics["palette_distance"] > max_palette_distance:
+            reasons.append(f"color_drift (ΔE {metrics['palette_distance']:.0f})")
+    return reasons
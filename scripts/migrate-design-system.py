@@ -3,16 +3,53 @@ Bulk migrate Tailwind utility classes to FlowSpace design system tokens.
 
 대상: 그룹 A(공개·인증·로비) + 그룹 B(운영자 대시보드).
 Phaser 게임 룸 내부 UI(group C)는 제외.
+
+기본(--mode classname): className="..." / className={...} / cn()·clsx() 인자 / 템플릿
+리터럴 안의 문자열만 공백으로 토큰 분리해 TOKEN_MAP(hash map)에서 조회한다. 주석, 일반
+문자열, JSX 텍스트는 건드리지 않고, `bg-gray-50`은 정확히 그 토큰일 때만 치환된다.
+
+--mode regex: REPLACEMENTS 전체를 named group alternation 정규식 하나로 컴파일(모듈 로드 시 1회)하고,
+파일당 한 번의 sub() 패스로 치환한다. 콜백이 m.lastgroup → 규칙 dict 조회로 치환값을
+고르고 규칙별 횟수를 센다. 정규식은 가장 왼쪽 매치가 이기므로 `hover:bg-gray-700`은
+안쪽의 `bg-gray-700`보다 먼저 걸려 prefix 규칙이 적용되고, 같은 위치에서는 표 순서가 우선.
+
+사용법:
+  python scripts/migrate-design-system.py --dry-run          # src/**/*.tsx 미리보기 (unified diff)
+  python scripts/migrate-design-system.py                    # 적용
+  python scripts/migrate-design-system.py --include "src/components/**/*.tsx" --exclude "**/editor/**"
+  python scripts/migrate-design-system.py --targets          # 기존 TARGETS 목록만
+
+대상 = INCLUDE glob 합집합 - EXCLUDE 패턴 (기본: 테스트·채팅 패널 제외).
+파일은 프로세스 풀에서 병렬 처리. 마지막 실행 후 내용 해시가 그대로인 파일은
+CACHE_PATH 캐시로 건너뜀 (규칙 표가 바뀌면 캐시 전체 무효).
 """
+import argparse
+import difflib
+import fnmatch
+import hashlib
+import json
+import os
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 sys.stdout.reconfigure(encoding="utf-8")
 
 ROOT = Path(__file__).resolve().parent.parent
 
-# Group A + B target paths (relative to src/)
+CACHE_PATH = ROOT / ".design-migrate-cache.json"
+
+# 기본 대상 규칙 (ROOT 기준 glob / fnmatch)
+DEFAULT_INCLUDE = ["src/**/*.tsx"]
+DEFAULT_EXCLUDE = [
+    "**/*.test.tsx",
+    # chat panel 제외, 별도 유지
+    "src/components/space/chat/**",
+    "src/components/space/chat-panel.tsx",
+]
+
+# Group A + B target paths (relative to src/) — --targets
 TARGETS = [
     "src/components/layout/navbar.tsx",
     "src/components/auth/login-form.tsx",
@@ -130,46 +167,368 @@ REPLACEMENTS = [
 ]
 
 
-def migrate_file(path: Path) -> tuple[int, list[str]]:
-    """Apply replacements. Returns (change_count, list_of_changes)."""
-    if not path.exists():
-        return 0, [f"SKIP (not found): {path.relative_to(ROOT)}"]
+def compile_rules(rules: list[tuple[str, str]]) -> re.Pattern:
+    """(pattern, replacement) 표 → named group alternation 하나.
 
-    text = path.read_text(encoding="utf-8")
-    original = text
-    applied = []
+    모든 패턴이 `\b` + 영문자로 시작하면 첫 글자 lookahead 가드를 앞에 붙인다
+    — 대부분의 위치에서 50개 분기를 시도하기 전에 탈락 (파일 전체 스캔 ~40배 빠름).
+    """
+    alternation = "|".join(f"(?P<r{i}>{pattern})" for i, (pattern, _) in enumerate(rules))
+    firsts = {p[2] if p.startswith(r"\b") and p[2:3].isalpha() else None for p, _ in rules}
+    if None in firsts:
+        return re.compile(alternation)
+    return re.compile(rf"\b(?=[{''.join(sorted(firsts))}])(?:{alternation})")
 
-    for pattern, replacement in REPLACEMENTS:
-        new_text, count = re.subn(pattern, replacement, text)
-        if count > 0:
-            applied.append(f"  {pattern} → {replacement} (×{count})")
-            text = new_text
+
+# group name → rule index (REPLACEMENTS 순서)
+RULE_INDEX = {f"r{i}": i for i in range(len(REPLACEMENTS))}
+COMBINED = compile_rules(REPLACEMENTS)
+
+
+def apply_replacements(text: str) -> tuple[str, list[int]]:
+    """One pass over text. Returns (new_text, per-rule match counts)."""
+    counts = [0] * len(REPLACEMENTS)
+
+    def replace(m: re.Match) -> str:
+        i = RULE_INDEX[m.lastgroup]
+        counts[i] += 1
+        return REPLACEMENTS[i][1]
+
+    return COMBINED.sub(replace, text), counts
+
+
+# ─── className 모드: 클래스 문자열 안의 토큰만 hash map 조회 ───────────────
+# `\bfoo\b` 규칙 → 리터럴 토큰 "foo" → (치환값, 규칙 번호)
+TOKEN_MAP = {
+    pattern[2:-2]: (replacement, i)
+    for i, (pattern, replacement) in enumerate(REPLACEMENTS)
+    if pattern.startswith(r"\b") and pattern.endswith(r"\b") and re.fullmatch(r"[\w:/-]+", pattern[2:-2])
+}
+CLASS_CALLEES = ("cn", "clsx", "classNames", "twMerge")
+
+# 다음 "사건" 위치로 점프: 괄호, 문자열/템플릿 시작, 주석, className=, cn(/clsx(
+_EVENT = re.compile(
+    r"""[(){}\[\]'"`]|//|/\*"""
+    r"""|(?<![\w$.-])(?P<attr>class(?:Name)?\s*=\s*)"""
+    rf"""|(?<![\w$.])(?P<call>(?:{"|".join(CLASS_CALLEES)})\s*\()"""
+)
+_STRING = {q: re.compile(rf"{q}(?:[^{q}\\\n]|\\.)*{q}?") for q in "'\""}
+# 따옴표가 JS 문자열을 여는 자리 = 직전 토큰이 연산자/여는 괄호/`=>`/아래 키워드일 때뿐.
+# 그 밖(식별자·`)`·`}`·`>` 뒤)은 JSX 텍스트 — `Don't`, `{name}'s`, `<p>"Hi"</p>`의 따옴표는 무시.
+_EXPR_BEFORE = set("=([{,:;?!&|+-*/%<~^")
+_EXPR_KEYWORDS = {"return", "case", "from", "import", "export", "typeof", "in", "of",
+                  "else", "void", "await", "yield", "throw", "new", "delete"}
+_TEMPLATE_PART = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))*")
+_WS_SPLIT = re.compile(r"(\s+)")
+
+
+def map_token(token: str) -> tuple[str, int] | None:
+    """토큰 → (치환값, 규칙 번호). 표에 없는 variant(md:, dark:, group-hover: ...)는
+    가장 긴 일치 접미부를 치환 — `md:hover:bg-gray-700`은 hover: 규칙이 우선."""
+    hit = TOKEN_MAP.get(token)
+    if hit:
+        return hit
+    pos = token.find(":")
+    while pos != -1:
+        hit = TOKEN_MAP.get(token[pos + 1:])
+        if hit:
+            return token[:pos + 1] + hit[0], hit[1]
+        pos = token.find(":", pos + 1)
+    return None
+
+
+def rewrite_class_string(chunk: str, counts: list[int], partial_head=False, partial_tail=False) -> str:
+    """공백 분리 → 토큰별 map 조회. partial_*: `${}`에 붙은 앞/뒤 토큰은 조각이라 건드리지 않음"""
+    parts = _WS_SPLIT.split(chunk)
+    last = len(parts) - 1
+    for k in range(0, len(parts), 2):
+        if (k == 0 and partial_head) or (k == last and partial_tail) or not parts[k]:
+            continue
+        hit = map_token(parts[k])
+        if hit:
+            parts[k] = hit[0]
+            counts[hit[1]] += 1
+    return "".join(parts)
+
+
+class _ClassScanner:
+    """TSX 소스를 훑어 className / cn()·clsx() 인자 / 템플릿 리터럴 안의 문자열만 재작성.
+
+    주석은 건너뛰고, 그 밖의 따옴표 문자열은 그대로 둔다. 완전한 파서가 아니라
+    괄호 짝과 문자열 경계만 추적하는 스캐너 (정규식 이벤트 점프라 파일당 한 번 훑음).
+    따옴표는 JS 식 문맥에서만 문자열 경계로 본다 (opens_string) — JSX 텍스트의 아포스트로피가
+    줄 끝까지 삼켜 뒤따르는 className을 놓치거나 cn( 깊이가 어긋나는 것을 막음.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self.out: list[str] = []
+        self.last = 0
+        self.counts = [0] * len(REPLACEMENTS)
+
+    def emit_upto(self, i: int):
+        self.out.append(self.text[self.last:i])
+        self.last = i
+
+    def replace_span(self, start: int, end: int, new: str):
+        self.emit_upto(start)
+        self.out.append(new)
+        self.last = end
+
+    def opens_string(self, i: int) -> bool:
+        """i의 따옴표가 JS 식 문맥(문자열 시작)인지 — JSX 텍스트 안이면 False"""
+        text = self.text
+        j = i - 1
+        while j >= 0 and text[j] in " \t\r\n":
+            j -= 1
+        if j < 0:
+            return True
+        c = text[j]
+        if c in _EXPR_BEFORE:
+            return True
+        if c == ">":
+            return j > 0 and text[j - 1] == "="     # () => 'x'
+        k = j
+        while k >= 0 and (text[k].isalnum() or text[k] in "_$"):
+            k -= 1
+        return text[k + 1:j + 1] in _EXPR_KEYWORDS
+
+    def string(self, i: int, in_class: bool) -> int:
+        m = _STRING[self.text[i]].match(self.text, i)
+        end = m.end()
+        if in_class and end - i >= 2 and self.text[end - 1] == self.text[i]:
+            body = self.text[i + 1:end - 1]
+            new = rewrite_class_string(body, self.counts)
+            if new != body:
+                self.replace_span(i + 1, end - 1, new)
+        return end
+
+    def template(self, i: int) -> int:
+        """`...${expr}...` — 정적 조각은 항상 클래스 후보, ${} 안은 클래스 문맥으로 재귀"""
+        text, n = self.text, len(self.text)
+        j = i + 1
+        after_expr = False
+        while j < n:
+            m = _TEMPLATE_PART.match(text, j)
+            end = m.end()
+            before_expr = text.startswith("${", end)
+            body = text[j:end]
+            new = rewrite_class_string(body, self.counts, after_expr, before_expr)
+            if new != body:
+                self.replace_span(j, end, new)
+            if end >= n:
+                return n
+            if text[end] == "`":
+                return end + 1
+            j = self.scan(end + 2, "}", True) + 1   # ${ ... }
+            after_expr = True
+        return n
+
+    def scan(self, i: int, closer: str | None, in_class: bool) -> int:
+        """closer(같은 깊이의 닫는 괄호) 위치 반환 — 소비하지 않음"""
+        text = self.text
+        depth = 0
+        while True:
+            m = _EVENT.search(text, i)
+            if not m:
+                return len(text)
+            i = m.start()
+            tok = m.group()
+            if m.group("attr"):
+                j = m.end()
+                if j < len(text) and text[j] in "'\"":
+                    i = self.string(j, True)
+                elif text.startswith("{", j):
+                    i = self.scan(j + 1, "}", True) + 1
+                elif text.startswith("`", j):
+                    i = self.template(j)
+                else:
+                    i = j
+            elif m.group("call"):
+                i = self.scan(m.end(), ")", True) + 1
+            elif tok in "([{":
+                depth += 1
+                i += 1
+            elif tok in ")]}":
+                if depth == 0 and tok == closer:
+                    return i
+                depth -= 1
+                i += 1
+            elif tok in "'\"":
+                i = self.string(i, in_class) if self.opens_string(i) else i + 1
+            elif tok == "`":
+                i = self.template(i)
+            elif tok == "//" and i > 0 and text[i - 1] == ":":   # JSX 텍스트의 URL (https://...)
+                i += 2
+            elif tok == "//":
+                nl = text.find("\n", i)
+                i = len(text) if nl == -1 else nl
+            else:  # /* */
+                close = text.find("*/", i + 2)
+                i = len(text) if close == -1 else close + 2
+
+    def run(self) -> tuple[str, list[int]]:
+        self.scan(0, None, False)
+        self.emit_upto(len(self.text))
+        return "".join(self.out), self.counts
+
+
+def apply_classname_tokens(text: str) -> tuple[str, list[int]]:
+    """className 모드 — 클래스 문자열 안의 토큰만. Returns (new_text, per-rule counts)."""
+    return _ClassScanner(text).run()
+
+
+ENGINES = {"classname": apply_classname_tokens, "regex": apply_replacements}
+
+
+def rules_fingerprint(mode: str = "classname") -> str:
+    """규칙 표 + 모드 해시 — 캐시 무효화 키"""
+    return hashlib.sha256(json.dumps([mode, REPLACEMENTS]).encode("utf-8")).hexdigest()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def discover_targets(include: list[str], exclude: list[str]) -> list[str]:
+    """INCLUDE glob 합집합에서 EXCLUDE 패턴에 걸리는 파일 제거 → ROOT 기준 posix 경로"""
+    found = set()
+    for pattern in include:
+        for path in ROOT.glob(pattern):
+            if path.is_file():
+                found.add(path.relative_to(ROOT).as_posix())
+    return sorted(rel for rel in found if not any(fnmatch.fnmatch(rel, ex) for ex in exclude))
+
+
+def load_cache(path: Path, mode: str) -> dict[str, str]:
+    """rel → 마지막 실행 후 내용 해시 (규칙/모드 지문이 다르면 빈 캐시)"""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("rules") != rules_fingerprint(mode):
+        return {}
+    return data.get("files", {})
+
+
+def save_cache(path: Path, files: dict[str, str], mode: str):
+    tmp = path.with_name(f"{path.name}.tmp")
+    tmp.write_text(json.dumps({"rules": rules_fingerprint(mode), "files": files}, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def mode_mismatch(original: str, text: str, mode: str) -> str | None:
+    """dry-run용: 다른 모드의 결과와 비교 → 다르면 경고 문자열 (다른 줄 번호 최대 5개)"""
+    other = "regex" if mode == "classname" else "classname"
+    other_text, other_counts = ENGINES[other](original)
+    if other_text == text:
+        return None
+    lines = [
+        str(n) for n, (a, b) in enumerate(zip(text.splitlines(), other_text.splitlines()), 1) if a != b
+    ]
+    more = f" (+{len(lines) - 5})" if len(lines) > 5 else ""
+    return (f"WARNING: --mode {other} rewrites differently ({sum(other_counts)} replacements),"
+            f" lines {', '.join(lines[:5])}{more}")
+
+
+def migrate_file(path: Path, write: bool = True,
+                 mode: str = "classname") -> tuple[int, list[str], str, str, str | None]:
+    """Apply replacements. Returns (change_count, list_of_changes, diff, content_hash_after, dry_run_warning)."""
+    if not path.exists():
+        return 0, [f"SKIP (not found): {path.relative_to(ROOT)}"], "", "", None
+
+    original = path.read_text(encoding="utf-8")
+    text, counts = ENGINES[mode](original)
+    warning = None if write else mode_mismatch(original, text, mode)
 
     if text == original:
-        return 0, []
+        return 0, [], "", content_hash(original), warning
+
+    applied = [
+        f"  {pattern} → {replacement} (×{n})"
+        for (pattern, replacement), n in zip(REPLACEMENTS, counts) if n
+    ]
+    rel = path.relative_to(ROOT).as_posix()
+    diff = "".join(difflib.unified_diff(
+        original.splitlines(keepends=True), text.splitlines(keepends=True),
+        fromfile=f"a/{rel}", tofile=f"b/{rel}",
+    ))
+    if write:
+        path.write_text(text, encoding="utf-8", newline="\n")
+    return sum(counts), applied, diff, content_hash(text), warning
+
 
-    path.write_text(text, encoding="utf-8", newline="\n")
-    return sum(int(re.search(r"×(\d+)", a).group(1)) for a in applied), applied
+def _migrate_worker(rel: str, write: bool, mode: str):
+    return rel, *migrate_file(ROOT / rel, write, mode)
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Tailwind → FlowSpace design token codemod")
+    parser.add_argument("--include", action="append", default=None,
+                        help=f"Target glob relative to repo root (repeatable, default: {DEFAULT_INCLUDE})")
+    parser.add_argument("--exclude", action="append", default=None,
+                        help="fnmatch pattern to skip (repeatable, default: tests + chat panel)")
+    parser.add_argument("--targets", action="store_true", help="Use the fixed TARGETS list instead of globs")
+    parser.add_argument("--mode", choices=list(ENGINES), default="classname",
+                        help="classname: only class strings (default) / regex: anywhere in the file")
+    parser.add_argument("--dry-run", action="store_true", help="Print unified diff, write nothing")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the content-hash skip cache")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Parallel worker processes")
+    args = parser.parse_args()
+
+    if args.targets:
+        targets = list(TARGETS)
+    else:
+        targets = discover_targets(args.include or DEFAULT_INCLUDE,
+                                   DEFAULT_EXCLUDE + (args.exclude or []))
+
+    cache = {} if args.no_cache else load_cache(CACHE_PATH, args.mode)
+    pending = []
+    for rel in targets:
+        path = ROOT / rel
+        if rel in cache and path.exists() and content_hash(path.read_text(encoding="utf-8")) == cache[rel]:
+            continue
+        pending.append(rel)
+    skipped = len(targets) - len(pending)
+
+    write = not args.dry_run
+    if args.workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(_migrate_worker, pending, [write] * len(pending),
+                                    [args.mode] * len(pending)))
+    else:
+        results = [_migrate_worker(rel, write, args.mode) for rel in pending]
+
     total_changes = 0
     changed_files = 0
-    for rel in TARGETS:
-        path = ROOT / rel
-        count, changes = migrate_file(path)
+    warnings = 0
+    for rel, count, changes, diff, after, warning in results:
+        if warning:
+            warnings += 1
+            print(f"\n{rel}: {warning}")
         if count > 0:
             changed_files += 1
             total_changes += count
             print(f"\n{rel} ({count} changes):")
             for c in changes:
                 print(c)
+            if args.dry_run:
+                print(diff, end="")
         elif changes:
             print(f"\n{rel}: {changes[0]}")
+        if write and after:
+            cache[rel] = after
+
+    if write:
+        save_cache(CACHE_PATH, cache, args.mode)
 
-    print(f"\n=== Summary ===")
-    print(f"Files changed: {changed_files} / {len(TARGETS)}")
+    print(f"\n=== Summary{' (dry run)' if args.dry_run else ''} ===")
+    print(f"Files {'to change' if args.dry_run else 'changed'}: {changed_files} / {len(targets)}"
+          f" ({skipped} unchanged since last run, skipped)")
     print(f"Total replacements: {total_changes}")
+    if args.dry_run and warnings:
+        other = "regex" if args.mode == "classname" else "classname"
+        print(f"Files where --mode {other} differs: {warnings} (review before applying)")
 
 
 if __name__ == "__main__":
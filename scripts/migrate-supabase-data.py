@@ -3,12 +3,47 @@ Sydney → Seoul Supabase data migration.
 
 Reads from .env.backup-pre-seoul (old) and .env.new-seoul (new).
 Migrates all public.* tables in dependency-safe order.
+
+Usage:
+    python scripts/migrate-supabase-data.py              # 4 parallel connection pairs
+    python scripts/migrate-supabase-data.py --workers 1  # sequential
+    python scripts/migrate-supabase-data.py --resume     # continue from the checkpoint
+
+Table order is derived from the old project's foreign keys (pg_constraint):
+a table is migrated only after every table it references is done, and
+independent tables (ChatMessage, SpaceEventLog, GeneratedAsset, ...) run
+concurrently, each worker holding its own old/new connection pair.
+New Prisma models are picked up automatically.
+
+Tables are copied in keyset chunks of --chunk-rows ordered by primary key
+(or a NOT NULL unique index), each chunk committed separately. After every
+chunk the last key is written to the checkpoint file, so a crashed run can
+--resume without re-sending finished chunks. Finally row counts and an
+order-independent checksum (sum of per-row md5) are compared on both sides
+in parallel.
+
+Each table is streamed server-to-server without materializing rows in Python:
+
+    old: COPY (SELECT cols FROM public."T") TO STDOUT (FORMAT BINARY)
+      -> bounded chunks (COPY_CHUNK_BYTES)
+    new: COPY pg_temp."_stage_T" FROM STDIN (FORMAT BINARY)
+         INSERT INTO public."T" SELECT ... FROM staging ON CONFLICT DO NOTHING
+
+COPY cannot skip conflicting rows itself, so rows land in a temp staging table
+(LIKE public."T") first and are merged with a single INSERT ... SELECT.
 """
+import argparse
+import json
+import os
+import queue
 import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import psycopg
-from psycopg.types.json import Json
+
+from pg_fk_order import dependency_order, get_dependencies, run_in_dependency_order
 
 sys.stdout.reconfigure(encoding="utf-8")
 
@@ -19,25 +54,23 @@ new_env = (ROOT / ".env.new-seoul").read_text(encoding="utf-8")
 OLD_URL = re.search(r'DIRECT_URL="([^"]+)"', old_env).group(1)
 NEW_URL = re.search(r'DIRECT_URL="([^"]+)"', new_env).group(1)
 
-# Migration order (FK-safe with replica role, but this is the natural order)
-TABLES = [
-    "User",
-    "Template",
-    "VerificationToken",
-    "_prisma_migrations",
-    "Account",
-    "Session",
-    "AssetWorkflow",
-    "Space",
-    "GuestSession",
-    "SpaceMember",
-    "ChatMessage",
-    "GeneratedAsset",
-    "SpaceEventLog",
-    "MapObject",
-    "PartyZone",
-    "SpotlightGrant",
-]
+DEFAULT_WORKERS = 4
+DEFAULT_CHUNK_ROWS = 50_000
+CHECKPOINT_PATH = ROOT / ".migrate-checkpoint.json"
+
+# Max bytes buffered between source and destination COPY streams
+COPY_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+def list_tables(cur):
+    cur.execute(
+        """
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema='public' AND table_type='BASE TABLE'
+        ORDER BY table_name
+        """
+    )
+    return [r[0] for r in cur.fetchall()]
 
 
 def get_columns(cur, table):
@@ -52,58 +85,339 @@ def get_columns(cur, table):
     return [r[0] for r in cur.fetchall()]
 
 
+def get_key_columns(cur, table):
+    """Keyset columns: primary key, else the first unique index on NOT NULL columns.
+
+    None if the table has neither (copied in one chunk).
+    """
+    cur.execute(
+        """
+        SELECT i.indisprimary, array_agg(a.attname ORDER BY k.ord), bool_and(a.attnotnull)
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        CROSS JOIN LATERAL unnest(i.indkey) WITH ORDINALITY AS k(attnum, ord)
+        JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum = k.attnum
+        WHERE n.nspname = 'public' AND c.relname = %s
+          AND i.indisunique AND i.indpred IS NULL AND i.indexprs IS NULL
+        GROUP BY i.indexrelid, i.indisprimary
+        ORDER BY i.indisprimary DESC, count(*), i.indexrelid
+        """,
+        (table,),
+    )
+    for _, cols, not_null in cur.fetchall():
+        if not_null:
+            return list(cols)
+    return None
+
+
 def quote_ident(name):
     return '"' + name.replace('"', '""') + '"'
 
 
+def stage_name(table):
+    return quote_ident(f"_stage_{table}")
+
+
+def next_boundary(src_cur, table, key, last, chunk_rows):
+    """Key of the chunk_rows-th row after `last` (None = the rest fits in one chunk)"""
+    key_idents = ", ".join(quote_ident(c) for c in key)
+    where, params = key_range(key, last, None)
+    src_cur.execute(
+        f"SELECT {key_idents} FROM public.{quote_ident(table)} WHERE {where} "
+        f"ORDER BY {key_idents} OFFSET %s LIMIT 1",
+        (*params, chunk_rows - 1),
+    )
+    row = src_cur.fetchone()
+    return list(row) if row else None
+
+
+def key_range(key, last, boundary):
+    """WHERE clause for last < (key) <= boundary"""
+    if key is None:
+        return "TRUE", ()
+    key_row = f"({', '.join(quote_ident(c) for c in key)})"
+    marks = f"({', '.join(['%s'] * len(key))})"
+    clauses, params = [], []
+    if last is not None:
+        clauses.append(f"{key_row} > {marks}")
+        params += last
+    if boundary is not None:
+        clauses.append(f"{key_row} <= {marks}")
+        params += boundary
+    return " AND ".join(clauses) or "TRUE", tuple(params)
+
+
+def copy_chunk(src_cur, dst_cur, table, cols, where, params):
+    """Stream one key range old -> new via binary COPY + staging table.
+
+    Returns (copied, inserted): rows streamed from the source and rows actually
+    inserted (the rest already existed on the destination).
+    """
+    col_idents = ", ".join(quote_ident(c) for c in cols)
+    target = f"public.{quote_ident(table)}"
+    stage = f"pg_temp.{stage_name(table)}"
+
+    dst_cur.execute(f"TRUNCATE {stage};")
+    with src_cur.copy(
+        f"COPY (SELECT {col_idents} FROM {target} WHERE {where}) TO STDOUT (FORMAT BINARY)",
+        params,
+    ) as src_copy, dst_cur.copy(
+        f"COPY {stage} ({col_idents}) FROM STDIN (FORMAT BINARY)"
+    ) as dst_copy:
+        buf = bytearray()
+        for data in src_copy:
+            buf += data
+            if len(buf) >= COPY_CHUNK_BYTES:
+                dst_copy.write(buf)
+                buf = bytearray()
+        if buf:
+            dst_copy.write(buf)
+    copied = dst_cur.rowcount
+
+    dst_cur.execute(
+        f"INSERT INTO {target} ({col_idents}) "
+        f"SELECT {col_idents} FROM {stage} "
+        f"ON CONFLICT DO NOTHING"
+    )
+    return copied, dst_cur.rowcount
+
+
+class Checkpoint:
+    """Per-table progress {last_key, copied, inserted, done}, saved after every chunk"""
+
+    def __init__(self, path, tables=None):
+        self.path = Path(path)
+        self.tables = tables or {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("old") != host_of(OLD_URL) or data.get("new") != host_of(NEW_URL):
+            raise SystemExit(
+                f"Checkpoint {path} is for {data.get('old')} -> {data.get('new')}, "
+                f"not {host_of(OLD_URL)} -> {host_of(NEW_URL)}"
+            )
+        return cls(path, data["tables"])
+
+    def get(self, table):
+        with self.lock:
+            return dict(self.tables.get(table) or
+                        {"last_key": None, "copied": 0, "inserted": 0, "done": False})
+
+    def update(self, table, state):
+        with self.lock:
+            self.tables[table] = state
+            data = {"old": host_of(OLD_URL), "new": host_of(NEW_URL), "tables": self.tables}
+            tmp = self.path.with_name(f"{self.path.name}.tmp")
+            tmp.write_text(json.dumps(data, indent=2, default=str), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+def host_of(url):
+    return url.split("@")[1].split("/")[0]
+
+
+def copy_table(src, dst, table, chunk_rows, checkpoint):
+    """Keyset-chunked copy of one table, resuming from checkpoint["last_key"].
+
+    Each chunk is committed on the new side before the checkpoint moves past it,
+    so a crash at worst re-sends one chunk (absorbed by ON CONFLICT DO NOTHING).
+    """
+    state = checkpoint.get(table)
+    if state["done"]:
+        return state
+
+    with src.cursor() as src_cur, dst.cursor() as dst_cur:
+        cols = get_columns(src_cur, table)
+        key = get_key_columns(src_cur, table)
+        dst_cur.execute(
+            f"CREATE TEMP TABLE IF NOT EXISTS {stage_name(table)} "
+            f"(LIKE public.{quote_ident(table)});"
+        )
+        dst.commit()
+
+        while True:
+            boundary = next_boundary(src_cur, table, key, state["last_key"], chunk_rows) if key else None
+            where, params = key_range(key, state["last_key"], boundary)
+            copied, inserted = copy_chunk(src_cur, dst_cur, table, cols, where, params)
+            dst.commit()
+            src.commit()
+
+            state["copied"] += copied
+            state["inserted"] += inserted
+            state["last_key"] = boundary
+            state["done"] = boundary is None
+            checkpoint.update(table, state)
+            if state["done"]:
+                break
+
+        dst_cur.execute(f"DROP TABLE pg_temp.{stage_name(table)};")
+        dst.commit()
+    return state
+
+
+def open_pair():
+    """Old/new connection pair for one worker (FK triggers off on the new side)"""
+    src = psycopg.connect(OLD_URL)
+    dst = psycopg.connect(NEW_URL)
+    dst.execute("SET session_replication_role = 'replica';")
+    dst.commit()
+    return src, dst
+
+
+def migrate_table(pairs, table, chunk_rows, checkpoint):
+    """Take a free connection pair and migrate one table chunk by chunk"""
+    src, dst = pairs.get()
+    try:
+        return copy_table(src, dst, table, chunk_rows, checkpoint)
+    except Exception:
+        dst.rollback()
+        src.rollback()
+        raise
+    finally:
+        pairs.put((src, dst))
+
+
+def run_parallel(order, deps, workers, chunk_rows, checkpoint):
+    """Submit each table once all of its FK parents are done"""
+    pairs = queue.Queue()
+    for _ in range(workers):
+        pairs.put(open_pair())
+
+    results = {}
+    try:
+        for table, state in run_in_dependency_order(
+            order, deps, workers,
+            lambda table: migrate_table(pairs, table, chunk_rows, checkpoint),
+        ):
+            results[table] = state
+            print(f"  {table:24s} {state['copied']:4d} rows -> {state['inserted']} inserted")
+    finally:
+        while not pairs.empty():
+            src, dst = pairs.get()
+            with dst.cursor() as dst_cur:
+                dst_cur.execute("SET session_replication_role = 'origin';")
+            dst.commit()
+            src.close()
+            dst.close()
+    return results
+
+
+def table_checksum(conns, table):
+    """(row count, order-independent checksum) of one table on one side"""
+    conn = conns.get()
+    try:
+        with conn.cursor() as cur:
+            cols = get_columns(cur, table)
+            row = f"ROW({', '.join(quote_ident(c) for c in cols)})::text"
+            cur.execute(
+                f"SELECT count(*), coalesce(sum(('x' || left(md5({row}), 16))::bit(64)::bigint), 0) "
+                f"FROM public.{quote_ident(table)}"
+            )
+            count, checksum = cur.fetchone()
+        conn.commit()
+        return count, checksum
+    finally:
+        conns.put(conn)
+
+
+def open_verify_conn(url):
+    conn = psycopg.connect(url)
+    # Same text rendering on both sides (timestamptz)
+    conn.execute("SET TIME ZONE 'UTC'")
+    conn.commit()
+    return conn
+
+
+def verify(order, workers):
+    """Row count + checksum per table, old and new queried concurrently"""
+    sides = {"old": OLD_URL, "new": NEW_URL}
+    conns = {side: queue.Queue() for side in sides}
+    for side, url in sides.items():
+        for _ in range(workers):
+            conns[side].put(open_verify_conn(url))
+
+    mismatched = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers * 2) as pool:
+            futures = {
+                (side, table): pool.submit(table_checksum, conns[side], table)
+                for table in order for side in sides
+            }
+            for table in order:
+                (old_n, old_sum), (new_n, new_sum) = (
+                    futures[(side, table)].result() for side in sides
+                )
+                ok = old_n == new_n and old_sum == new_sum
+                if not ok:
+                    mismatched.append(table)
+                status = "OK" if ok else ("MISMATCH (checksum)" if old_n == new_n else "MISMATCH")
+                print(f"  {table:24s} {old_n:6d} / {new_n:6d}  {status}")
+    finally:
+        for q in conns.values():
+            while not q.empty():
+                q.get().close()
+    return mismatched
+
+
 def main():
-    print(f"OLD: {OLD_URL.split('@')[1].split('/')[0]}")
-    print(f"NEW: {NEW_URL.split('@')[1].split('/')[0]}")
+    parser = argparse.ArgumentParser(description="Sydney -> Seoul Supabase data migration")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Parallel connection pairs (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f"Rows per keyset chunk (default: {DEFAULT_CHUNK_ROWS})")
+    parser.add_argument("--checkpoint", default=str(CHECKPOINT_PATH),
+                        help="Checkpoint file (default: .migrate-checkpoint.json)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue from the checkpoint instead of starting over")
+    parser.add_argument("--no-verify", action="store_true",
+                        help="Skip the final row count / checksum verification")
+    args = parser.parse_args()
+    workers = max(1, args.workers)
+
+    print(f"OLD: {host_of(OLD_URL)}")
+    print(f"NEW: {host_of(NEW_URL)}")
     print()
 
-    summary = []
+    if args.resume and os.path.exists(args.checkpoint):
+        checkpoint = Checkpoint.load(args.checkpoint)
+        finished = sum(1 for t in checkpoint.tables.values() if t["done"])
+        print(f"Resuming from {args.checkpoint} ({finished} tables already done)")
+    else:
+        if args.resume:
+            print(f"No checkpoint at {args.checkpoint} -- starting from scratch")
+        checkpoint = Checkpoint(args.checkpoint)
 
-    with psycopg.connect(OLD_URL) as src, psycopg.connect(NEW_URL) as dst:
-        with src.cursor() as src_cur, dst.cursor() as dst_cur:
-            # Disable FK checks on destination
-            dst_cur.execute("SET session_replication_role = 'replica';")
-
-            for table in TABLES:
-                cols = get_columns(src_cur, table)
-                col_idents = ", ".join(quote_ident(c) for c in cols)
-                src_cur.execute(f"SELECT {col_idents} FROM public.{quote_ident(table)};")
-                raw_rows = src_cur.fetchall()
-                # Wrap dict/list values (JSONB) with Json adapter
-                rows = []
-                for row in raw_rows:
-                    rows.append(tuple(
-                        Json(v) if isinstance(v, (dict, list)) else v
-                        for v in row
-                    ))
-
-                if not rows:
-                    summary.append((table, 0, "skipped (empty)"))
-                    continue
-
-                placeholders = ", ".join(["%s"] * len(cols))
-                insert_sql = (
-                    f"INSERT INTO public.{quote_ident(table)} ({col_idents}) "
-                    f"VALUES ({placeholders}) "
-                    f"ON CONFLICT DO NOTHING"
-                )
-                dst_cur.executemany(insert_sql, rows)
-                summary.append((table, len(rows), "inserted"))
-                print(f"  {table:24s} {len(rows):4d} rows -> {dst_cur.rowcount} inserted")
+    with psycopg.connect(OLD_URL) as src, src.cursor() as cur:
+        tables = list_tables(cur)
+        deps = get_dependencies(cur, tables)
+    order = dependency_order(deps)
+    print(f"Order ({len(order)} tables, {workers} workers): {' -> '.join(order)}\n")
 
-            # Re-enable FK checks
-            dst_cur.execute("SET session_replication_role = 'origin';")
-            dst.commit()
+    results = run_parallel(order, deps, workers, max(1, args.chunk_rows), checkpoint)
+
+    summary = []
+    for table in order:
+        copied = results[table]["copied"]
+        summary.append((table, copied, "inserted" if copied else "skipped (empty)"))
 
     print("\n=== Summary ===")
     for t, n, status in summary:
         print(f"  {t:24s} {n:4d} {status}")
     print(f"\nTotal: {sum(n for _, n, _ in summary)} rows migrated.")
 
+    if args.no_verify:
+        return
+    print("\n=== Verify (old / new) ===")
+    mismatched = verify(order, workers)
+    if mismatched:
+        print(f"\n{len(mismatched)} table(s) differ: {', '.join(mismatched)}")
+        sys.exit(1)
+    print("\nAll tables match.")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,81 @@
+"""
+pg_fk_order.py — foreign-key dependency ordering + scheduling for public.* tables.
+
+Imported by migrate-supabase-data.py / restore-snapshot.py (same scripts/ folder).
+
+    deps = get_dependencies(cur, tables)      # table -> {referenced tables}
+    order = dependency_order(deps)            # parents before children
+    for table, result in run_in_dependency_order(order, deps, workers, fn):
+        ...                                   # fn(table) runs once all parents are done
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def get_dependencies(cur, tables):
+    """table -> set of public tables it references via FK (self-references dropped)"""
+    cur.execute(
+        """
+        SELECT DISTINCT child.relname, parent.relname
+        FROM pg_constraint c
+        JOIN pg_class child ON child.oid = c.conrelid
+        JOIN pg_class parent ON parent.oid = c.confrelid
+        JOIN pg_namespace cn ON cn.oid = child.relnamespace
+        JOIN pg_namespace pn ON pn.oid = parent.relnamespace
+        WHERE c.contype = 'f' AND cn.nspname = 'public' AND pn.nspname = 'public'
+        """
+    )
+    deps = {t: set() for t in tables}
+    for child, parent in cur.fetchall():
+        if child in deps and parent in deps and child != parent:
+            deps[child].add(parent)
+    return deps
+
+
+def dependency_order(deps):
+    """Topological order of the FK DAG (Kahn, alphabetical within a level).
+
+    Cycles can't be ordered; those tables go last (FK triggers are off under
+    the replica role, so the data still lands).
+    """
+    remaining = {t: set(p) for t, p in deps.items()}
+    order = []
+    while remaining:
+        ready = sorted(t for t, p in remaining.items() if not p)
+        if not ready:
+            cyclic = sorted(remaining)
+            print(f"  WARN: FK cycle among {', '.join(cyclic)} -- processing last")
+            order.extend(cyclic)
+            break
+        order.extend(ready)
+        for t in ready:
+            del remaining[t]
+        for p in remaining.values():
+            p.difference_update(ready)
+    return order
+
+
+def run_in_dependency_order(order, deps, workers, fn):
+    """Run fn(table) on a thread pool, each table once all of its FK parents finished.
+
+    Yields (table, result) in completion order; an exception in fn propagates.
+    """
+    done = set()
+    pending = {}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        waiting = list(order)
+        while waiting or pending:
+            for table in [t for t in waiting if deps[t] <= done]:
+                waiting.remove(table)
+                pending[pool.submit(fn, table)] = table
+            if not pending:
+                # Only cyclic tables left -- dependency_order already put them last
+                for table in waiting:
+                    pending[pool.submit(fn, table)] = table
+                waiting = []
+
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                table = pending.pop(fut)
+                result = fut.result()
+                done.add(table)
+                yield table, result
@@ -3,12 +3,28 @@ render-3d-views.py — GLB 모델을 4방향(front/left/back/right)으로 렌더
 
 Usage:
     python scripts/render-3d-views.py <glb_path> [--output-dir <dir>] [--size <px>]
+    python scripts/render-3d-views.py <glb_path> --turntable 8          # 8방향 턴테이블
+    python scripts/render-3d-views.py <glb_path> --angles 0,30,60,90
+    python scripts/render-3d-views.py <glb_dir | "glob/*.glb"> [--workers 4]   # 배치 모드
+    python scripts/render-3d-views.py <glb_path> --controlnet                   # + depth/normal 맵
+    python scripts/render-3d-views.py <glb_path> --comfyui-input C:/Users/User/ComfyUI/input
+    python scripts/render-3d-views.py <glb_path> --target-faces 200000 --lod-check   # LOD 축소 + 실루엣 검증
+
+모델당 오프스크린 plotter 하나만 만들고 메시를 한 번 업로드한 뒤,
+각도마다 카메라/조명만 옮겨 screenshot — 방향 추가 비용은 렌더 1회.
+배치 모드는 프로세스 풀 워커당 plotter 1개를 모델 간 재사용하고,
+파싱+정규화된 메시를 GLB 해시 키 .npz로 캐시(<glb_dir>/.mesh_cache) → 각도만 바꾼 재렌더는 파싱 생략.
 
 Output:
     {output_dir}/front.png
     {output_dir}/left.png
     {output_dir}/back.png
     {output_dir}/right.png
+    {output_dir}/az045.0.png ...   (기본 4방향 외 각도)
+    배치: {output_dir}/{model_name}/{view}.png
+    --controlnet: {output_dir}/depth_maps/{view}.png, {output_dir}/normal_maps/{view}.png
+                  (RGBA와 같은 렌더 패스의 z-buffer에서 계산 — depth: 가까울수록 흰색/배경 검정,
+                   normal: normalbae 규약 R=왼쪽 G=위 B=카메라 쪽)
 
 Dependencies:
     pip install pyvista trimesh Pillow
@@ -18,6 +34,7 @@ import argparse
 import math
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import numpy as np
 
@@ -35,6 +52,8 @@ except ImportError:
 
 from PIL import Image
 
+import glb_mesh_cache
+
 # Enable offscreen rendering
 pv.OFF_SCREEN = True
 
@@ -106,67 +125,263 @@ def center_and_normalize(mesh: pv.PolyData) -> pv.PolyData:
     return mesh
 
 
-def render_view(
-    mesh: pv.PolyData,
-    angle_deg: float,
-    size: int = 1024,
-) -> np.ndarray:
-    """특정 각도에서 메시를 렌더링하여 RGBA numpy 배열 반환"""
+MESH_CACHE_TAG = "pv-normalized-v1"
+LOD_IOU_THRESHOLD = 0.995  # 실루엣 IoU가 이 이상이면 출력 해상도에서 시각적으로 무손실로 간주
+
+
+def decimate_mesh(mesh: pv.PolyData, target_faces: int) -> pv.PolyData:
+    """Quadric decimation으로 target_faces 이하로 축소 (center_and_normalize 이후 적용).
+
+    버텍스 컬러가 있으면 0~1 float로 바꿔 quadric 오차에 포함 → 색 경계가 보존되고
+    남은 버텍스의 색은 보간된 값으로 복원된다.
+    """
+    if target_faces <= 0 or mesh.n_cells <= target_faces:
+        return mesh
+    reduction = 1.0 - target_faces / mesh.n_cells
+
+    work = pv.PolyData(mesh.points, mesh.faces)
+    has_rgb = "RGB" in mesh.point_data
+    if has_rgb:
+        work.point_data["RGB"] = np.asarray(mesh.point_data["RGB"], dtype=np.float32) / 255.0
+        work.set_active_scalars("RGB")
+        decimated = work.decimate(reduction, scalars=True)
+    else:
+        decimated = work.decimate(reduction)
+
+    result = pv.PolyData(decimated.points, decimated.faces)
+    if has_rgb:
+        rgb = np.asarray(decimated.point_data["RGB"]) * 255.0
+        result.point_data["RGB"] = np.clip(rgb + 0.5, 0, 255).astype(np.uint8)
+    return result
+
+
+def silhouette_iou(full: pv.PolyData, lod: pv.PolyData, angles: list[float], size: int,
+                   context: tuple[pv.Plotter, list[pv.Light]] | None = None) -> float:
+    """원본/축소 메시를 출력 해상도로 렌더한 알파 실루엣의 IoU (전 각도 중 최소값)"""
+    owned = context is None
+    context = context if context is not None else create_view_plotter(size)
+    try:
+        full_masks = [rgba[..., 3] > 0 for _, rgba, _ in render_views(full, angles, size, context=context)]
+        lod_masks = [rgba[..., 3] > 0 for _, rgba, _ in render_views(lod, angles, size, context=context)]
+    finally:
+        if owned:
+            context[0].close()
+
+    ious = []
+    for a, b in zip(full_masks, lod_masks):
+        union = np.logical_or(a, b).sum()
+        ious.append(np.logical_and(a, b).sum() / union if union else 1.0)
+    return float(min(ious))
+
+
+def mesh_to_arrays(mesh: pv.PolyData) -> dict[str, np.ndarray]:
+    """PolyData → 캐시용 배열 (삼각형 메시 전제)"""
+    arrays = {
+        "vertices": np.asarray(mesh.points),
+        "faces": np.asarray(mesh.faces).reshape(-1, 4)[:, 1:].astype(np.int32),
+    }
+    if "RGB" in mesh.point_data:
+        arrays["colors"] = np.asarray(mesh.point_data["RGB"], dtype=np.uint8)
+    return arrays
+
+
+def arrays_to_mesh(arrays: dict[str, np.ndarray]) -> pv.PolyData:
+    """캐시 배열 → PolyData"""
+    faces = arrays["faces"]
+    faces_pv = np.column_stack([np.full(len(faces), 3), faces]).ravel()
+    mesh = pv.PolyData(arrays["vertices"], faces_pv)
+    if "colors" in arrays:
+        mesh.point_data["RGB"] = arrays["colors"]
+    return mesh
+
+
+def load_mesh(path: str, cache_dir: str | None = None) -> tuple[pv.PolyData, bool]:
+    """GLB → 정규화된 PolyData. cache_dir가 있으면 .npz 캐시 사용. (mesh, cache hit 여부) 반환"""
+    npz_path = glb_mesh_cache.cache_path(path, cache_dir, MESH_CACHE_TAG) if cache_dir else None
+    if npz_path:
+        arrays = glb_mesh_cache.load_cached(npz_path)
+        if arrays is not None:
+            return arrays_to_mesh(arrays), True
+
+    mesh = center_and_normalize(load_glb_to_pyvista(path))
+    if npz_path:
+        glb_mesh_cache.save_cached(npz_path, **mesh_to_arrays(mesh))
+    return mesh, False
+
+
+def _light_positions(angle_deg: float) -> list[tuple[float, float, float]]:
+    """카메라 방향 기준 key/fill/top/bottom 조명 위치"""
+    angle_rad = math.radians(angle_deg)
+    sin_a = math.sin(angle_rad)
+    cos_a = math.cos(angle_rad)
+    return [
+        # Key light: 카메라 약간 위+옆
+        (sin_a * 4 + cos_a * 1, 3, cos_a * 4 - sin_a * 1),
+        # Fill light: 카메라 반대쪽
+        (-sin_a * 3, 1, -cos_a * 3),
+        # Top light: 위에서
+        (0, 5, 0),
+        # Ambient-like: 아래에서 반사광 시뮬레이션
+        (0, -3, 0),
+    ]
+
+
+LIGHT_INTENSITIES = [1.0, 0.5, 0.6, 0.2]
+VIEW_ANGLE = 25.0  # 더 좁은 FOV → 캐릭터가 프레임에 맞음
+
+
+def create_view_plotter(size: int = 1024) -> tuple[pv.Plotter, list[pv.Light]]:
+    """오프스크린 plotter 1개 생성 — GL 컨텍스트/조명은 한 번만 만들고 메시만 교체해 재사용"""
     plotter = pv.Plotter(off_screen=True, window_size=[size, size])
     plotter.set_background("white")
 
-    # 메시 추가
+    # 조명 — 위치는 각도마다 set_view에서 갱신
+    plotter.remove_all_lights()
+    lights = []
+    for position, intensity in zip(_light_positions(0.0), LIGHT_INTENSITIES):
+        light = pv.Light(position=position, focal_point=(0, 0, 0), intensity=intensity)
+        plotter.add_light(light)
+        lights.append(light)
+
+    plotter.camera.focal_point = (0.0, 0.0, 0.0)
+    plotter.camera.up = (0.0, 1.0, 0.0)
+    plotter.camera.view_angle = VIEW_ANGLE
+
+    # 첫 렌더로 GL 컨텍스트 준비 (이후 screenshot은 재렌더만)
+    plotter.show(auto_close=False)
+    return plotter, lights
+
+
+def set_mesh(plotter: pv.Plotter, mesh: pv.PolyData):
+    """plotter의 메시 교체 (모델당 업로드 1회)"""
+    plotter.clear_actors()
     if "RGB" in mesh.point_data:
         plotter.add_mesh(mesh, scalars="RGB", rgb=True, smooth_shading=True)
     else:
         plotter.add_mesh(mesh, color="lightgray", smooth_shading=True)
 
-    # 조명 — 카메라 방향 기준으로 key/fill/rim 배치
-    plotter.remove_all_lights()
-    angle_rad = math.radians(angle_deg)
-    sin_a = math.sin(angle_rad)
-    cos_a = math.cos(angle_rad)
 
-    # Key light: 카메라 약간 위+옆
-    plotter.add_light(pv.Light(
-        position=(sin_a * 4 + cos_a * 1, 3, cos_a * 4 - sin_a * 1),
-        focal_point=(0, 0, 0),
-        intensity=1.0,
-    ))
-    # Fill light: 카메라 반대쪽
-    plotter.add_light(pv.Light(
-        position=(-sin_a * 3, 1, -cos_a * 3),
-        focal_point=(0, 0, 0),
-        intensity=0.5,
-    ))
-    # Top light: 위에서
-    plotter.add_light(pv.Light(
-        position=(0, 5, 0),
-        focal_point=(0, 0, 0),
-        intensity=0.6,
-    ))
-    # Ambient-like: 아래에서 반사광 시뮬레이션
-    plotter.add_light(pv.Light(
-        position=(0, -3, 0),
-        focal_point=(0, 0, 0),
-        intensity=0.2,
-    ))
+def set_view(plotter: pv.Plotter, lights: list[pv.Light], angle_deg: float):
+    """카메라/조명만 해당 각도로 이동 (Y축 기준 회전)"""
+    for light, position in zip(lights, _light_positions(angle_deg)):
+        light.position = position
 
     # 카메라 위치 계산 (Y-up, 더 멀리서)
     distance = 4.5
-    cam_x = distance * sin_a
-    cam_z = distance * cos_a
-
-    plotter.camera.position = (cam_x, 0.2, cam_z)
+    angle_rad = math.radians(angle_deg)
+    plotter.camera.position = (distance * math.sin(angle_rad), 0.2, distance * math.cos(angle_rad))
     plotter.camera.focal_point = (0.0, 0.0, 0.0)
     plotter.camera.up = (0.0, 1.0, 0.0)
-    plotter.camera.view_angle = 25.0  # 더 좁은 FOV → 캐릭터가 프레임에 맞음
 
-    # 렌더링
-    img = plotter.screenshot(transparent_background=True, return_img=True)
-    plotter.close()
 
-    return img  # RGBA numpy array
+def render_views(
+    mesh: pv.PolyData,
+    angles: list[float],
+    size: int = 1024,
+    context: tuple[pv.Plotter, list[pv.Light]] | None = None,
+    with_depth: bool = False,
+):
+    """한 plotter로 여러 각도 렌더링 — (angle, RGBA 배열, 깊이 배열 | None)을 순서대로 yield.
+
+    with_depth면 같은 렌더 패스의 z-buffer(카메라 기준 거리, 배경 NaN)를 함께 읽는다.
+    context(create_view_plotter 결과)를 넘기면 재사용하고 닫지 않는다 (배치 워커용).
+    """
+    owned = context is None
+    plotter, lights = context if context is not None else create_view_plotter(size)
+    try:
+        set_mesh(plotter, mesh)
+        for angle in angles:
+            set_view(plotter, lights, angle)
+            plotter.render()
+            rgba = plotter.screenshot(transparent_background=True, return_img=True)
+            depth = None
+            if with_depth:
+                depth = -plotter.get_image_depth(fill_value=np.nan, reset_camera_clipping_range=False)
+            yield angle, rgba, depth
+    finally:
+        if owned:
+            plotter.close()
+
+
+# ControlNet 조건 이미지 규약
+DEPTH_MIN_LEVEL = 0.2  # 가장 먼 전경 픽셀 밝기 — 배경(0)과 구분
+# normalbae 규약: R = 왼쪽(-x), G = 위(+y), B = 카메라 쪽(+z)
+NORMAL_SIGN = np.array([-1.0, 1.0, 1.0])
+
+
+def depth_to_controlnet(depth: np.ndarray) -> np.ndarray:
+    """z-buffer 거리 → ControlNet depth (가까울수록 흰색, 배경 검정) uint8"""
+    fg = np.isfinite(depth)
+    out = np.zeros(depth.shape, dtype=np.float64)
+    if fg.any():
+        near, far = depth[fg].min(), depth[fg].max()
+        rel = (far - depth[fg]) / max(far - near, 1e-9)
+        out[fg] = DEPTH_MIN_LEVEL + (1.0 - DEPTH_MIN_LEVEL) * rel
+    return (out * 255 + 0.5).astype(np.uint8)
+
+
+def depth_to_normals(depth: np.ndarray, view_angle: float = VIEW_ANGLE) -> np.ndarray:
+    """z-buffer 거리 → 카메라 공간 법선 (H, W, 3), 배경 0.
+
+    픽셀마다 시점 공간 좌표를 복원해 이웃 차분의 외적으로 법선 계산 — 추가 렌더 없음.
+    """
+    h, w = depth.shape
+    f = (h / 2.0) / math.tan(math.radians(view_angle) / 2.0)
+    u = (np.arange(w) + 0.5 - w / 2.0)[None, :]
+    v = (np.arange(h) + 0.5 - h / 2.0)[:, None]
+    points = np.stack([u / f * depth, -v / f * depth, -depth], axis=-1)
+
+    d_du = np.gradient(points, axis=1)
+    d_dv = np.gradient(points, axis=0)
+    normals = np.cross(d_dv, d_du)
+    norm = np.linalg.norm(normals, axis=-1, keepdims=True)
+    normals = normals / np.where(norm > 0, norm, 1.0)
+
+    fg = np.isfinite(depth)
+    # 실루엣 경계(이웃이 배경인 픽셀)는 NaN → 카메라 정면 법선으로 채움
+    edge = fg & ~np.isfinite(normals).all(axis=-1)
+    normals[edge] = (0.0, 0.0, 1.0)
+    normals[~fg] = 0.0
+    return normals
+
+
+def normals_to_controlnet(normals: np.ndarray, depth: np.ndarray) -> np.ndarray:
+    """법선 → ControlNet normal RGB uint8 (배경은 카메라 정면 법선 색)"""
+    rgb = (normals * NORMAL_SIGN) * 0.5 + 0.5
+    rgb[~np.isfinite(depth)] = np.array([0.0, 0.0, 1.0]) * 0.5 + 0.5
+    return (np.clip(rgb, 0.0, 1.0) * 255 + 0.5).astype(np.uint8)
+
+
+def save_controlnet_maps(depth: np.ndarray, root: str, name: str) -> list[str]:
+    """ComfyUI input 레이아웃으로 저장 — {root}/depth_maps/{name}.png, {root}/normal_maps/{name}.png"""
+    depth_dir = os.path.join(root, "depth_maps")
+    normal_dir = os.path.join(root, "normal_maps")
+    os.makedirs(depth_dir, exist_ok=True)
+    os.makedirs(normal_dir, exist_ok=True)
+
+    depth_path = os.path.join(depth_dir, f"{name}.png")
+    normal_path = os.path.join(normal_dir, f"{name}.png")
+    Image.fromarray(depth_to_controlnet(depth), "L").save(depth_path)
+    Image.fromarray(normals_to_controlnet(depth_to_normals(depth), depth), "RGB").save(normal_path)
+    return [depth_path, normal_path]
+
+
+def view_name(angle: float) -> str:
+    """출력 파일 이름 — 기본 4방향은 front/left/back/right, 그 외는 az{각도}"""
+    angle = angle % 360
+    for name, direction_angle in DIRECTIONS.items():
+        if math.isclose(angle, direction_angle):
+            return name
+    return f"az{angle:05.1f}"
+
+
+def parse_angles(angles: str | None, turntable: int | None) -> list[float]:
+    """--angles "0,45,90" 또는 --turntable N → 각도 목록 (기본: 4방향)"""
+    if angles:
+        return [float(a) for a in angles.split(",") if a.strip()]
+    if turntable:
+        return [i * 360.0 / turntable for i in range(turntable)]
+    return list(DIRECTIONS.values())
 
 
 def save_png(arr: np.ndarray, path: str):
@@ -179,34 +394,180 @@ def save_png(arr: np.ndarray, path: str):
     print(f"  Saved: {path} ({img.size[0]}x{img.size[1]})")
 
 
+# 배치 워커 프로세스당 plotter 1개 (size별) — 모델이 바뀌어도 GL 컨텍스트 재사용
+_worker_contexts: dict[int, tuple[pv.Plotter, list[pv.Light]]] = {}
+
+
+def render_model(glb_path: str, output_dir: str, angles: list[float], size: int,
+                 cache_dir: str | None, context=None, verbose: bool = True,
+                 controlnet_root: str | None = None, controlnet_prefix: str = "",
+                 target_faces: int = 0, lod_check: bool = False) -> dict:
+    """모델 1개 로드(캐시) + 전 각도 렌더 + 저장.
+
+    controlnet_root가 있으면 같은 렌더 패스의 depth/normal 맵을
+    {controlnet_root}/depth_maps|normal_maps/{controlnet_prefix}{view}.png로 함께 저장.
+    target_faces > 0이면 렌더 전 quadric decimation, lod_check면 원본 대비 실루엣 IoU 검증.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    mesh, cache_hit = load_mesh(glb_path, cache_dir)
+    if verbose:
+        print(f"  Points: {mesh.n_points}, Cells: {mesh.n_cells} (cache {'hit' if cache_hit else 'miss'})")
+        print(f"  Has vertex colors: {'RGB' in mesh.point_data}")
+
+    # 단일 파일 모드도 plotter 1개를 LOD 실루엣 검증과 본 렌더가 공유 (GL 컨텍스트 1회 생성)
+    owned = context is None
+    context = context if context is not None else create_view_plotter(size)
+    try:
+        lod_iou = None
+        if target_faces > 0 and mesh.n_cells > target_faces:
+            full_cells = mesh.n_cells
+            lod = decimate_mesh(mesh, target_faces)
+            if lod_check:
+                lod_iou = silhouette_iou(mesh, lod, angles, size, context=context)
+            mesh = lod
+            if verbose:
+                print(f"  LOD: {full_cells} -> {mesh.n_cells} faces")
+                if lod_iou is not None:
+                    status = "OK" if lod_iou >= LOD_IOU_THRESHOLD else "WARNING: visible loss"
+                    print(f"  LOD silhouette IoU (min over angles): {lod_iou:.4f} [{status}]")
+
+        if verbose:
+            print(f"\nRendering {len(angles)} directions at {size}x{size}...")
+
+        outputs = []
+        views = render_views(mesh, angles, size, context=context, with_depth=controlnet_root is not None)
+        for angle, rgba, depth in views:
+            name = view_name(angle)
+            out_path = os.path.join(output_dir, f"{name}.png")
+            if verbose:
+                print(f"  Rendered {name} ({angle:g} deg)")
+                save_png(rgba, out_path)
+            else:
+                Image.fromarray(rgba).save(out_path)
+            outputs.append(out_path)
+            if depth is not None:
+                maps = save_controlnet_maps(depth, controlnet_root, f"{controlnet_prefix}{name}")
+                if verbose:
+                    print(f"  Saved: {maps[0]}, {maps[1]}")
+                outputs.extend(maps)
+    finally:
+        if owned:
+            context[0].close()
+    return {"glb": glb_path, "cache_hit": cache_hit, "outputs": outputs, "lod_iou": lod_iou}
+
+
+def _resolve_cache_dir(cache_dir: str | None, glb_path: str) -> str | None:
+    """None = 캐시 끔, "" = GLB 옆 기본 캐시 폴더"""
+    if cache_dir is None:
+        return None
+    return cache_dir or glb_mesh_cache.default_cache_dir(glb_path)
+
+
+def _batch_worker(glb_path: str, output_dir: str, angles: list[float], size: int, cache_dir: str | None,
+                  controlnet_root: str | None, controlnet_prefix: str,
+                  target_faces: int, lod_check: bool) -> dict:
+    if size not in _worker_contexts:
+        _worker_contexts[size] = create_view_plotter(size)
+    try:
+        return render_model(glb_path, output_dir, angles, size, cache_dir,
+                            context=_worker_contexts[size], verbose=False,
+                            controlnet_root=controlnet_root, controlnet_prefix=controlnet_prefix,
+                            target_faces=target_faces, lod_check=lod_check)
+    except Exception as e:
+        return {"glb": glb_path, "error": str(e)}
+
+
+def run_batch(pattern: str, output_root: str | None, angles: list[float], size: int,
+              cache_dir: str | None, workers: int | None,
+              controlnet: bool = False, comfyui_input: str | None = None,
+              target_faces: int = 0, lod_check: bool = False):
+    """배치 모드: GLB 폴더/glob을 프로세스 풀로 렌더링 — {output_root}/{model}/{view}.png
+
+    ControlNet 맵은 모델 폴더 아래, --comfyui-input이면 그 폴더에 {model}_{view}.png로 저장.
+    """
+    glbs = glb_mesh_cache.collect_glbs(pattern)
+    if not glbs:
+        print(f"ERROR: No GLB files found: {pattern}")
+        sys.exit(1)
+
+    base = pattern if os.path.isdir(pattern) else os.path.dirname(glbs[0])
+    output_root = output_root or os.path.join(base, "renders")
+    print(f"Batch rendering {len(glbs)} models x {len(angles)} angles at {size}x{size} -> {output_root}")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for path in glbs:
+            model = os.path.splitext(os.path.basename(path))[0]
+            model_dir = os.path.join(output_root, model)
+            if comfyui_input:
+                controlnet_root, controlnet_prefix = comfyui_input, f"{model}_"
+            else:
+                controlnet_root, controlnet_prefix = (model_dir if controlnet else None), ""
+            futures.append(pool.submit(
+                _batch_worker, path, model_dir, angles, size,
+                _resolve_cache_dir(cache_dir, path),
+                controlnet_root, controlnet_prefix,
+                target_faces, lod_check,
+            ))
+        for i, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            name = os.path.basename(result["glb"])
+            if "error" in result:
+                failed += 1
+                print(f"  [{i}/{len(glbs)}] FAIL {name}: {result['error']}")
+            else:
+                cache = "cache hit" if result["cache_hit"] else "parsed"
+                lod = ""
+                if result["lod_iou"] is not None:
+                    flag = "" if result["lod_iou"] >= LOD_IOU_THRESHOLD else " WARNING"
+                    lod = f", LOD IoU {result['lod_iou']:.4f}{flag}"
+                print(f"  [{i}/{len(glbs)}] OK   {name} ({len(result['outputs'])} files, {cache}{lod})")
+
+    print(f"\nDone! {len(glbs) - failed}/{len(glbs)} models rendered to: {output_root}")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Render GLB model from 4 directions")
-    parser.add_argument("glb_path", help="Path to GLB file")
+    parser.add_argument("glb_path", help="Path to GLB file (directory or glob for batch mode)")
     parser.add_argument("--output-dir", "-o", default=None, help="Output directory")
     parser.add_argument("--size", "-s", type=int, default=1024, help="Render size (default: 1024)")
+    parser.add_argument("--angles", default=None, help="Comma-separated azimuths in degrees (e.g. 0,45,90)")
+    parser.add_argument("--turntable", type=int, default=None, help="N evenly spaced azimuths (e.g. 8, 16)")
+    parser.add_argument("--workers", type=int, default=None, help="Batch mode worker processes (default: CPU count)")
+    parser.add_argument("--cache-dir", default="", help="Mesh .npz cache directory (default: <glb_dir>/.mesh_cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable mesh .npz cache")
+    parser.add_argument("--controlnet", action="store_true",
+                        help="Also write ControlNet depth/normal maps (<output_dir>/depth_maps, normal_maps)")
+    parser.add_argument("--comfyui-input", default=None,
+                        help="Write ControlNet depth/normal maps into this ComfyUI input dir (implies --controlnet)")
+    parser.add_argument("--target-faces", type=int, default=0,
+                        help="Quadric-decimate meshes above this face count before rendering (0 = off)")
+    parser.add_argument("--lod-check", action="store_true",
+                        help="Report silhouette IoU of the decimated mesh vs. the full mesh at output size")
     args = parser.parse_args()
 
-    if not os.path.exists(args.glb_path):
+    angles = parse_angles(args.angles, args.turntable)
+    # "" = GLB 옆 기본 캐시 폴더, None = 캐시 끔
+    cache_dir = None if args.no_cache else args.cache_dir
+
+    if not os.path.isfile(args.glb_path):
+        if os.path.isdir(args.glb_path) or glb_mesh_cache.collect_glbs(args.glb_path):
+            run_batch(args.glb_path, args.output_dir, angles, args.size, cache_dir, args.workers,
+                      controlnet=args.controlnet, comfyui_input=args.comfyui_input,
+                      target_faces=args.target_faces, lod_check=args.lod_check)
+            return
         print(f"ERROR: File not found: {args.glb_path}")
         sys.exit(1)
 
     output_dir = args.output_dir or os.path.join(
         os.path.dirname(args.glb_path), "renders"
     )
-    os.makedirs(output_dir, exist_ok=True)
 
     print(f"Loading GLB: {args.glb_path}")
-    mesh = load_glb_to_pyvista(args.glb_path)
-    mesh = center_and_normalize(mesh)
-    print(f"  Points: {mesh.n_points}, Cells: {mesh.n_cells}")
-    print(f"  Has vertex colors: {'RGB' in mesh.point_data}")
-
-    print(f"\nRendering 4 directions at {args.size}x{args.size}...")
-    for direction, angle in DIRECTIONS.items():
-        print(f"  Rendering {direction} ({angle} deg)...")
-        rgba = render_view(mesh, angle, args.size)
-        out_path = os.path.join(output_dir, f"{direction}.png")
-        save_png(rgba, out_path)
+    controlnet_root = args.comfyui_input or (output_dir if args.controlnet else None)
+    render_model(args.glb_path, output_dir, angles, args.size, _resolve_cache_dir(cache_dir, args.glb_path),
+                 controlnet_root=controlnet_root, target_faces=args.target_faces, lod_check=args.lod_check)
 
     print(f"\nDone! Renders saved to: {output_dir}")
 
@@ -4,83 +4,276 @@ Uses Open3D Visualizer (OpenGL, works on Windows).
 
 Usage:
   python scripts/render-back-view.py <input.glb> <output.png> [--size 1024] [--azimuth 180]
+  python scripts/render-back-view.py <input.glb> "views/{az}.png" --azimuths 0,45,90,135,180 --elevations 0,15
+  python scripts/render-back-view.py <glb_dir | "glob/*.glb"> <output_dir> [--workers 4]   # 배치 모드
+
+여러 각도는 Visualizer 세션 하나(메시 1회 로드)에서 azimuth x elevation 전 조합을 렌더링.
+출력 경로의 {az}/{el}을 각도로 치환 — 자리표시자가 없으면 <name>_az{az}_el{el}.png.
+
+배치 모드: 입력이 폴더/glob이면 GLB별로 프로세스 풀 워커에서 렌더링 (render-3d-views.py run_batch와 동일).
+워커당 Visualizer(숨김 창) 1개를 모델 간 재사용 — 모델마다 지오메트리만 지우고 다시 올림.
+출력은 폴더 — {output}/{model}.png (여러 각도면 _az{az}_el{el}), 또는 {model} 자리표시자가 있는 템플릿.
+
+파싱된 메시(vertices/triangles/colors/normals + 텍스처 UV/머티리얼 ID/텍스처 이미지)는
+GLB 해시 키 .npz로 캐시(<glb_dir>/.mesh_cache) → 같은 모델 재렌더 시 Open3D 파싱/법선 계산 생략.
+--no-cache로 끔.
 """
 
+import os
 import sys
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import numpy as np
 
+import glb_mesh_cache
 
-def render_mesh_from_angle(glb_path: str, output_path: str, size: int = 1024, azimuth: float = 180.0, elevation: float = 0.0):
+MESH_CACHE_TAG = "o3d-v2"  # v2: 텍스처(UV, 머티리얼 ID, 이미지) 포함
+
+
+def load_mesh(glb_path: str, cache_dir: str | None = None):
+    """GLB → 법선 계산된 Open3D TriangleMesh. cache_dir가 있으면 .npz 캐시 사용"""
     import open3d as o3d
 
+    npz_path = glb_mesh_cache.cache_path(glb_path, cache_dir, MESH_CACHE_TAG) if cache_dir else None
+    arrays = glb_mesh_cache.load_cached(npz_path) if npz_path else None
+    if arrays is not None:
+        mesh = o3d.geometry.TriangleMesh(
+            o3d.utility.Vector3dVector(arrays["vertices"]),
+            o3d.utility.Vector3iVector(arrays["triangles"]),
+        )
+        mesh.vertex_normals = o3d.utility.Vector3dVector(arrays["normals"])
+        if len(arrays["colors"]):
+            mesh.vertex_colors = o3d.utility.Vector3dVector(arrays["colors"])
+        if len(arrays["triangle_uvs"]):
+            mesh.triangle_uvs = o3d.utility.Vector2dVector(arrays["triangle_uvs"])
+            mesh.triangle_material_ids = o3d.utility.IntVector(arrays["material_ids"].tolist())
+            mesh.textures = [
+                o3d.geometry.Image(np.ascontiguousarray(arrays[f"texture_{i}"]))
+                for i in range(int(arrays["n_textures"]))
+            ]
+        print(f"Loaded mesh from cache: {len(mesh.vertices)} vertices, {len(mesh.triangles)} triangles"
+              f"{', textured' if mesh.has_textures() else ''}")
+        return mesh
+
     # Load GLB mesh
     mesh = o3d.io.read_triangle_mesh(glb_path)
     if mesh.is_empty():
-        print(f"ERROR: Failed to load mesh from {glb_path}")
-        sys.exit(1)
+        raise ValueError(f"Failed to load mesh from {glb_path}")
 
     print(f"Loaded mesh: {len(mesh.vertices)} vertices, {len(mesh.triangles)} triangles")
     mesh.compute_vertex_normals()
 
-    # Get bounding box
-    bbox = mesh.get_axis_aligned_bounding_box()
-    center = bbox.get_center()
-    extent = bbox.get_max_extent()
-    print(f"Bounding box center: {center}, extent: {extent}")
+    if npz_path:
+        textures = [np.asarray(tex) for tex in mesh.textures] if mesh.has_textures() else []
+        glb_mesh_cache.save_cached(
+            npz_path,
+            vertices=np.asarray(mesh.vertices),
+            triangles=np.asarray(mesh.triangles),
+            normals=np.asarray(mesh.vertex_normals),
+            colors=np.asarray(mesh.vertex_colors),
+            triangle_uvs=np.asarray(mesh.triangle_uvs) if textures else np.empty((0, 2)),
+            material_ids=np.asarray(mesh.triangle_material_ids) if textures else np.empty(0, dtype=np.int32),
+            n_textures=np.array(len(textures)),
+            **{f"texture_{i}": tex for i, tex in enumerate(textures)},
+        )
+    return mesh
+
+
+def output_path_for(template: str, azimuth: float, elevation: float, multi: bool) -> str:
+    """출력 경로 템플릿 → 각도별 경로.
+
+    {az}/{el} 자리표시자가 있으면 치환, 없고 여러 각도면 확장자 앞에 _az{az}_el{el} 추가.
+    """
+    az, el = f"{azimuth:g}", f"{elevation:g}"
+    if "{az}" in template or "{el}" in template:
+        return template.replace("{az}", az).replace("{el}", el)
+    if not multi:
+        return template
+    root, ext = os.path.splitext(template)
+    return f"{root}_az{az}_el{el}{ext or '.png'}"
+
+
+def create_visualizer(size: int = 1024):
+    """숨김 창 Visualizer 1개 생성 — GL 컨텍스트/렌더 옵션은 한 번만 만들고 메시만 교체해 재사용"""
+    import open3d as o3d
 
-    # Create visualizer (hidden window)
     vis = o3d.visualization.Visualizer()
     vis.create_window(width=size, height=size, visible=False)
-    vis.add_geometry(mesh)
 
     # Render options
     opt = vis.get_render_option()
     opt.background_color = np.array([1.0, 1.0, 1.0])  # White background
     opt.light_on = True
+    return vis
+
 
-    # Setup camera
-    ctr = vis.get_view_control()
+def render_mesh_from_angles(glb_path: str, output_template: str, size: int = 1024,
+                            azimuths: list[float] = (180.0,), elevations: list[float] = (0.0,),
+                            cache_dir: str | None = None, vis=None) -> list[str]:
+    """한 Visualizer 세션(메시 1회 로드)으로 azimuth x elevation 전 조합 렌더링.
 
-    # Calculate camera position
-    az_rad = np.radians(azimuth)
-    el_rad = np.radians(elevation)
-    distance = extent * 2.0
+    vis(create_visualizer 결과)를 넘기면 지오메트리만 교체해 재사용하고 닫지 않는다 (배치 워커용).
+    """
+    mesh = load_mesh(glb_path, cache_dir)
+
+    # Get bounding box
+    bbox = mesh.get_axis_aligned_bounding_box()
+    center = bbox.get_center()
+    extent = bbox.get_max_extent()
+    print(f"Bounding box center: {center}, extent: {extent}")
 
-    cam_x = distance * np.cos(el_rad) * np.sin(az_rad)
-    cam_y = distance * np.sin(el_rad)
-    cam_z = distance * np.cos(el_rad) * np.cos(az_rad)
+    owned = vis is None
+    vis = vis if vis is not None else create_visualizer(size)
+    try:
+        vis.clear_geometries()
+        vis.add_geometry(mesh)
 
-    eye = center + np.array([cam_x, cam_y, cam_z])
-    up = np.array([0.0, 1.0, 0.0])
+        # Setup camera
+        ctr = vis.get_view_control()
+        distance = extent * 2.0
+        up = np.array([0.0, 1.0, 0.0])
 
-    # Set camera look-at
-    ctr.set_lookat(center)
-    ctr.set_front((eye - center) / np.linalg.norm(eye - center))
-    ctr.set_up(up)
-    ctr.set_zoom(0.7)
+        angles = [(az, el) for el in elevations for az in azimuths]
+        multi = len(angles) > 1
+        outputs = []
+        for azimuth, elevation in angles:
+            # Calculate camera position
+            az_rad = np.radians(azimuth)
+            el_rad = np.radians(elevation)
 
-    # Render and capture
-    vis.poll_events()
-    vis.update_renderer()
-    vis.capture_screen_image(output_path, do_render=True)
-    vis.destroy_window()
+            cam_x = distance * np.cos(el_rad) * np.sin(az_rad)
+            cam_y = distance * np.sin(el_rad)
+            cam_z = distance * np.cos(el_rad) * np.cos(az_rad)
 
-    print(f"Rendered to: {output_path} ({size}x{size})")
-    print(f"  Azimuth: {azimuth} deg, Elevation: {elevation} deg")
-    return output_path
+            eye = center + np.array([cam_x, cam_y, cam_z])
+
+            # Set camera look-at
+            ctr.set_lookat(center)
+            ctr.set_front((eye - center) / np.linalg.norm(eye - center))
+            ctr.set_up(up)
+            ctr.set_zoom(0.7)
+
+            # Render and capture
+            output_path = output_path_for(output_template, azimuth, elevation, multi)
+            out_dir = os.path.dirname(output_path)
+            if out_dir:
+                os.makedirs(out_dir, exist_ok=True)
+            vis.poll_events()
+            vis.update_renderer()
+            vis.capture_screen_image(output_path, do_render=True)
+            outputs.append(output_path)
+
+            print(f"Rendered to: {output_path} ({size}x{size})")
+            print(f"  Azimuth: {azimuth} deg, Elevation: {elevation} deg")
+    finally:
+        if owned:
+            vis.destroy_window()
+
+    return outputs
+
+
+def render_mesh_from_angle(glb_path: str, output_path: str, size: int = 1024, azimuth: float = 180.0, elevation: float = 0.0,
+                           cache_dir: str | None = None):
+    return render_mesh_from_angles(glb_path, output_path, size, [azimuth], [elevation], cache_dir)[0]
+
+
+# 배치 워커 프로세스당 Visualizer 1개 (size별) — 모델이 바뀌어도 GL 컨텍스트 재사용
+_worker_visualizers: dict = {}
+
+
+def _batch_worker(glb_path: str, output_template: str, size: int, azimuths: list[float],
+                  elevations: list[float], cache_dir: str | None) -> dict:
+    try:
+        if size not in _worker_visualizers:
+            _worker_visualizers[size] = create_visualizer(size)
+        outputs = render_mesh_from_angles(glb_path, output_template, size, azimuths, elevations, cache_dir,
+                                          vis=_worker_visualizers[size])
+        return {"glb": glb_path, "outputs": outputs}
+    except Exception as e:
+        return {"glb": glb_path, "error": str(e)}
+
+
+def batch_output_template(output: str, model: str) -> str:
+    """배치 출력: {model} 자리표시자가 있으면 치환, 없으면 output을 폴더로 보고 {model}.png"""
+    if "{model}" in output:
+        return output.replace("{model}", model)
+    return os.path.join(output, f"{model}.png")
+
+
+def run_batch(pattern: str, output: str, size: int, azimuths: list[float], elevations: list[float],
+              cache_dir: str | None, no_cache: bool, workers: int | None):
+    """배치 모드: GLB 폴더/glob을 프로세스 풀로 렌더링"""
+    glbs = glb_mesh_cache.collect_glbs(pattern)
+    if not glbs:
+        print(f"ERROR: No GLB files found: {pattern}")
+        sys.exit(1)
+
+    n_angles = len(azimuths) * len(elevations)
+    print(f"Batch rendering {len(glbs)} models x {n_angles} angles at {size}x{size} -> {output}")
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = []
+        for path in glbs:
+            model = os.path.splitext(os.path.basename(path))[0]
+            model_cache = None if no_cache else (cache_dir or glb_mesh_cache.default_cache_dir(path))
+            futures.append(pool.submit(
+                _batch_worker, path, batch_output_template(output, model), size, azimuths, elevations, model_cache,
+            ))
+        for i, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            name = os.path.basename(result["glb"])
+            if "error" in result:
+                failed += 1
+                print(f"  [{i}/{len(glbs)}] FAIL {name}: {result['error']}")
+            else:
+                print(f"  [{i}/{len(glbs)}] OK   {name} ({len(result['outputs'])} files)")
+
+    print(f"\nDone! {len(glbs) - failed}/{len(glbs)} models rendered")
+    if failed:
+        sys.exit(1)
+
+
+def parse_degrees(value: str) -> list[float]:
+    """"0,45,90" → [0.0, 45.0, 90.0]"""
+    return [float(v) for v in value.split(",") if v.strip()]
 
 
 def main():
     parser = argparse.ArgumentParser(description="Render GLB mesh from specific camera angle")
-    parser.add_argument("input", help="Path to input GLB file")
-    parser.add_argument("output", help="Path to output PNG file")
+    parser.add_argument("input", help="Path to input GLB file (directory or glob for batch mode)")
+    parser.add_argument("output", help="Output PNG path (may contain {az}/{el} placeholders); "
+                                       "batch mode: output directory or template with {model}")
     parser.add_argument("--size", type=int, default=1024, help="Output image size (default: 1024)")
     parser.add_argument("--azimuth", type=float, default=180.0, help="Camera azimuth in degrees (default: 180 = back)")
     parser.add_argument("--elevation", type=float, default=0.0, help="Camera elevation in degrees (default: 0)")
+    parser.add_argument("--azimuths", type=parse_degrees, default=None,
+                        help="Comma-separated azimuths rendered in one session (overrides --azimuth)")
+    parser.add_argument("--elevations", type=parse_degrees, default=None,
+                        help="Comma-separated elevations rendered in one session (overrides --elevation)")
+    parser.add_argument("--cache-dir", default=None, help="Mesh .npz cache directory (default: <glb_dir>/.mesh_cache)")
+    parser.add_argument("--no-cache", action="store_true", help="Disable mesh .npz cache")
+    parser.add_argument("--workers", type=int, default=None, help="Batch mode worker processes (default: CPU count)")
 
     args = parser.parse_args()
-    render_mesh_from_angle(args.input, args.output, args.size, args.azimuth, args.elevation)
+    azimuths = args.azimuths or [args.azimuth]
+    elevations = args.elevations or [args.elevation]
+
+    if not os.path.isfile(args.input):
+        if os.path.isdir(args.input) or glb_mesh_cache.collect_glbs(args.input):
+            run_batch(args.input, args.output, args.size, azimuths, elevations,
+                      args.cache_dir, args.no_cache, args.workers)
+            return
+        print(f"ERROR: File not found: {args.input}")
+        sys.exit(1)
+
+    cache_dir = None if args.no_cache else (args.cache_dir or glb_mesh_cache.default_cache_dir(args.input))
+    try:
+        render_mesh_from_angles(args.input, args.output, args.size, azimuths, elevations, cache_dir)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,179 @@
+"""
+Restore a dump-sydney-snapshot.py snapshot into a Postgres database.
+
+Usage:
+    # DR drill against a throwaway local Postgres (schema from `prisma migrate deploy`)
+    python scripts/restore-snapshot.py .backups/sydney-2026-05-06 --url postgresql://postgres@localhost/drill
+
+    python scripts/restore-snapshot.py .backups/sydney-2026-05-06 --env-file .env.new-seoul --truncate
+    python scripts/restore-snapshot.py SNAPSHOT --url URL --tables User,Space --workers 8
+
+Reads {table}.jsonl[.gz|.zst] (or legacy {table}.json) files row by row and
+streams them into COPY public."T" FROM STDIN, decoding the snapshot encodings
+per column type (bytes hex -> bytea, Decimal string -> numeric, ISO strings ->
+timestamp/date). Tables load in FK-dependency order of the target schema,
+independent tables in parallel, one connection and one transaction each.
+File SHA-256 and row counts are checked against _manifest.json before commit.
+Delta snapshots (dump --since) are refused; compact them first with
+compact-snapshots.py.
+"""
+import argparse
+import re
+import sys
+import time
+from itertools import chain
+from pathlib import Path
+import psycopg
+from psycopg.types.json import Json, Jsonb
+
+from pg_fk_order import dependency_order, get_dependencies, run_in_dependency_order
+from snapshot_io import JsonlReader, decode, snapshot_files
+
+sys.stdout.reconfigure(encoding="utf-8")
+
+DEFAULT_WORKERS = 4
+
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def list_tables(cur):
+    cur.execute(
+        """
+        SELECT table_name FROM information_schema.tables
+        WHERE table_schema='public' AND table_type='BASE TABLE'
+        ORDER BY table_name
+        """
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def get_column_types(cur, table):
+    """column -> information_schema data_type, in ordinal order"""
+    cur.execute(
+        """
+        SELECT column_name, data_type FROM information_schema.columns
+        WHERE table_schema='public' AND table_name=%s
+        ORDER BY ordinal_position
+        """,
+        (table,),
+    )
+    return dict(cur.fetchall())
+
+
+def column_decoder(data_type):
+    if data_type == "jsonb":
+        return lambda v: None if v is None else Jsonb(v)
+    if data_type == "json":
+        return lambda v: None if v is None else Json(v)
+    return lambda v: decode(v, data_type)
+
+
+def restore_table(url, table, path, expected, disable_triggers):
+    """Stream one snapshot file into COPY; verify hash/row count before commit"""
+    with psycopg.connect(url) as conn:
+        if disable_triggers:
+            conn.execute("SET session_replication_role = 'replica'")
+        with conn.cursor() as cur:
+            types = get_column_types(cur, table)
+            with JsonlReader(path) as reader:
+                rows = iter(reader)
+                first = next(rows, None)
+                if first is not None:
+                    cols = [c for c in types if c in first]
+                    extra = sorted(set(first) - set(types))
+                    if extra:
+                        print(f"  WARN: {table}: columns not in target, dropped: {', '.join(extra)}")
+                    decoders = [column_decoder(types[c]) for c in cols]
+                    col_idents = ", ".join(quote_ident(c) for c in cols)
+                    with cur.copy(f"COPY public.{quote_ident(table)} ({col_idents}) FROM STDIN") as copy:
+                        for row in chain([first], rows):
+                            copy.write_row([dec(row.get(c)) for c, dec in zip(cols, decoders)])
+
+        problems = []
+        if expected.get("sha256") and reader.sha256 != expected["sha256"]:
+            problems.append("sha256 mismatch")
+        if "rows" in expected and reader.rows != expected["rows"]:
+            problems.append(f"row count {reader.rows} != manifest {expected['rows']}")
+        if problems:
+            conn.rollback()
+            raise RuntimeError(f"{table}: {path.name}: {'; '.join(problems)} -- rolled back")
+        conn.commit()
+    return reader.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Restore a JSONL snapshot into Postgres")
+    parser.add_argument("snapshot_dir", help="Snapshot directory (with _manifest.json)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Target database URL")
+    target.add_argument("--env-file", help='Read DIRECT_URL="..." from this env file')
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"Tables restored in parallel (default: {DEFAULT_WORKERS})")
+    parser.add_argument("--tables", help="Comma-separated subset of tables")
+    parser.add_argument("--truncate", action="store_true",
+                        help="TRUNCATE the restored tables first")
+    parser.add_argument("--disable-triggers", action="store_true",
+                        help="session_replication_role=replica (skip FK checks; needs superuser)")
+    args = parser.parse_args()
+
+    url = args.url
+    if args.env_file:
+        env = Path(args.env_file).read_text(encoding="utf-8")
+        url = re.search(r'DIRECT_URL="([^"]+)"', env).group(1)
+
+    snapshot_dir = Path(args.snapshot_dir)
+    files, manifest = snapshot_files(snapshot_dir)
+    if manifest.get("kind") == "delta":
+        print(f"ERROR: {snapshot_dir} is a delta snapshot (changed rows only, base {manifest.get('base', '?')}) "
+              f"-- fold it into a full snapshot with scripts/compact-snapshots.py and restore that")
+        sys.exit(1)
+    if args.tables:
+        wanted = [t.strip() for t in args.tables.split(",") if t.strip()]
+        missing = [t for t in wanted if t not in files]
+        if missing:
+            raise SystemExit(f"Not in snapshot: {', '.join(missing)}")
+        files = {t: files[t] for t in wanted}
+    expected = manifest.get("files", {})
+
+    print(f"Snapshot: {snapshot_dir} ({manifest.get('snapshot_date', '?')}, {len(files)} tables)")
+    print(f"Target:   {url.split('@')[-1].split('/')[0] or 'local socket'}")
+    print()
+
+    with psycopg.connect(url) as conn, conn.cursor() as cur:
+        target_tables = set(list_tables(cur))
+        skipped = sorted(t for t in files if t not in target_tables)
+        for t in skipped:
+            print(f"  WARN: {t} not in target schema, skipped")
+        tables = [t for t in files if t in target_tables]
+        deps = get_dependencies(cur, tables)
+        if args.truncate and tables:
+            cur.execute("TRUNCATE " + ", ".join(f"public.{quote_ident(t)}" for t in tables))
+            conn.commit()
+            print(f"Truncated {len(tables)} tables")
+    order = dependency_order(deps)
+
+    start = time.time()
+    restored = {}
+    try:
+        for table, rows in run_in_dependency_order(
+            order, deps, max(1, args.workers),
+            lambda table: restore_table(url, table, files[table], expected.get(table, {}),
+                                        args.disable_triggers),
+        ):
+            restored[table] = rows
+            print(f"  {table:24s} {rows:6d} rows <- {files[table].name}")
+    except (RuntimeError, psycopg.Error) as e:
+        print(f"ERROR: {e}")
+        sys.exit(1)
+
+    print("\n=== Summary ===")
+    for table in order:
+        print(f"  {table:24s} {restored[table]:6d}")
+    print(f"\nTotal: {sum(restored.values())} rows into {len(restored)} tables "
+          f"in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
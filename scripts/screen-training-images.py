@@ -0,0 +1,269 @@
+"""
+학습 이미지 품질 스크리닝 + 불합격 이미지 자동 재생성 루프 (image_quality.py)
+
+실루엣 / 너무 어두움 / 기준 정면 대비 색상 이탈(머리색·의상색 변경) / 빈 이미지를 수치로 판정.
+  - 기준 이미지: 캐릭터별 정면 ({reference-dir}/{char}_front.png, --manifest면 매니페스트의 첫 front)
+    기준 정면 자체가 불합격이면 [BAD REF]로 보고하고 기준 없이 판정 (재생성 판정도 동일)
+  - 캐릭터/방향: 파일 이름의 c01_side... 접두사 (--manifest면 매니페스트 항목)
+
+--regenerate: 불합격 이미지에 저장된 ComfyUI 프롬프트(PNG "prompt" 메타데이터)를 그대로 쓰고
+seed만 바꿔 큐에 다시 넣는다 → 완료되면 /view로 받아 같은 기준으로 재판정 →
+통과하거나 이미지당 --max-attempts / 전체 --budget 소진까지 반복. REGENERATE 목록 수작업 불필요.
+통과한 결과는 ComfyUI output/{--subfolder}/에 남고 보고서에 경로 기록 (매니페스트 교체는 수동).
+
+사용법:
+  python scripts/screen-training-images.py --manifest scripts/chibi_v2_dataset.json
+  python scripts/screen-training-images.py "C:/Users/User/ComfyUI/output/regen3/*.png"
+  python scripts/screen-training-images.py --manifest scripts/chibi_v2_dataset.json --regenerate --budget 30
+  python scripts/screen-training-images.py DIR --report quality.json --max-palette-distance 20
+"""
+import argparse
+import copy
+import glob
+import json
+import os
+import re
+import sys
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from image_quality import MAX_PALETTE_DISTANCE, analyze, judge
+
+sys.stdout.reconfigure(encoding="utf-8")
+
+COMFYUI_URL = "http://127.0.0.1:8000"
+COMFYUI_OUTPUT = "C:/Users/User/ComfyUI/output"
+REFERENCE_DIR = "C:/Users/User/sd-scripts/train_data/chibi_v2/10_flowspace_chibi"
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+NAME_RE = re.compile(r"^(c\d{2})_(front|side|back)")
+SAMPLER_SEED_INPUTS = {"KSampler": "seed", "KSamplerAdvanced": "noise_seed"}
+SEED_STEP = 1000       # 재시도 n회차 seed = 원본 seed + n * SEED_STEP (기존 ±100 변형과 겹치지 않게)
+POLL_INTERVAL = 3
+
+
+def collect_images(patterns: list[str]) -> list[str]:
+    """폴더 또는 glob 패턴 → 이미지 경로 목록"""
+    paths = []
+    for pattern in patterns:
+        paths += glob.glob(os.path.join(pattern, "*") if os.path.isdir(pattern) else pattern)
+    return sorted({p for p in paths if p.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(p)})
+
+
+def targets_from_manifest(path: str) -> tuple[list[dict], dict[str, str]]:
+    """매니페스트 → (검사 대상 [{path, char, direction}], 캐릭터 → 기준 정면 경로)"""
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    targets, references = [], {}
+    for image in manifest["images"]:
+        root, sep, rel = image["source"].partition(":")
+        src = os.path.join(manifest["roots"][root], rel) if sep and root in manifest["roots"] else image["source"]
+        targets.append({"path": src, "char": image["char"], "direction": image["direction"]})
+        if image["direction"] == "front":
+            references.setdefault(image["char"], src)
+    return targets, references
+
+
+def targets_from_paths(paths: list[str], reference_dir: str) -> tuple[list[dict], dict[str, str]]:
+    targets, references = [], {}
+    for path in paths:
+        m = NAME_RE.match(os.path.basename(path))
+        char, direction = (m.group(1), m.group(2)) if m else (None, None)
+        targets.append({"path": path, "char": char, "direction": direction})
+        ref = os.path.join(reference_dir, f"{char}_front.png") if char else None
+        if ref and os.path.isfile(ref):
+            references[char] = ref
+    return targets, references
+
+
+def screen(source, reference: dict | None, max_distance: float) -> tuple[dict, list[str]]:
+    metrics = analyze(source)
+    reasons = judge(metrics, reference, max_distance)
+    return metrics, reasons
+
+
+def report_metrics(metrics: dict) -> dict:
+    return {k: v for k, v in metrics.items() if k != "palette"}
+
+
+# ── ComfyUI ──
+
+def embedded_workflow(path: str) -> dict | None:
+    """ComfyUI SaveImage가 PNG에 넣은 API 형식 프롬프트 (없으면 None)"""
+    with Image.open(path) as img:
+        raw = img.info.get("prompt")
+    try:
+        workflow = json.loads(raw) if raw else None
+    except ValueError:
+        return None
+    if not workflow or not any(n.get("class_type") in SAMPLER_SEED_INPUTS for n in workflow.values()):
+        return None
+    return workflow
+
+
+def reseed(workflow: dict, attempt: int, prefix: str) -> tuple[dict, int]:
+    """샘플러 seed를 attempt만큼 옮기고 SaveImage 접두사 교체 → (새 워크플로, 첫 샘플러 seed)"""
+    workflow = copy.deepcopy(workflow)
+    seeds = []
+    for node in workflow.values():
+        key = SAMPLER_SEED_INPUTS.get(node.get("class_type"))
+        if key:
+            node["inputs"][key] = (node["inputs"][key] + attempt * SEED_STEP) % (1 << 64)
+            seeds.append(node["inputs"][key])
+    seed = seeds[0]
+    for node in workflow.values():
+        if node.get("class_type") == "SaveImage":
+            node["inputs"]["filename_prefix"] = f"{prefix}_s{seed}"
+    return workflow, seed
+
+
+def enqueue(workflow: dict) -> str:
+    data = json.dumps({"prompt": workflow}).encode("utf-8")
+    req = urllib.request.Request(f"{COMFYUI_URL}/prompt", data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req) as resp:
+        result = json.loads(resp.read())
+    return result["prompt_id"]
+
+
+def poll_history(prompt_id: str) -> dict | None:
+    """완료됐으면 history 항목, 아니면 None"""
+    with urllib.request.urlopen(f"{COMFYUI_URL}/history/{prompt_id}") as resp:
+        history = json.loads(resp.read())
+    return history.get(prompt_id)
+
+
+def download_image(filename: str, subfolder: str = "", img_type: str = "output") -> bytes:
+    params = urllib.parse.urlencode({"filename": filename, "subfolder": subfolder, "type": img_type})
+    with urllib.request.urlopen(f"{COMFYUI_URL}/view?{params}") as resp:
+        return resp.read()
+
+
+def regenerate(failures: list[dict], references: dict[str, dict], args) -> list[dict]:
+    """불합격 이미지 재생성 루프 → 이미지별 결과 [{path, status, attempts, accepted, seed, reasons}]"""
+    results = []
+    pending = {}   # prompt_id → job
+    spent = 0
+
+    def submit(job) -> bool:
+        nonlocal spent
+        if job["attempt"] >= args.max_attempts or spent >= args.budget:
+            return False
+        job["attempt"] += 1
+        stem = os.path.splitext(os.path.basename(job["path"]))[0]
+        workflow, job["seed"] = reseed(job["workflow"], job["attempt"], f"{args.subfolder}/{stem}")
+        pending[enqueue(workflow)] = job
+        spent += 1
+        print(f"  [QUEUE] {os.path.basename(job['path'])} attempt {job['attempt']} seed={job['seed']}")
+        return True
+
+    for failure in failures:
+        workflow = embedded_workflow(failure["path"])
+        job = {"path": failure["path"], "char": failure["char"], "workflow": workflow,
+               "attempt": 0, "seed": None, "reasons": failure["reasons"]}
+        if workflow is None:
+            results.append({"path": job["path"], "status": "no_workflow", "attempts": 0})
+            print(f"  [SKIP] {os.path.basename(job['path'])}: no embedded ComfyUI prompt")
+        elif not submit(job):
+            results.append({"path": job["path"], "status": "budget", "attempts": 0, "reasons": job["reasons"]})
+
+    while pending:
+        time.sleep(POLL_INTERVAL)
+        for prompt_id, job in list(pending.items()):
+            entry = poll_history(prompt_id)
+            if entry is None:
+                continue
+            del pending[prompt_id]
+            images = [img for out in entry.get("outputs", {}).values() for img in out.get("images", [])
+                      if img.get("type", "output") == "output"]
+            accepted = None
+            for img in images:
+                _, job["reasons"] = screen(download_image(img["filename"], img.get("subfolder", ""), "output"),
+                                           references.get(job["char"]), args.max_palette_distance)
+                if not job["reasons"]:
+                    accepted = os.path.join(COMFYUI_OUTPUT, img.get("subfolder", ""), img["filename"])
+                    break
+            name = os.path.basename(job["path"])
+            if accepted:
+                print(f"  [PASS] {name} -> {accepted}")
+                results.append({"path": job["path"], "status": "pass", "attempts": job["attempt"],
+                                "seed": job["seed"], "accepted": accepted})
+            else:
+                print(f"  [FAIL] {name}: {', '.join(job['reasons']) or 'no output'}")
+                if not submit(job):
+                    print(f"  [GIVE UP] {name} after {job['attempt']} attempts")
+                    results.append({"path": job["path"], "status": "gave_up", "attempts": job["attempt"],
+                                    "reasons": job["reasons"]})
+
+    print(f"\nRegeneration: {spent} images generated (budget {args.budget})")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen training images for silhouettes/dark/color drift")
+    parser.add_argument("paths", nargs="*", help="Image folders or glob patterns")
+    parser.add_argument("--manifest", default=None, help="Screen all sources of a dataset manifest")
+    parser.add_argument("--reference-dir", default=REFERENCE_DIR, help="Folder with {char}_front.png references")
+    parser.add_argument("--max-palette-distance", type=float, default=MAX_PALETTE_DISTANCE,
+                        help=f"Max dominant-color ΔE vs reference front (default: {MAX_PALETTE_DISTANCE})")
+    parser.add_argument("--workers", type=int, default=8, help="Analysis threads")
+    parser.add_argument("--report", default=None, help="Write per-image metrics/results JSON")
+    parser.add_argument("--regenerate", action="store_true", help="Re-queue failures in ComfyUI until they pass")
+    parser.add_argument("--max-attempts", type=int, default=4, help="Regeneration attempts per image")
+    parser.add_argument("--budget", type=int, default=40, help="Total images generated in this run")
+    parser.add_argument("--subfolder", default="screened", help="ComfyUI output subfolder for regenerations")
+    args = parser.parse_args()
+
+    if args.manifest:
+        targets, reference_paths = targets_from_manifest(args.manifest)
+    else:
+        targets, reference_paths = targets_from_paths(collect_images(args.paths), args.reference_dir)
+    if not targets:
+        print("No images found")
+        sys.exit(1)
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        ref_chars = list(reference_paths)
+        ref_metrics = dict(zip(ref_chars, pool.map(analyze, [reference_paths[c] for c in ref_chars])))
+        # 기준 정면 자체가 불합격이면(실루엣/어두움) 임계값 완화·색 비교에 쓰지 않음 → reference=None
+        bad_refs = {c: judge(m) for c, m in ref_metrics.items()}
+        references = {c: m for c, m in ref_metrics.items() if not bad_refs[c]}
+        for char, reasons in bad_refs.items():
+            if reasons:
+                print(f"[BAD REF] {reference_paths[char]}: {', '.join(reasons)} — not used as reference")
+        screened = list(pool.map(
+            lambda t: screen(t["path"], None if t["path"] == reference_paths.get(t["char"])
+                             else references.get(t["char"]), args.max_palette_distance),
+            targets,
+        ))
+
+    failures = []
+    report = []
+    for target, (metrics, reasons) in zip(targets, screened):
+        report.append({**target, "reasons": reasons, **report_metrics(metrics)})
+        if reasons:
+            failures.append({**target, "reasons": reasons})
+            print(f"[FAIL] {target['path']}: {', '.join(reasons)}")
+    no_ref = sorted({t["char"] or "?" for t in targets if t["char"] not in references})
+    print(f"\nScreened {len(targets)} images: {len(targets) - len(failures)} pass, {len(failures)} fail")
+    if no_ref:
+        print(f"  (no reference front for {', '.join(no_ref)} — color drift not checked)")
+
+    regenerated = []
+    if args.regenerate and failures:
+        print(f"\nRegenerating {len(failures)} failures (max {args.max_attempts} attempts each, budget {args.budget})")
+        regenerated = regenerate(failures, references, args)
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({"images": report, "regenerated": regenerated}, f, indent=2, ensure_ascii=False)
+    unresolved = [r for r in regenerated if r["status"] != "pass"] if args.regenerate else failures
+    if unresolved:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+snapshot_io.py — shared JSONL snapshot file helpers.
+
+Imported by dump-sydney-snapshot.py / restore-snapshot.py (same scripts/ folder).
+One file per table, one JSON object per line, optionally compressed:
+
+    {table}.jsonl        plain
+    {table}.jsonl.gz     gzip
+    {table}.jsonl.zst    zstd (needs `pip install zstandard`)
+
+Writers hash the bytes as they hit the disk, so the SHA-256 recorded in
+_manifest.json is the hash of the file itself (`sha256sum` can check it);
+readers hash the bytes they consume so a restore can check it for free.
+Older snapshots ({table}.json, one JSON array) are still readable.
+"""
+import gzip
+import hashlib
+import io
+import json
+from datetime import datetime, date
+from decimal import Decimal
+from uuid import UUID
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SUFFIXES = {"none": ".jsonl", "gzip": ".jsonl.gz", "zstd": ".jsonl.zst"}
+
+
+def encode(o):
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, UUID):
+        return str(o)
+    if isinstance(o, bytes):
+        return o.hex()
+    raise TypeError(f"unserializable: {type(o)}")
+
+
+def decode(value, data_type):
+    """Inverse of encode() for one column, keyed on information_schema data_type"""
+    if value is None or not isinstance(value, str):
+        return value
+    if data_type == "bytea":
+        return bytes.fromhex(value)
+    if data_type == "numeric":
+        return Decimal(value)
+    if data_type.startswith("timestamp"):
+        return datetime.fromisoformat(value)
+    if data_type == "date":
+        return date.fromisoformat(value)
+    if data_type == "uuid":
+        return UUID(value)
+    return value
+
+
+def snapshot_files(snapshot_dir):
+    """table -> snapshot file path (manifest "files" first, then by suffix)"""
+    manifest_path = snapshot_dir / "_manifest.json"
+    manifest = json.loads(manifest_path.read_text(encoding="utf-8")) if manifest_path.exists() else {}
+    if "files" in manifest:
+        return {t: snapshot_dir / info["file"] for t, info in manifest["files"].items()}, manifest
+
+    files = {}
+    for suffix in (".json", *SUFFIXES.values()):
+        for path in sorted(snapshot_dir.glob(f"*{suffix}")):
+            if path.name != "_manifest.json":
+                files[path.name[: -len(suffix)]] = path
+    return files, manifest
+
+
+def check_compression(compression):
+    if compression == "zstd" and zstandard is None:
+        raise SystemExit("ERROR: zstd output requires zstandard. Install with: pip install zstandard")
+
+
+class _HashingFile:
+    """Raw file wrapper that counts and hashes every byte written"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+
+class JsonlWriter:
+    """Streams rows (dicts) into a JSONL file, compressing on the fly.
+
+        with JsonlWriter(path, "gzip") as w:
+            for row in rows:
+                w.write(row)
+        w.rows, w.sha256, w.size
+    """
+
+    def __init__(self, path, compression="none", buffer_rows=1000):
+        check_compression(compression)
+        self.path = path
+        self.compression = compression
+        self.buffer_rows = buffer_rows
+        self.rows = 0
+        self.sha256 = None
+        self.size = 0
+        self._buf = []
+
+    def __enter__(self):
+        self._raw = open(self.path, "wb")
+        self._hashing = _HashingFile(self._raw)
+        if self.compression == "gzip":
+            # mtime=0: identical data -> identical bytes -> identical SHA-256
+            self._out = gzip.GzipFile(fileobj=self._hashing, mode="wb", mtime=0)
+        elif self.compression == "zstd":
+            self._out = zstandard.ZstdCompressor().stream_writer(self._hashing, closefd=False)
+        else:
+            self._out = self._hashing
+        return self
+
+    def write(self, row):
+        self._buf.append(json.dumps(row, default=encode, ensure_ascii=False))
+        self.rows += 1
+        if len(self._buf) >= self.buffer_rows:
+            self._flush_buf()
+
+    def _flush_buf(self):
+        if self._buf:
+            self._out.write(("\n".join(self._buf) + "\n").encode("utf-8"))
+            self._buf = []
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self._flush_buf()
+            if self._out is not self._hashing:
+                self._out.close()
+        finally:
+            self._raw.close()
+        self.sha256 = self._hashing.sha256.hexdigest()
+        self.size = self._hashing.size
+        return False
+
+
+class _HashingReader(io.RawIOBase):
+    """Raw file wrapper that hashes every byte read"""
+
+    def __init__(self, f):
+        self.f = f
+        self.sha256 = hashlib.sha256()
+
+    def readinto(self, b):
+        n = self.f.readinto(b)
+        self.sha256.update(memoryview(b)[:n])
+        return n
+
+    def readable(self):
+        return True
+
+
+class JsonlReader:
+    """Streams rows (dicts) out of a snapshot file, decompressing by suffix.
+
+        with JsonlReader(path) as r:
+            for row in r:
+                ...
+        r.rows, r.sha256   # sha256 of the file bytes, valid after __exit__
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.sha256 = None
+
+    def __enter__(self):
+        self._raw = open(self.path, "rb")
+        self._hashing = _HashingReader(self._raw)
+        name = str(self.path)
+        if name.endswith(".gz"):
+            self._in = gzip.GzipFile(fileobj=self._hashing, mode="rb")
+        elif name.endswith(".zst"):
+            check_compression("zstd")
+            self._in = io.BufferedReader(
+                zstandard.ZstdDecompressor().stream_reader(self._hashing, closefd=False)
+            )
+        else:
+            self._in = io.BufferedReader(self._hashing)
+        return self
+
+    def __iter__(self):
+        if str(self.path).endswith(".json"):
+            # Legacy snapshot: one JSON array per table
+            rows = json.load(io.TextIOWrapper(self._in, encoding="utf-8"))
+        else:
+            rows = (json.loads(line) for line in io.TextIOWrapper(self._in, encoding="utf-8") if line.strip())
+        for row in rows:
+            self.rows += 1
+            yield row
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            # Drain whatever the decompressor left unread so the hash covers the whole file
+            while chunk := self._raw.read(1 << 20):
+                self._hashing.sha256.update(chunk)
+        finally:
+            self._raw.close()
+        self.sha256 = self._hashing.sha256.hexdigest()
+        return False
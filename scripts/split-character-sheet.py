@@ -5,10 +5,22 @@ Rembg 처리된 character sheet에서 개별 캐릭터 뷰를 자동 감지 및
 Connected component analysis로 각 캐릭터 영역의 bounding box를 찾고,
 위치 기반으로 front/side/back을 식별합니다.
 
-사용: python scripts/split-character-sheet.py <image_path> [output_dir]
+사용: python scripts/split-character-sheet.py <image_path> [output_dir] [--coarse-scale 4]
+     python scripts/split-character-sheet.py <dir | "glob/*.png"> [output_dir] [--workers 8]
+  --coarse-scale N: 1/N 해상도에서 후보 감지 후 후보 영역만 전체 해상도로 정밀 계산 (4K+ 시트용, 결과 동일)
+
+배치 모드: 폴더/glob 입력 시 프로세스 풀로 병렬 처리.
+  {output_dir}/{sheet_name}/front.png, side.png, back.png
+  {output_dir}/split_report.json — 시트별 감지 영역 + 분류 신뢰도 (status/confidence로 실패 필터링)
 """
+import argparse
+import contextlib
+import glob
+import io
+import json
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import numpy as np
 from PIL import Image
 from scipy import ndimage
@@ -19,66 +31,142 @@ def load_image(path: str) -> tuple[np.ndarray, Image.Image]:
     arr = np.array(img)
     return arr, img
 
-def find_character_regions(arr: np.ndarray, min_area: int = 5000) -> list[dict]:
-    """
-    알파 채널 기반 connected component analysis.
-    각 캐릭터 영역의 bounding box + 면적 반환.
-    """
-    alpha = arr[:, :, 3]
+DILATE_ITERATIONS = 5   # 가까운 영역 연결용 dilate 반경 (px)
+BBOX_PADDING = 10
 
-    # 이진화: 알파값 > 128인 픽셀
-    binary = (alpha > 128).astype(np.uint8)
+def _binarize(arr: np.ndarray) -> np.ndarray:
+    """이진화: 알파값 > 128인 픽셀"""
+    return arr[:, :, 3] > 128
 
-    # 가까운 영역 연결을 위해 약간 dilate
-    struct = ndimage.generate_binary_structure(2, 2)
-    dilated = ndimage.binary_dilation(binary, structure=struct, iterations=5)
+def _component_regions(binary: np.ndarray, labeled: np.ndarray, num_features: int, min_area: int,
+                       offset: tuple[int, int], image_shape: tuple[int, ...]) -> list[tuple[tuple[int, int], dict]]:
+    """
+    라벨 이미지(전체 또는 window)에서 영역 dict 추출.
+    (raster 순서 키, region) 목록 반환 — 키는 전체 이미지 좌표 기준 컴포넌트 첫 픽셀.
+    """
+    oy, ox = offset
 
-    # Connected component labeling
-    labeled, num_features = ndimage.label(dilated)
+    # 라벨링 1회로 전 컴포넌트의 면적/bbox 산출 (컴포넌트별 전체 이미지 마스크 생성 없음)
+    dilated_areas = np.bincount(labeled.ravel(), minlength=num_features + 1)
+    original_areas = np.bincount(labeled[binary], minlength=num_features + 1)
+    slices = ndimage.find_objects(labeled)
 
     regions = []
     for i in range(1, num_features + 1):
-        component = (labeled == i)
-        area = component.sum()
-
-        if area < min_area:
+        if dilated_areas[i] < min_area:
             continue
 
         # Bounding box (원본 binary 기준으로 정밀하게)
-        original_component = binary & component
-        if original_component.sum() < min_area:
+        if original_areas[i] < min_area:
             continue
 
+        # 임계값을 넘은 영역만 crop 안에서 정밀 bbox 계산
+        sl_y, sl_x = slices[i - 1]
+        component = labeled[sl_y, sl_x] == i
+        original_component = component & binary[sl_y, sl_x]
         rows = np.any(original_component, axis=1)
         cols = np.any(original_component, axis=0)
-        y_min, y_max = np.where(rows)[0][[0, -1]]
-        x_min, x_max = np.where(cols)[0][[0, -1]]
+        y_min, y_max = np.where(rows)[0][[0, -1]] + sl_y.start + oy
+        x_min, x_max = np.where(cols)[0][[0, -1]] + sl_x.start + ox
 
         # 약간의 padding
-        padding = 10
+        padding = BBOX_PADDING
         y_min = max(0, y_min - padding)
         x_min = max(0, x_min - padding)
-        y_max = min(arr.shape[0] - 1, y_max + padding)
-        x_max = min(arr.shape[1] - 1, x_max + padding)
+        y_max = min(image_shape[0] - 1, y_max + padding)
+        x_max = min(image_shape[1] - 1, x_max + padding)
 
         width = x_max - x_min
         height = y_max - y_min
         center_x = (x_min + x_max) / 2
         center_y = (y_min + y_max) / 2
 
-        regions.append({
+        first_pixel = (sl_y.start + oy, sl_x.start + ox + int(np.argmax(component[0])))
+        regions.append((first_pixel, {
             "bbox": (x_min, y_min, x_max, y_max),
             "width": width,
             "height": height,
-            "area": int(original_component.sum()),
+            "area": int(original_areas[i]),
             "center_x": center_x,
             "center_y": center_y,
-        })
+        }))
 
-    # 크기순 정렬 (큰 것 = 전신 뷰일 가능성 높음)
-    regions.sort(key=lambda r: r["area"], reverse=True)
     return regions
 
+def _sort_regions(regions: list[tuple[tuple[int, int], dict]]) -> list[dict]:
+    """크기순 정렬 (큰 것 = 전신 뷰일 가능성 높음). 동률은 raster 순서 — 전체 해상도 라벨 순서와 동일"""
+    regions.sort(key=lambda item: item[0])
+    return [r for _, r in sorted(regions, key=lambda item: item[1]["area"], reverse=True)]
+
+def find_character_regions(arr: np.ndarray, min_area: int = 5000, coarse_scale: int = 1) -> list[dict]:
+    """
+    알파 채널 기반 connected component analysis.
+    각 캐릭터 영역의 bounding box + 면적 반환.
+    coarse_scale > 1이면 축소 해상도에서 후보를 찾고 후보 window만 전체 해상도로 정밀 계산.
+    """
+    if coarse_scale > 1:
+        return _find_character_regions_coarse(arr, min_area, coarse_scale)
+
+    binary = _binarize(arr)
+
+    # 가까운 영역 연결을 위해 약간 dilate
+    struct = ndimage.generate_binary_structure(2, 2)
+    dilated = ndimage.binary_dilation(binary, structure=struct, iterations=DILATE_ITERATIONS)
+
+    # Connected component labeling
+    labeled, num_features = ndimage.label(dilated)
+
+    return _sort_regions(_component_regions(binary, labeled, num_features, min_area, (0, 0), arr.shape))
+
+def _find_character_regions_coarse(arr: np.ndarray, min_area: int, scale: int) -> list[dict]:
+    """
+    Coarse-to-fine 감지 — 결과는 전체 해상도 경로와 동일.
+
+    1. binary를 scale x scale 블록 any()로 축소, ceil(5/scale)회 dilate → 전체 해상도 dilate 결과를 포함
+       (전체 해상도 컴포넌트는 항상 coarse 컴포넌트 하나에 속함)
+    2. coarse 컴포넌트마다 해당 블록에 속한 binary만 남긴 window(+dilate 반경)에서 전체 해상도 dilate/label
+    """
+    binary = _binarize(arr)
+    h, w = binary.shape
+    struct = ndimage.generate_binary_structure(2, 2)
+
+    padded = np.pad(binary, ((0, -h % scale), (0, -w % scale)))
+    ch, cw = padded.shape[0] // scale, padded.shape[1] // scale
+    coarse = padded.reshape(ch, scale, cw, scale).any(axis=(1, 3))
+    coarse_iterations = -(-DILATE_ITERATIONS // scale)
+    coarse_dilated = ndimage.binary_dilation(coarse, structure=struct, iterations=coarse_iterations)
+    coarse_labeled, coarse_num = ndimage.label(coarse_dilated)
+    block_counts = np.bincount(coarse_labeled.ravel(), minlength=coarse_num + 1)
+
+    regions = []
+    for k, (sl_y, sl_x) in enumerate(ndimage.find_objects(coarse_labeled), start=1):
+        # 블록 수 x scale² 가 전체 해상도 dilate 면적의 상한 → 노이즈 후보는 window 계산 없이 제외
+        if block_counts[k] * scale * scale < min_area:
+            continue
+
+        # 이 후보가 소유한 블록 → 전체 해상도 마스크
+        owned_blocks = coarse_labeled[sl_y, sl_x] == k
+        owned = np.repeat(np.repeat(owned_blocks, scale, axis=0), scale, axis=1)
+        by0, bx0 = sl_y.start * scale, sl_x.start * scale
+
+        # window: 블록 영역 + dilate 반경 (이미지 경계로 clip)
+        y0 = max(0, by0 - DILATE_ITERATIONS)
+        x0 = max(0, bx0 - DILATE_ITERATIONS)
+        y1 = min(h, sl_y.stop * scale + DILATE_ITERATIONS)
+        x1 = min(w, sl_x.stop * scale + DILATE_ITERATIONS)
+
+        window_owned = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+        oy1 = min(h, sl_y.stop * scale)
+        ox1 = min(w, sl_x.stop * scale)
+        window_owned[by0 - y0:oy1 - y0, bx0 - x0:ox1 - x0] = owned[:oy1 - by0, :ox1 - bx0]
+        window_binary = binary[y0:y1, x0:x1] & window_owned
+
+        dilated = ndimage.binary_dilation(window_binary, structure=struct, iterations=DILATE_ITERATIONS)
+        labeled, num_features = ndimage.label(dilated)
+        regions.extend(_component_regions(window_binary, labeled, num_features, min_area, (y0, x0), arr.shape))
+
+    return _sort_regions(regions)
+
 def classify_views(regions: list[dict], img_width: int, img_height: int) -> dict:
     """
     감지된 영역을 front/side/back으로 분류.
@@ -162,13 +250,122 @@ def crop_and_save(img: Image.Image, views: dict, output_dir: str):
         square.save(output_path)
         print(f"  {view_name}: {cropped.width}x{cropped.height} → {max_dim}x{max_dim} saved to {output_path}")
 
-def main():
-    if len(sys.argv) < 2:
-        print("사용: python scripts/split-character-sheet.py <image_path> [output_dir]")
+def classification_confidence(views: dict, img_height: int) -> float:
+    """
+    분류 신뢰도 (0~1).
+    = 전신 높이 기준 충족 비율 x 뷰 간 높이 일관성(min/max) x 행 정렬도(y 중심 편차 / 최대 높이).
+    fallback으로 뽑힌 작은 영역이나 서로 다른 행에 흩어진 뷰일수록 낮아진다.
+    """
+    if len(views) < 3:
+        return 0.0
+    heights = np.array([r["height"] for r in views.values()], dtype=np.float64)
+    centers_y = np.array([r["center_y"] for r in views.values()], dtype=np.float64)
+    fullbody_ratio = float(np.mean(heights >= img_height * 0.25))
+    height_consistency = float(heights.min() / heights.max()) if heights.max() > 0 else 0.0
+    row_alignment = 1.0 - min(1.0, float(np.ptp(centers_y) / max(heights.max(), 1.0)))
+    return round(fullbody_ratio * height_consistency * row_alignment, 4)
+
+def _region_to_json(region: dict) -> dict:
+    """region dict → JSON 직렬화 가능한 형태 (numpy 정수 변환)"""
+    return {
+        "bbox": [int(v) for v in region["bbox"]],
+        "width": int(region["width"]),
+        "height": int(region["height"]),
+        "area": int(region["area"]),
+        "center_x": float(region["center_x"]),
+        "center_y": float(region["center_y"]),
+    }
+
+def process_sheet(image_path: str, output_dir: str, coarse_scale: int = 1) -> dict:
+    """시트 1장 분리 (배치 워커). 콘솔 출력은 삼키고 리포트 항목 반환."""
+    entry = {"image": image_path, "output_dir": output_dir}
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            arr, img = load_image(image_path)
+            regions = find_character_regions(arr, coarse_scale=coarse_scale)
+            views = classify_views(regions, img.width, img.height)
+            if views:
+                crop_and_save(img, views, output_dir)
+    except Exception as e:
+        entry.update({"status": "error", "error": str(e), "confidence": 0.0, "regions": [], "views": {}})
+        return entry
+
+    entry.update({
+        "status": "ok" if views else "failed",
+        "size": [img.width, img.height],
+        "confidence": classification_confidence(views, img.height),
+        "regions": [_region_to_json(r) for r in regions],
+        "views": {name: _region_to_json(r) for name, r in views.items()},
+    })
+    return entry
+
+def collect_sheets(pattern: str) -> list[str]:
+    """폴더 또는 glob 패턴 → 시트 이미지 경로 목록"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.png")
+    return sorted(p for p in glob.glob(pattern) if os.path.isfile(p))
+
+def run_batch(pattern: str, output_dir: str | None, coarse_scale: int, workers: int | None):
+    """배치 모드: 프로세스 풀로 시트 병렬 분리 + 통합 리포트"""
+    sheets = collect_sheets(pattern)
+    if not sheets:
+        print(f"ERROR: 입력 시트 없음: {pattern}")
         sys.exit(1)
 
-    image_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(image_path), "split")
+    base = pattern if os.path.isdir(pattern) else os.path.dirname(sheets[0])
+    output_dir = output_dir or os.path.join(base, "split")
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"=== Character Sheet 배치 분리 ===")
+    print(f"입력: {len(sheets)}장 ({pattern})")
+    print(f"출력: {output_dir}")
+
+    entries = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(
+                process_sheet, path,
+                os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0]),
+                coarse_scale,
+            ): path
+            for path in sheets
+        }
+        for i, future in enumerate(as_completed(futures), start=1):
+            entry = future.result()
+            entries.append(entry)
+            name = os.path.basename(entry["image"])
+            print(f"  [{i}/{len(sheets)}] {entry['status'].upper():6s} {name} confidence={entry['confidence']:.2f}")
+
+    entries.sort(key=lambda e: e["image"])
+    report = {
+        "total": len(entries),
+        "ok": sum(e["status"] == "ok" for e in entries),
+        "failed": sum(e["status"] == "failed" for e in entries),
+        "error": sum(e["status"] == "error" for e in entries),
+        "sheets": entries,
+    }
+    report_path = os.path.join(output_dir, "split_report.json")
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    print(f"\n완료! ok={report['ok']}, failed={report['failed']}, error={report['error']}")
+    print(f"리포트: {report_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Character sheet 자동 분리")
+    parser.add_argument("image_path", help="Rembg 처리된 character sheet 이미지 (폴더/glob이면 배치 모드)")
+    parser.add_argument("output_dir", nargs="?", default=None, help="출력 폴더 (기본: <image_dir>/split)")
+    parser.add_argument("--coarse-scale", type=int, default=1, choices=[1, 2, 4, 8],
+                        help="Coarse-to-fine 감지 축소 배율 (1 = 전체 해상도만)")
+    parser.add_argument("--workers", type=int, default=None, help="배치 모드 프로세스 수 (기본: CPU 수)")
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.image_path):
+        run_batch(args.image_path, args.output_dir, args.coarse_scale, args.workers)
+        return
+
+    image_path = args.image_path
+    output_dir = args.output_dir or os.path.join(os.path.dirname(image_path), "split")
 
     print(f"=== Character Sheet 자동 분리 ===")
     print(f"입력: {image_path}")
@@ -179,7 +376,7 @@ def main():
     print(f"이미지 크기: {img.width}x{img.height}")
 
     # 2. 캐릭터 영역 감지
-    regions = find_character_regions(arr)
+    regions = find_character_regions(arr, coarse_scale=args.coarse_scale)
     print(f"\n감지된 캐릭터 영역: {len(regions)}개")
     for i, r in enumerate(regions):
         print(f"  [{i}] bbox={r['bbox']}, size={r['width']}x{r['height']}, area={r['area']}")
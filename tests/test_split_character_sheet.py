@@ -0,0 +1,53 @@
+"""split-character-sheet.py — coarse 감지(--coarse-scale)가 전체 해상도 경로와 같은 영역을 내는지 검증"""
+import importlib.util
+import os
+import sys
+
+import numpy as np
+import pytest
+
+SCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS)
+_spec = importlib.util.spec_from_file_location("split_character_sheet",
+                                               os.path.join(SCRIPTS, "split-character-sheet.py"))
+split = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(split)
+
+
+def synthetic_sheet(seed: int) -> np.ndarray:
+    """타원 캐릭터 + 작은 노이즈 점이 흩어진 RGBA 시트 (크기는 scale 배수가 아니게)"""
+    rng = np.random.default_rng(seed)
+    h, w = rng.integers(301, 640, size=2)
+    yy, xx = np.mgrid[0:h, 0:w]
+    alpha = np.zeros((h, w), dtype=np.uint8)
+    for _ in range(rng.integers(2, 7)):
+        cy, cx = rng.integers(0, h), rng.integers(0, w)
+        ry, rx = rng.integers(15, 90, size=2)
+        alpha[((yy - cy) / ry) ** 2 + ((xx - cx) / rx) ** 2 <= 1] = 255
+    for _ in range(rng.integers(5, 30)):
+        y, x = rng.integers(0, h - 3), rng.integers(0, w - 3)
+        alpha[y:y + rng.integers(1, 4), x:x + rng.integers(1, 4)] = 200
+    arr = np.zeros((h, w, 4), dtype=np.uint8)
+    arr[..., 3] = alpha
+    return arr
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("scale", [2, 4, 8])
+def test_coarse_regions_match_full_resolution(seed, scale):
+    arr = synthetic_sheet(seed)
+    full = split.find_character_regions(arr, min_area=500, coarse_scale=1)
+    coarse = split.find_character_regions(arr, min_area=500, coarse_scale=scale)
+    assert full, "synthetic sheet should contain at least one region"
+    assert coarse == full
+
+
+@pytest.mark.parametrize("scale", [2, 4, 8])
+def test_coarse_regions_near_gap_threshold(scale):
+    """dilate 반경 경계(간격 2*DILATE_ITERATIONS 전후)로 떨어진 두 블록 — 연결 여부가 같아야 함"""
+    for gap in range(2 * split.DILATE_ITERATIONS - 2, 2 * split.DILATE_ITERATIONS + 4):
+        arr = np.zeros((200, 257, 4), dtype=np.uint8)
+        arr[40:160, 30:100, 3] = 255
+        arr[40:160, 100 + gap:170 + gap, 3] = 255
+        full = split.find_character_regions(arr, min_area=500, coarse_scale=1)
+        assert split.find_character_regions(arr, min_area=500, coarse_scale=scale) == full, f"gap {gap}"